@@ -0,0 +1,48 @@
+from maya import OpenMayaMPx
+from zUtils import undo
+
+
+class ModifierCommand(OpenMayaMPx.MPxCommand):
+    """
+    The modifier command executes the pending modifier of the undo module.
+    The modifier is stored on the command, which Maya keeps on the undo
+    queue, so it can be undone and redone.
+    """
+    def __init__(self):
+        OpenMayaMPx.MPxCommand.__init__(self)
+        self._modifier = None
+
+    # ------------------------------------------------------------------------
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        if not undo.PENDING:
+            raise RuntimeError("No modifier pending to execute!")
+
+        self._modifier = undo.PENDING.pop()
+        self._modifier.doIt()
+
+    def undoIt(self):
+        self._modifier.undoIt()
+
+    def redoIt(self):
+        self._modifier.doIt()
+
+
+def creator():
+    return OpenMayaMPx.asMPxPtr(ModifierCommand())
+
+
+# ----------------------------------------------------------------------------
+
+
+def initializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj, "Robert Joosten", "1.0", "Any")
+    plugin.registerCommand(undo.COMMAND, creator)
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    plugin.deregisterCommand(undo.COMMAND)
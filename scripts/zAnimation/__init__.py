@@ -1,2 +1,3 @@
 from .base import Animation
 from .exporter import AnimationExport
+from .scene import AnimationSceneExport
@@ -1,4 +1,4 @@
-from maya import cmds
+from maya import cmds, OpenMaya
 from zUtils import api, transforms, attributes, decorators
 
 from .tags import (
@@ -33,33 +33,21 @@ class Animation(object):
     @classmethod
     def getAnimationsFromScene(cls):
         """
-        Loop over all transforms and that contain an export animation tag.
-        Read the value of this tag and add it into a dictionary.
+        Get all transforms that contain an export animation tag from the tag
+        index. The value of this tag is used as the key of the dictionary.
 
         :return: Exported animation from current scene
         :rtype: dict
         """
-        # data variable
-        data = {}
+        # the tag index is used to prevent looping over all of the
+        # transforms in the scene, as the tags already exist providing the
+        # character doesn't write any tags.
+        index = attributes.getTagIndex(ZIVA_ANIMATION)
 
-        # loop transforms
-        for node in cmds.ls(transforms=True):
-            # get plug
-            plug = attributes.getPlug(node, ZIVA_ANIMATION)
-
-            # validate plug
-            if cmds.objExists(plug):
-                # get character
-                character = cmds.getAttr(plug)
-
-                # add character to dictionary
-                if character not in data.keys():
-                    data[character] = []
-
-                # add animation to dictionary
-                data[character].append(cls(node, character))
-
-        return data
+        return {
+            character: [cls(tag.node, character) for tag in tags]
+            for character, tags in index.getAll().iteritems()
+        }
 
     # ------------------------------------------------------------------------
 
@@ -72,7 +60,11 @@ class Animation(object):
         :return: Character name
         :rtype: str
         """
-        return attributes.getTag(self.root, ZIVA_ANIMATION)
+        return attributes.ATTRIBUTE_CACHE.get(
+            self.root,
+            ZIVA_ANIMATION,
+            lambda: attributes.getTag(self.root, ZIVA_ANIMATION)
+        )
 
     @property
     def root(self):
@@ -87,6 +79,39 @@ class Animation(object):
 
     # ------------------------------------------------------------------------
 
+    def _getAttr(self, attr):
+        """
+        :param str attr:
+        :return: Cached value of the attribute on the root node
+        """
+        plug = attributes.getPlug(self.root, attr)
+        return attributes.ATTRIBUTE_CACHE.get(
+            self.root,
+            attr,
+            lambda: cmds.getAttr(plug)
+        )
+
+    def _setAttr(self, attr, value):
+        """
+        Set the attribute on the root node and store the value in the cache.
+
+        :param str attr:
+        :param value:
+        """
+        plug = attributes.getPlug(self.root, attr)
+        cmds.setAttr(plug, value)
+        attributes.ATTRIBUTE_CACHE.set(self.root, attr, value)
+
+    def clearCache(self):
+        """
+        The attribute backed properties are cached, the cache is cleared
+        automatically when attributes on the root node change. This function
+        can be used to clear the cache explicitly.
+        """
+        attributes.ATTRIBUTE_CACHE.clear(self.root)
+
+    # ------------------------------------------------------------------------
+
     @property
     def solver(self):
         """
@@ -96,12 +121,31 @@ class Animation(object):
         :return: Solver parent
         :rtype: str/None
         """
+        # the solver is cached as a handle so it remains valid when renamed,
+        # the cached handle is cleared when the children of the root change
+        # or when the solver parent link on the root changes.
+        handle = attributes.ATTRIBUTE_CACHE.get(
+            self.root,
+            ZIVA_SOLVER_PARENT,
+            self._getSolverHandle
+        )
+
+        if handle and handle.isAlive() and handle.isValid():
+            dag = OpenMaya.MDagPath()
+            OpenMaya.MDagPath.getAPathTo(handle.object(), dag)
+            return dag.partialPathName()
+
+    def _getSolverHandle(self):
+        """
+        :return: Solver parent handle
+        :rtype: MObjectHandle/None
+        """
         # the reason for looping through it's children rather than relying on
         # a link is that when exporting an alembic this link attribute
         # connection is not respected.
-        for child in cmds.listRelatives(self.root, children=True):
+        for child in cmds.listRelatives(self.root, children=True) or []:
             if cmds.objExists(attributes.getPlug(child, ZIVA_SOLVER_PARENT)):
-                return child
+                return OpenMaya.MObjectHandle(api.getMObject(child))
 
     # ------------------------------------------------------------------------
 
@@ -112,13 +156,11 @@ class Animation(object):
         :return: Animation start frame
         :rtype: int/float
         """
-        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_START)
-        return cmds.getAttr(plug)
+        return self._getAttr(ZIVA_ANIMATION_START)
 
     @startFrame.setter
     def startFrame(self, value):
-        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_START)
-        cmds.setAttr(plug, value)
+        self._setAttr(ZIVA_ANIMATION_START, value)
 
     @property
     def endFrame(self):
@@ -127,13 +169,11 @@ class Animation(object):
         :return: Animation end frame
         :rtype: int/float
         """
-        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_END)
-        return cmds.getAttr(plug)
+        return self._getAttr(ZIVA_ANIMATION_END)
 
     @endFrame.setter
     def endFrame(self, value):
-        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_END)
-        cmds.setAttr(plug, value)
+        self._setAttr(ZIVA_ANIMATION_END, value)
 
     @property
     def transitionFrames(self):
@@ -142,10 +182,8 @@ class Animation(object):
         :return: Animation transition frames
         :rtype: int/float
         """
-        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_TRANSITION)
-        return cmds.getAttr(plug)
+        return self._getAttr(ZIVA_ANIMATION_TRANSITION)
 
     @transitionFrames.setter
     def transitionFrames(self, value):
-        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_TRANSITION)
-        cmds.setAttr(plug, value)
+        self._setAttr(ZIVA_ANIMATION_TRANSITION, value)
@@ -0,0 +1,245 @@
+from maya import cmds
+from collections import OrderedDict
+from zUtils import api, contexts, animation, transforms, benchmark
+
+from .exporter import AnimationExport
+
+
+ATTRIBUTES = ["tx", "ty", "tz", "rx", "ry", "rz"]
+
+
+# ----------------------------------------------------------------------------
+
+
+def createRig(numNodes, attributes=ATTRIBUTES, children=4):
+    """
+    Create a synthetic control rig hierarchy in which every node is animated
+    on the provided attributes. Every node has a maximum amount of children
+    so the depth of the hierarchy grows with the amount of nodes, similar to
+    a production control rig.
+
+    :param int numNodes:
+    :param list attributes:
+    :param int children:
+    :return: Container node
+    :rtype: str
+    """
+    # create nodes
+    nodes = [cmds.createNode("transform", name="container", skipSelect=True)]
+    for i in range(numNodes - 1):
+        parent = nodes[i // children]
+        node = cmds.createNode(
+            "transform",
+            name="ctrl{}".format(i),
+            parent=parent,
+            skipSelect=True
+        )
+        nodes.append(node)
+
+    # create animation
+    cmds.setKeyframe(nodes, attribute=attributes, time=1)
+    cmds.setKeyframe(nodes, attribute=attributes, time=100)
+
+    return nodes[0]
+
+
+def getContent(container):
+    """
+    :param str container:
+    :return: Container and all of its descendants
+    :rtype: list
+    """
+    nodes = cmds.listRelatives(
+        container,
+        allDescendents=True,
+        fullPath=True
+    ) or []
+    nodes.append(container)
+    nodes.sort(key=lambda x: len(x.split("|")))
+
+    return nodes
+
+
+# ----------------------------------------------------------------------------
+
+
+def getAnimationDataPerNode(nodes):
+    """
+    The per node discovery of the animation data, as it was used by the
+    AnimationExport before the bulk discovery was introduced. It is used as
+    the reference in the benchmark.
+
+    :param list nodes:
+    :return: Animation data
+    :rtype: OrderedDict
+    """
+    data = OrderedDict()
+    for node in nodes:
+        curves = animation.getIncomingAnimationCurves(node)
+        if curves:
+            plugs = animation.getPlugFromAnimationCurves(curves)
+            data[node] = zip(curves, plugs)
+
+    return data
+
+
+def benchmarkAnimationData(sizes=(250, 500, 1000, 2000, 4000), repeat=3):
+    """
+    Compare the per node discovery of the animation data with the bulk
+    discovery on synthetic rigs of increasing size. Note that the scene will
+    be cleared for every size.
+
+    :param list sizes:
+    :param int repeat:
+    :return: Results
+    :rtype: list
+    """
+    # run benchmark
+    results = benchmark.benchmark(
+        [
+            ("perNode", getAnimationDataPerNode),
+            ("bulk", animation.getAnimationData),
+        ],
+        sizes,
+        lambda size: getContent(createRig(size)),
+        repeat=repeat
+    )
+
+    # print results
+    print(benchmark.formatResults(results))
+
+    return results
+
+
+# ----------------------------------------------------------------------------
+
+
+def createExporter(numNodes):
+    """
+    Create a synthetic control rig and an exporter of which the pre roll is
+    prepared up until the mover keyframes.
+
+    :param int numNodes:
+    :return: Exporter
+    :rtype: AnimationExport
+    """
+    # create rig
+    container = createRig(numNodes)
+    root = cmds.createNode("transform", name="root", skipSelect=True)
+
+    # create exporter
+    exporter = AnimationExport(root, "benchmark", container, container)
+    exporter.transitionFrames = 10
+    exporter._moveFrame = exporter.startFrame - 10
+    exporter._zeroFrame = exporter._moveFrame - 1
+
+    # set keyframes
+    with contexts.DisableAutoKeyframe():
+        exporter._setAnimKeyframes()
+        exporter._setZeroKeyframes()
+
+    return exporter
+
+
+def setMoverKeyframesPerNode(exporter, maxIterations):
+    """
+    The iterative per node solve of the mover keyframes, as it was used by
+    the AnimationExport before the solve was done in memory. It is used as
+    the reference in the benchmark.
+
+    :param AnimationExport exporter:
+    :param int maxIterations:
+    """
+    # set frame
+    cmds.currentTime(exporter._moveFrame)
+
+    # get relative matrix
+    zeroMatrixList = transforms.getWorldMatrixAtTime(
+        exporter.mover,
+        exporter._zeroFrame
+    )
+    zeroMatrix = api.listToMatrix(zeroMatrixList)
+    animMatrixList = transforms.getWorldMatrixAtTime(
+        exporter.mover,
+        exporter.startFrame
+    )
+    animMatrix = api.listToMatrix(animMatrixList)
+
+    x, y, z = exporter._getMoverRotationVectors(zeroMatrix, animMatrix)
+    t = exporter._getMoverTranslation(zeroMatrixList, animMatrixList)
+    moverMatrix = api.channelsToMatrix(x, y, z, t)
+    relativeMatrix = moverMatrix * zeroMatrix.inverse()
+
+    # get target matrices
+    transformData = OrderedDict()
+    for transform in exporter._animationNodes + [exporter.solver]:
+        zeroMatrix = api.listToMatrix(
+            transforms.getWorldMatrixAtTime(transform, exporter._zeroFrame)
+        )
+        transformData[transform] = api.matrixToList(
+            zeroMatrix * relativeMatrix
+        )
+
+    # set positions
+    i = 0
+    while transformData:
+        for transform, transformMatrix in transformData.iteritems():
+            cmds.xform(transform, ws=True, matrix=transformMatrix)
+
+        for transform, transformMatrix in transformData.items():
+            connections = animation.getIncomingAnimationCurves(transform)
+            plugs = animation.getPlugFromAnimationCurves(connections)
+            rotate = any(plug.count("rotate") for plug in plugs)
+
+            currentMatrix = transforms.getWorldMatrixAtTime(transform)
+            start = 0 if rotate else 12
+            end = 16 if rotate else 15
+            difference = sum(
+                a1 - a2
+                for a1, a2 in zip(
+                    transformMatrix[start:end],
+                    currentMatrix[start:end]
+                )
+            )
+
+            if difference > 0.0001:
+                continue
+
+            cmds.setKeyframe(
+                plugs,
+                inTangentType="linear",
+                outTangentType="linear"
+            )
+            del transformData[transform]
+
+        i += 1
+        if i == maxIterations:
+            break
+
+
+def benchmarkPreRoll(sizes=(250, 500, 1000, 2000, 4000), repeat=3):
+    """
+    Compare the iterative per node solve of the mover keyframes with the in
+    memory solve on synthetic rigs of increasing size. Note that the scene
+    will be cleared for every size.
+
+    :param list sizes:
+    :param int repeat:
+    :return: Results
+    :rtype: list
+    """
+    # run benchmark
+    results = benchmark.benchmark(
+        [
+            ("perNode", lambda e: setMoverKeyframesPerNode(e, 10)),
+            ("inMemory", lambda e: e._setMoverKeyframes(10)),
+        ],
+        sizes,
+        createExporter,
+        repeat=repeat
+    )
+
+    # print results
+    print(benchmark.formatResults(results))
+
+    return results
@@ -0,0 +1,115 @@
+import os
+import json
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from zUtils import animation
+
+
+MANIFEST_EXTENSION = ".manifest.json"
+
+
+# ----------------------------------------------------------------------------
+
+
+def getManifestPath(output):
+    """
+    :param str output:
+    :return: Manifest path of the output
+    :rtype: str
+    """
+    return os.path.splitext(output)[0] + MANIFEST_EXTENSION
+
+
+def readManifest(output):
+    """
+    :param str output:
+    :return: Manifest of the output
+    :rtype: dict/None
+    """
+    path = getManifestPath(output)
+    if not os.path.exists(path):
+        return
+
+    with open(path, "r") as f:
+        try:
+            return json.load(f)
+        except ValueError:
+            return
+
+
+def writeManifest(output, fingerprint, job):
+    """
+    :param str output:
+    :param str fingerprint:
+    :param str job:
+    """
+    manifest = OrderedDict(
+        [
+            ("output", output),
+            ("fingerprint", fingerprint),
+            ("job", job),
+        ]
+    )
+
+    with open(getManifestPath(output), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getFingerprint(exporter, job):
+    """
+    Get the fingerprint of an export. The fingerprint is a hash of the keys
+    and tangents of all of the animation curves and the plugs they drive,
+    the container and mover, the additional keyframes, the transition frames,
+    the consumed names and the export job.
+
+    :param AnimationExport exporter:
+    :param str job:
+    :return: Fingerprint
+    :rtype: str
+    """
+    # variables
+    fingerprint = hashlib.sha1()
+
+    # add settings
+    settings = [
+        job,
+        exporter.container,
+        exporter.mover,
+        exporter.transitionFrames,
+        sorted(exporter.additionalKeyframes.items()),
+        sorted(exporter.consumedNames or []),
+        [
+            (node, connections)
+            for node, connections in exporter._animationData.iteritems()
+        ]
+    ]
+    fingerprint.update(json.dumps(settings).encode("utf-8"))
+
+    # add keyframe data
+    data = animation.getKeyframeData(exporter._animationCurves)
+    for key, values in data.iteritems():
+        fingerprint.update(key.encode("utf-8"))
+        fingerprint.update(np.ascontiguousarray(values).tobytes())
+
+    return fingerprint.hexdigest()
+
+
+def isCached(output, fingerprint):
+    """
+    :param str output:
+    :param str fingerprint:
+    :return: Cached state, true when the output exists and was exported with
+        the same fingerprint
+    :rtype: bool
+    """
+    # validate output
+    if not os.path.exists(output):
+        return False
+
+    # validate manifest
+    manifest = readManifest(output) or {}
+    return manifest.get("fingerprint") == fingerprint
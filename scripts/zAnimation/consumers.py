@@ -0,0 +1,44 @@
+import json
+from maya import cmds
+from zUtils import path
+
+
+# ----------------------------------------------------------------------------
+
+
+def getConsumedNodes(root, names):
+    """
+    Get the nodes in the hierarchy of the root of which the namespace-less
+    name matches one of the provided names. These are the nodes that will
+    be connected by the consumer of the export.
+
+    :param str root:
+    :param list names:
+    :return: Consumed nodes as full paths
+    :rtype: list
+    """
+    names = set(names)
+    nodes = cmds.listRelatives(root, allDescendents=True, fullPath=True) or []
+    return [node for node in nodes if path.getName(node) in names]
+
+
+# ----------------------------------------------------------------------------
+
+
+def readNames(filePath):
+    """
+    :param str filePath:
+    :return: Consumed names
+    :rtype: list
+    """
+    with open(filePath, "r") as f:
+        return json.load(f)
+
+
+def writeNames(filePath, names):
+    """
+    :param str filePath:
+    :param list names:
+    """
+    with open(filePath, "w") as f:
+        json.dump(sorted(names), f, indent=4)
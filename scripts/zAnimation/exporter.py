@@ -1,14 +1,21 @@
+import os
+import json
+import tempfile
+import numpy as np
 from maya import cmds
 from collections import OrderedDict
 from zUtils import (
     api,
+    path,
     contexts,
     animation,
     transforms,
+    telemetry,
     attributes,
     decorators
 )
 
+from . import cache, consumers, pose, pruning, segmentation, transport
 from .base import Animation
 from .tags import (
     ZIVA_ANIMATION,
@@ -17,21 +24,44 @@ from .tags import (
     ZIVA_ANIMATION_TRANSITION,
     ZIVA_ANIMATION_CONTAINER,
     ZIVA_ANIMATION_MOVER,
-    ZIVA_SOLVER_PARENT
+    ZIVA_SOLVER_PARENT,
+    ZIVA_ANIMATION_ZERO_POSE
 )
 
 
+# ----------------------------------------------------------------------------
+
+
+MATRIX_TOLERANCE = 0.0001
+TELEMETRY_EXTENSION = ".telemetry.json"
+
+
+def getTelemetryPath(output):
+    """
+    :param str output:
+    :return: Telemetry path of the output
+    :rtype: str
+    """
+    return os.path.splitext(output)[0] + TELEMETRY_EXTENSION
+
+
+# ----------------------------------------------------------------------------
+
+
 class AnimationExport(Animation):
     def __init__(self, root, character=None, container=None, mover=None):
         super(AnimationExport, self).__init__(root, character)
 
         # variables
+        self._animationData = OrderedDict()
         self._animationPlugs = []
         self._animationNodes = []
         self._animationCurves = []
         self._additionalKeyframes = {}
+        self._consumedNames = None
         self._moveFrame = None
         self._zeroFrame = None
+        self._telemetry = telemetry.Telemetry()
 
         # validate container
         if not container and not self.container:
@@ -103,6 +133,21 @@ class AnimationExport(Animation):
 
     # ------------------------------------------------------------------------
 
+    @property
+    def telemetry(self):
+        """
+        The telemetry records the wall time of the stages of the export. It
+        is written as a sidecar next to the alembic cache when exporting.
+        The maya command counts of the stages are only recorded when
+        counting commands is enabled on the telemetry.
+
+        :return: Telemetry
+        :rtype: Telemetry
+        """
+        return self._telemetry
+
+    # ------------------------------------------------------------------------
+
     @decorators.preserveSelection
     def _createSolverParent(self):
         """
@@ -184,32 +229,184 @@ class AnimationExport(Animation):
 
     def addAdditionalKeyframe(self, plug, value):
         """
+        When a zero pose is stored on the root node, the additional keyframe
+        is stored as an override of the zero pose as well.
+
         :param str plug:
         :param int/float value:
         """
         self.additionalKeyframes[plug] = value
 
+        # update zero pose
+        zeroPose = self.zeroPose
+        if zeroPose:
+            pose.setPoseOverride(zeroPose, plug, value)
+            self.zeroPose = zeroPose
+
     def removeAdditionalKeyframe(self, plug):
         """
+        When a zero pose is stored on the root node, the additional keyframe
+        is removed from the overrides of the zero pose as well, which
+        prevents the removed keyframe from still being keyed on the zero
+        frame.
+
         :param str plug:
         """
         if plug in self.additionalKeyframes.keys():
             del self.additionalKeyframes[plug]
 
+        # update zero pose
+        zeroPose = self.zeroPose
+        if zeroPose and pose.removePoseOverride(zeroPose, plug):
+            self.zeroPose = zeroPose
+
     # ------------------------------------------------------------------------
 
+    @property
+    def consumedNames(self):
+        """
+        The consumed names are the names of the nodes the consumer of the
+        export will connect to, for example the nodes in the animation group
+        of a muscle rig. When set, only the nodes in the hierarchy of the root
+        matching these names are exported. When None, the entire hierarchy is
+        exported.
+
+        :param list/None consumedNames:
+        :return: Consumed names
+        :rtype: list/None
+        """
+        return self._consumedNames
+
+    @consumedNames.setter
+    def consumedNames(self, consumedNames):
+        self._consumedNames = \
+            list(consumedNames) if consumedNames is not None else None
+
+    def loadConsumedNames(self, filePath):
+        """
+        :param str filePath:
+        :return: Consumed names
+        :rtype: list
+        """
+        self.consumedNames = consumers.readNames(filePath)
+        return self.consumedNames
+
+    def _getConsumedNodes(self):
+        """
+        The solver parent is always consumed, as it drives the solver of the
+        muscle rig, even when its name is missing from the consumed names.
+
+        :return: Consumed nodes as full paths
+        :rtype: list/None
+        """
+        # validate consumed names
+        if self.consumedNames is None:
+            return
+
+        # get consumed nodes
+        nodes = consumers.getConsumedNodes(self.root, self.consumedNames)
+
+        # add solver
+        if self.solver:
+            solver = cmds.ls(self.solver, long=True)[0]
+            if solver not in nodes:
+                nodes.append(solver)
+
+        self.telemetry.update("consumers", consumedNodes=len(nodes))
+
+        return nodes
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def zeroPose(self):
+        """
+        The zero pose holds the default values of the animated plugs and the
+        additional keyframes of the rig. As the zero pose is the same for
+        every animation of a rig it can be captured once and stored on the
+        root node, which prevents the default values from being queried for
+        every pre roll.
+
+        :param dict zeroPose:
+        :return: Zero pose
+        :rtype: OrderedDict/None
+        """
+        # validate attribute
+        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_ZERO_POSE)
+        if not cmds.objExists(plug):
+            return
+
+        # get zero pose
+        value = self._getAttr(ZIVA_ANIMATION_ZERO_POSE)
+        if value:
+            return json.loads(value, object_pairs_hook=OrderedDict)
+
+    @zeroPose.setter
+    def zeroPose(self, zeroPose):
+        # create attribute
+        attributes.createTag(self.root, ZIVA_ANIMATION_ZERO_POSE, None)
+
+        # set zero pose
+        value = json.dumps(zeroPose)
+        plug = attributes.getPlug(self.root, ZIVA_ANIMATION_ZERO_POSE)
+        cmds.setAttr(plug, value, type="string")
+        attributes.ATTRIBUTE_CACHE.set(
+            self.root,
+            ZIVA_ANIMATION_ZERO_POSE,
+            value
+        )
+
+    def captureZeroPose(self, filePath=None):
+        """
+        Capture the default values of the animated plugs together with the
+        additional keyframes and store it on the root node. The zero pose
+        can also be written to disk so it can be loaded onto other scenes
+        containing the same rig.
+
+        :param str/None filePath:
+        :return: Zero pose
+        :rtype: OrderedDict
+        """
+        plugs = self._animationPlugs
+        zeroPose = pose.createPose(
+            OrderedDict(zip(plugs, attributes.getDefaultValues(plugs))),
+            self.additionalKeyframes
+        )
+        self.zeroPose = zeroPose
+
+        if filePath:
+            pose.writePose(filePath, zeroPose)
+
+        return zeroPose
+
+    def loadZeroPose(self, filePath):
+        """
+        :param str filePath:
+        :return: Zero pose
+        :rtype: OrderedDict
+        """
+        zeroPose = pose.readPose(filePath)
+        self.zeroPose = zeroPose
+
+        return zeroPose
+
+    # ------------------------------------------------------------------------
+
+    @decorators.recordStage
     def _updateAnimationData(self):
         """
         When the container updates this function should be called to populate
         the animation data. This animation data is used in both the shift
         animation and adding pre roll animation functions.
         """
+        # reset animation data
+        self._animationData = OrderedDict()
+        self._animationPlugs = []
+        self._animationNodes = []
+        self._animationCurves = []
+
         # validate container
         if not self.container:
-            self._animationPlugs = []
-            self._animationNodes = []
-            self._animationCurves = []
-
             self.startFrame = None
             self.endFrame = None
 
@@ -218,20 +415,21 @@ class AnimationExport(Animation):
         # get content
         nodes = self._getTransformContent(self.container)
 
-        # loop nodes
-        for node in nodes:
-            # get animation curves
-            curves = animation.getIncomingAnimationCurves(node)
+        # get animation data in a single pass, the order of the nodes is
+        # preserved so the animation nodes remain sorted by hierarchy.
+        self._animationData = animation.getAnimationData(nodes)
+
+        # populate animation variables
+        curves = set()
+        for node, connections in self._animationData.iteritems():
+            self._animationNodes.append(node)
 
-            # validate curves
-            if curves:
-                # get plugs
-                plugs = animation.getPlugFromAnimationCurves(curves)
+            for curve, plug in connections:
+                if curve not in curves:
+                    curves.add(curve)
+                    self._animationCurves.append(curve)
 
-                # populate animation variables
-                self._animationPlugs.extend(plugs)
-                self._animationNodes.append(node)
-                self._animationCurves.extend(curves)
+                self._animationPlugs.append(plug)
 
         # set animation range
         self.startFrame, self.endFrame = \
@@ -265,27 +463,6 @@ class AnimationExport(Animation):
 
     # ------------------------------------------------------------------------
 
-    def _getMatrixDifference(self, sourceMatrix, targetMatrix, start, end):
-        """
-        :param list sourceMatrix:
-        :param list targetMatrix:
-        :param int start:
-        :param int end:
-        :return: Matrix difference
-        :rtype: float
-        """
-        return sum(
-            [
-                a1 - a2
-                for a1, a2 in zip(
-                    sourceMatrix[start:end],
-                    targetMatrix[start:end]
-                )
-            ]
-        )
-
-    # ------------------------------------------------------------------------
-
     def _getMoverRotationVectors(self, zeroMatrix, animMatrix):
         """
         Get the mover rotation vectors with the constraint that the rotation
@@ -325,26 +502,7 @@ class AnimationExport(Animation):
 
     # ------------------------------------------------------------------------
 
-    def _splitPlugsByChannel(self, plugs):
-        """
-        :param list plugs:
-        :return: Split plugs
-        :rtype: dict
-        """
-        data = {}
-        channels = ["translate", "rotate", "scale"]
-
-        for plug in plugs:
-            for channel in channels:
-                if plug.count(channel):
-                    if not channel in data.keys():
-                        data[channel] = []
-                    data[channel].append(plug)
-
-        return data
-
-    # ------------------------------------------------------------------------
-
+    @decorators.recordStage
     def _setAnimKeyframes(self):
         """
         The animation pose is already keyframed, as it is the start of all of
@@ -362,60 +520,120 @@ class AnimationExport(Animation):
             inTangentType="linear"
         )
 
+    @decorators.recordStage
     def _setZeroKeyframes(self):
         """
-        The zero pose is retrieved by changing all of the attributes back to
-        its default value.
+        The zero pose is retrieved from the zero pose stored on the root node.
+        If no zero pose is stored it is captured first, animated plugs that
+        are missing from the stored zero pose are added to it. The zero pose
+        is keyed in bulk, plugs that share a value are keyed at once.
         """
         # set frame
         cmds.currentTime(self._zeroFrame)
 
-        # set default values
-        for plug in self._animationPlugs:
-            attributes.setDefaultValue(plug)
-
-        # set additional keyframe values
-        for plug, value in self.additionalKeyframes.iteritems():
-            cmds.setAttr(plug, value)
-
-        # get nodes
-        nodes = []
-        nodes.append(self.solver)
-        nodes.extend(self._animationPlugs)
-        nodes.extend(self.additionalKeyframes.keys())
+        # get zero pose
+        zeroPose = self.zeroPose
+        if not zeroPose:
+            zeroPose = self.captureZeroPose()
+        elif pose.updatePose(zeroPose, self._animationPlugs):
+            self.zeroPose = zeroPose
+
+        # get zero pose values
+        values = pose.getPoseValues(
+            zeroPose,
+            self._animationPlugs,
+            path.getNamespace(self.root, nested=True),
+            self.additionalKeyframes
+        )
 
         # set keyframes
+        pose.setPoseKeyframes(values, self._zeroFrame)
         cmds.setKeyframe(
-            nodes,
+            self.solver,
             inTangentType="linear",
             outTangentType="linear"
         )
 
-    def _setMoverKeyframes(self, maxInterations):
+    def _getAncestorMask(self, nodes):
+        """
+        :param list nodes:
+        :return: Mask of nodes that have an ancestor in the provided nodes
+        :rtype: numpy.ndarray
+        """
+        # get full paths
+        paths = [api.getMDagPath(node).fullPathName() for node in nodes]
+        lookup = set(paths)
+
+        # validate ancestors
+        mask = []
+        for fullPath in paths:
+            sections = fullPath.split("|")
+            mask.append(
+                any(
+                    "|".join(sections[:i]) in lookup
+                    for i in range(2, len(sections))
+                )
+            )
+
+        return np.array(mask, dtype=bool)
+
+    def _getMatrixErrors(self, sourceMatrices, targetMatrices, rotations):
+        """
+        Get the error between the source and target matrices. The error is
+        the norm of the difference in translation, when the rotation mask is
+        true for a matrix the norm of the difference of the rotation and
+        scale part of the matrix is taken into account as well.
+
+        :param numpy.ndarray sourceMatrices:
+        :param numpy.ndarray targetMatrices:
+        :param numpy.ndarray rotations:
+        :return: Matrix errors
+        :rtype: numpy.ndarray
+        """
+        difference = sourceMatrices - targetMatrices
+        translation = np.linalg.norm(difference[:, 3, :3], axis=1)
+        rotation = np.linalg.norm(difference[:, :3, :3], axis=(1, 2))
+
+        return np.where(
+            rotations,
+            np.maximum(translation, rotation),
+            translation
+        )
+
+    # ------------------------------------------------------------------------
+
+    @decorators.recordStage
+    def _setMoverKeyframes(self, maxIterations):
         """
         The mover pose is the closest the zero pose can get to the animation
         pose by just moving the mover node. The mover node is allowed to be
         rotated in Y and moved in X and Z.
 
-        :param int maxInterations:
-        """
-        # variable
-        i = 0
+        The target world matrices are the zero world matrices moved relative
+        to the mover. All of the local matrices are calculated in memory, the
+        parent matrices of transforms with an animated ancestor are moved
+        relative to the mover as well. This allows all of the transforms to
+        be set in a single pass. Transforms that are influenced by other
+        transforms, by constraints for example, are corrected using their
+        current parent matrix until they are within tolerance or the maximum
+        amount of iterations is reached. Only the transforms that are set in
+        a pass are validated, the matrices are read and written through the
+        API without any command round trips.
 
+        :param int maxIterations:
+        """
         # set frame
         cmds.currentTime(self._moveFrame)
 
         # get bind and anim matrices
-        zeroMatrixList = transforms.getWorldMatrixAtTime(
-            self.mover,
-            self._zeroFrame
-        )
+        zeroMatrixList, animMatrixList = [
+            matrix.flatten().tolist()
+            for matrix in transforms.getWorldMatricesAtTimes(
+                [self.mover],
+                [self._zeroFrame, self.startFrame]
+            )[0]
+        ]
         zeroMatrix = api.listToMatrix(zeroMatrixList)
-
-        animMatrixList = transforms.getWorldMatrixAtTime(
-            self.mover,
-            self.startFrame
-        )
         animMatrix = api.listToMatrix(animMatrixList)
 
         # construct mover matrix
@@ -426,76 +644,115 @@ class AnimationExport(Animation):
         # construct mover matrix
         moverMatrix = api.channelsToMatrix(x, y, z, t)
         relativeMatrix = moverMatrix * zeroMatrix.inverse()
-
-        # store world positions of all of the transforms, as controls can
-        # influence each other it is important to check if the set transform
-        # is set to the correct position.
-        transformData = OrderedDict()
-        for transform in self._animationNodes + [self.solver]:
-            # get transformation matrix
-            zeroMatrixList = transforms.getWorldMatrixAtTime(
-                transform,
-                self._zeroFrame
+        relativeMatrix = np.array(api.matrixToList(relativeMatrix))
+        relativeMatrix = relativeMatrix.reshape(4, 4)
+
+        # get transforms and their keyed plugs, the solver is keyed in the
+        # zero keyframes so its animation curves are not part of the
+        # animation data.
+        nodes = self._animationNodes + [self.solver]
+        plugs = [
+            [plug for _, plug in self._animationData[node]]
+            for node in self._animationNodes
+        ]
+        plugs.append(
+            animation.getPlugFromAnimationCurves(
+                animation.getIncomingAnimationCurves(self.solver)
             )
-            zeroMatrix = api.listToMatrix(zeroMatrixList)
+        )
 
-            # get transforms world position as matrix
-            transformMatrix = api.matrixToList(zeroMatrix * relativeMatrix)
+        # exclude rotations if no rotation plugs are found
+        rotations = np.array(
+            [any(plug.count("rotate") for plug in p) for p in plugs],
+            dtype=bool
+        )
+
+        # get target world matrices
+        targetMatrices = np.matmul(
+            transforms.getWorldMatricesAtTimes(nodes, [self._zeroFrame])[:, 0],
+            relativeMatrix
+        )
 
-            # store data
-            transformData[transform] = transformMatrix
+        # get target parent matrices, the parent of transforms with an
+        # ancestor in the list of transforms is moved with that ancestor.
+        parentMatrices = transforms.getMatrices(nodes, "parentMatrix[0]")
+        ancestors = self._getAncestorMask(nodes)
+        if ancestors.any():
+            parentMatrices[ancestors] = np.matmul(
+                transforms.getMatrices(
+                    [n for n, a in zip(nodes, ancestors) if a],
+                    "parentMatrix[0]",
+                    self._zeroFrame
+                ),
+                relativeMatrix
+            )
 
         # set positions
-        while transformData:
-            # set matrices
-            for transform, transformMatrix in transformData.iteritems():
-                cmds.xform(transform, ws=True, matrix=transformMatrix)
-
-            # validate matrices
-            for transform, transformMatrix in transformData.iteritems():
-                # get connect animation curves to only keyframe necessary
-                # attributes
-                connections = animation.getIncomingAnimationCurves(transform)
-                plugs = animation.getPlugFromAnimationCurves(connections)
-                plugsData = self._splitPlugsByChannel(plugs)
-
-                # get current matrix
-                currentMatrix = transforms.getWorldMatrixAtTime(transform)
-
-                # get matrix range
-                # exclude rotations if no rotation plugs are found
-                start = 0 if plugsData.get("rotate") else 12
-                end = 16 if plugsData.get("rotate") else 15
-
-                # get numeric difference value between matrices
-                difference = self._getMatrixDifference(
-                    transformMatrix,
-                    currentMatrix,
-                    start,
-                    end
+        indices = np.arange(len(nodes))
+        iterations = 0
+        for _ in range(maxIterations):
+            iterations += 1
+
+            # set local matrices
+            transforms.setLocalMatrices(
+                [nodes[i] for i in indices],
+                np.matmul(
+                    targetMatrices[indices],
+                    np.linalg.inv(parentMatrices[indices])
                 )
+            )
 
-                # validate difference
-                if difference > 0.0001:
-                    continue
+            # validate matrices of the transforms set in this pass
+            errors = self._getMatrixErrors(
+                transforms.getMatrices(
+                    [nodes[i] for i in indices],
+                    "worldMatrix[0]"
+                ),
+                targetMatrices[indices],
+                rotations[indices]
+            )
 
-                # set keyframes
-                cmds.setKeyframe(
-                    plugs,
-                    inTangentType="linear",
-                    outTangentType="linear"
-                )
+            # get unresolved transforms
+            indices = indices[errors > MATRIX_TOLERANCE]
+            if not indices.size:
+                break
 
-                # remove from dict
-                del transformData[transform]
+            # get current parent matrices of unresolved transforms
+            parentMatrices[indices] = transforms.getMatrices(
+                [nodes[i] for i in indices],
+                "parentMatrix[0]"
+            )
 
-            # update iteration
-            i += 1
+        # store iterations
+        self.telemetry.update(
+            "_setMoverKeyframes",
+            iterations=iterations,
+            unresolved=len(indices)
+        )
 
-            # handle max iterations to not get stuck in while loop when
-            # transforms cannot be resolved
-            if i == maxInterations:
-                break
+        # warn about unresolved transforms
+        if indices.size:
+            cmds.warning(
+                "Unable to resolve the mover pose of {}!".format(
+                    ", ".join(nodes[i] for i in indices)
+                )
+            )
+
+        # set keyframes of resolved transforms
+        unresolved = set(indices)
+        resolved = [
+            plug
+            for i, p in enumerate(plugs)
+            if i not in unresolved
+            for plug in p
+        ]
+
+        if resolved:
+            cmds.setKeyframe(
+                resolved,
+                inTangentType="linear",
+                outTangentType="linear"
+            )
 
         if self.additionalKeyframes:
             # set additional keyframe values
@@ -571,16 +828,50 @@ class AnimationExport(Animation):
 
     # ------------------------------------------------------------------------
 
-    @decorators.loadPlugin("AbcExport.mll")
-    def export(self, output, step=1):
+    def writeTelemetry(self, output, step=1):
         """
-        Export an alembic cache of the root node. All the animation will
-        be shifted to frame 1001 for consistency and a pre roll will be added
-        to the animation.
+        Write the telemetry as a json sidecar next to the alembic cache. The
+        curve, node and frame counts and the size of the alembic cache are
+        added to the telemetry. The telemetry is cleared after it is written,
+        which means the next export only records its own stages.
 
         :param str output:
         :param int/float step:
         """
+        # get frame count
+        frames = int(round((self.endFrame - self.startFrame) / step)) + 1
+
+        # get file size
+        size = os.path.getsize(output) if os.path.exists(output) else None
+
+        # store data
+        self.telemetry.set("output", output)
+        self.telemetry.set("curves", len(self._animationCurves))
+        self.telemetry.set("nodes", len(self._animationNodes))
+        self.telemetry.set("frames", frames)
+        self.telemetry.set("step", step)
+        self.telemetry.set("size", size)
+
+        # write telemetry
+        self.telemetry.write(getTelemetryPath(output))
+        self.telemetry.clear()
+
+    def getExportJob(self, output, step=1, frameRange=None, selection=False):
+        """
+        Get the alembic export job of the root node. The start and end frame
+        are updated to match the range of the animation curves. The frame
+        range of the job can be limited to part of the animation, the start
+        and end frame will still reflect the range of the animation curves.
+        The job can be limited to the selected nodes in the hierarchy of the
+        root node.
+
+        :param str output:
+        :param int/float step:
+        :param tuple/None frameRange:
+        :param bool selection:
+        :return: Alembic export job
+        :rtype: str
+        """
         # get frame range
         start, end = animation.getAnimationRange(self._animationCurves)
 
@@ -588,6 +879,10 @@ class AnimationExport(Animation):
         self.startFrame = start
         self.endFrame = end
 
+        # get job frame range
+        if frameRange:
+            start, end = frameRange
+
         # construct attributes
         attrs = [
             "-attr {}".format(attr)
@@ -600,23 +895,230 @@ class AnimationExport(Animation):
             ]
         ]
 
+        # construct flags
+        flags = [
+            "-worldSpace",
+            "-writeVisibility",
+            "-eulerFilter",
+            "-dataFormat ogawa"
+        ]
+
+        if selection:
+            flags.append("-selection")
+
         # construct command
-        cmd = " ".join(
+        return " ".join(
             [
                 "-frameRange {} {}".format(start, end),
                 "-step {}".format(step),
                 " ".join(attrs),
-                "-worldSpace",
-                "-writeVisibility",
-                "-eulerFilter",
-                "-dataFormat ogawa",
+                " ".join(flags),
                 "-root '{}'".format(self.root),
                 "-file '{}'".format(output)
             ]
         )
 
+    @decorators.preserveSelection
+    def _exportConsumed(self, cmd):
+        """
+        Export only the nodes in the hierarchy of the root node that are
+        consumed.
+
+        :param str cmd:
+        """
+        # select consumed nodes
+        nodes = self._getConsumedNodes()
+        cmds.select(pruning.getSelection(self.root, nodes), replace=True)
+
+        # export consumed nodes
+        with self.telemetry.stage("AbcExport"):
+            cmds.AbcExport(j=cmd)
+
+    @decorators.preserveSelection
+    def _exportPruned(self, output, cmd, step, measure=False):
+        """
+        Export the animated nodes in the hierarchy of the root node to the
+        output and the static nodes only once to a separate alembic cache
+        next to the output, which is imported into the hierarchy using
+        pruning.importStaticNodes. The sizes and durations of the exports
+        are stored in the telemetry. When measuring, the unpruned hierarchy
+        is exported to a temporary reference alembic cache as well to
+        measure the bytes and time saved. Only consumed nodes are exported
+        if consumed names are set.
+
+        :param str output:
+        :param str cmd:
+        :param int/float step:
+        :param bool measure:
+        """
+        # analyse static nodes
+        with self.telemetry.stage("pruning"):
+            static, animated = pruning.analyseStaticNodes(
+                self.root,
+                self.startFrame,
+                self.endFrame
+            )
+
+        # filter consumed nodes
+        nodes = self._getConsumedNodes()
+        if nodes is not None:
+            nodes = set(nodes)
+            static = [node for node in static if node in nodes]
+            animated = [node for node in animated if node in nodes]
+
+        # get jobs
+        jobs = [("AbcExport", output, cmd, animated)]
+
+        staticOutput = pruning.getStaticPath(output)
+        if static:
+            staticCmd = self.getExportJob(
+                staticOutput,
+                step,
+                (self.startFrame, self.startFrame),
+                selection=True
+            )
+            jobs.append(("AbcExportStatic", staticOutput, staticCmd, static))
+        elif os.path.exists(staticOutput):
+            os.remove(staticOutput)
+
+        reference = None
+        if measure:
+            handle, reference = tempfile.mkstemp(suffix=".abc")
+            os.close(handle)
+
+            referenceCmd = self.getExportJob(reference, step, selection=True)
+            jobs.append(
+                (
+                    "AbcExportReference",
+                    reference,
+                    referenceCmd,
+                    static + animated
+                )
+            )
+
+        # export jobs
+        durations = {}
+        try:
+            for stage, jobOutput, job, selection in jobs:
+                cmds.select(
+                    pruning.getSelection(self.root, selection),
+                    replace=True
+                )
+                with self.telemetry.stage(stage):
+                    with contexts.Timer() as timer:
+                        cmds.AbcExport(j=job)
+
+                durations[jobOutput] = timer.elapsed
+
+            # report savings
+            report = pruning.getReport(
+                static,
+                animated,
+                durations,
+                output,
+                reference
+            )
+            self.telemetry.update("pruning", **report)
+        finally:
+            if reference and os.path.exists(reference):
+                os.remove(reference)
+
+    @decorators.loadPlugin("AbcExport.mll")
+    def export(self, output, step=1, force=False, prune=False,
+               measure=False):
+        """
+        Export an alembic cache of the root node. All the animation will
+        be shifted to frame 1001 for consistency and a pre roll will be added
+        to the animation.
+
+        A manifest containing the fingerprint of the export is written next
+        to the alembic cache. If the alembic cache exists and was exported
+        with the same fingerprint the export is skipped, unless forced.
+
+        When pruning, nodes in the hierarchy that don't change over the frame
+        range are left out of the alembic cache and exported only once to
+        a separate static alembic cache next to the output. When measuring
+        a pruned export, the bytes and time saved are measured against an
+        unpruned export. When consumed names are set, only the matching
+        nodes are exported.
+
+        :param str output:
+        :param int/float step:
+        :param bool force:
+        :param bool prune:
+        :param bool measure:
+        :return: Exported state
+        :rtype: bool
+        """
+        # construct command
+        cmd = self.getExportJob(
+            output,
+            step,
+            selection=prune or self.consumedNames is not None
+        )
+
+        # validate cache
+        fingerprint = cache.getFingerprint(self, cmd)
+        if not force and cache.isCached(output, fingerprint):
+            print("DEBUG: AbcExportCommand | Skipped, cached | {}".format(cmd))
+            self.telemetry.clear()
+            return False
+
         # debug
         print("DEBUG: AbcExportCommand | {}".format(cmd))
 
         # execute command
-        cmds.AbcExport(j=cmd)
+        if prune:
+            self._exportPruned(output, cmd, step, measure)
+        elif self.consumedNames is not None:
+            self._exportConsumed(cmd)
+        else:
+            with self.telemetry.stage("AbcExport"):
+                cmds.AbcExport(j=cmd)
+
+        # write manifest and telemetry
+        cache.writeManifest(output, fingerprint, cmd)
+        self.writeTelemetry(output, step)
+
+        return True
+
+    # ------------------------------------------------------------------------
+
+    def exportSegments(self, output, segments=4, overlap=1, step=1,
+                       processes=None):
+        """
+        Export the animation as multiple overlapping alembic segments that
+        are exported in parallel in standalone maya processes. A manifest
+        listing the segments in order is written next to the output path,
+        which can be read by the MusclesAnimationImport to consume the
+        segments as one continuous animation.
+
+        :param str output:
+        :param int segments:
+        :param int/float overlap:
+        :param int/float step:
+        :param int/None processes:
+        :return: Manifest path
+        :rtype: str
+        """
+        return segmentation.exportSegments(
+            self,
+            output,
+            segments,
+            overlap,
+            step,
+            processes
+        )
+
+    def exportCurves(self, output):
+        """
+        Export the animation curves as compact numpy arrays next to the
+        output path. This can be used as an alternative to the alembic cache
+        when transferring animation between rigs that share the same control
+        rig, the curves can be rebuilt using transport.importCurves.
+
+        :param str output:
+        :return: Curves path
+        :rtype: str
+        """
+        return transport.exportCurves(self, output)
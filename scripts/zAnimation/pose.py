@@ -0,0 +1,156 @@
+import json
+from maya import cmds
+from collections import OrderedDict
+from zUtils import path, attributes
+
+
+# ----------------------------------------------------------------------------
+
+
+def createPose(defaults=None, overrides=None):
+    """
+    A pose stores the default values and override values of plugs without
+    namespaces, which allows the pose to be shared between references of
+    the same rig.
+
+    :param dict/None defaults:
+    :param dict/None overrides:
+    :return: Pose
+    :rtype: OrderedDict
+    """
+    pose = OrderedDict()
+    pose["defaults"] = OrderedDict(
+        (path.removeNamespace(plug), value)
+        for plug, value in (defaults or {}).iteritems()
+    )
+    pose["overrides"] = OrderedDict(
+        (path.removeNamespace(plug), value)
+        for plug, value in (overrides or {}).iteritems()
+    )
+
+    return pose
+
+
+def updatePose(pose, plugs):
+    """
+    Update the defaults of the pose with the plugs that are not yet part of
+    the pose.
+
+    :param dict pose:
+    :param list plugs:
+    :return: Updated state
+    :rtype: bool
+    """
+    missing = [
+        plug
+        for plug in plugs
+        if path.removeNamespace(plug) not in pose["defaults"]
+    ]
+
+    if not missing:
+        return False
+
+    defaults = attributes.getDefaultValues(missing)
+    for plug, value in zip(missing, defaults):
+        pose["defaults"][path.removeNamespace(plug)] = value
+
+    return True
+
+
+def setPoseOverride(pose, plug, value):
+    """
+    :param dict pose:
+    :param str plug:
+    :param int/float value:
+    """
+    pose["overrides"][path.removeNamespace(plug)] = value
+
+
+def removePoseOverride(pose, plug):
+    """
+    :param dict pose:
+    :param str plug:
+    :return: Removed state
+    :rtype: bool
+    """
+    plug = path.removeNamespace(plug)
+    if plug not in pose["overrides"]:
+        return False
+
+    del pose["overrides"][plug]
+    return True
+
+
+def getPoseValues(pose, plugs, namespace=None, overrides=None):
+    """
+    Get the values of the provided plugs from the pose. The overrides stored
+    in the pose are resolved using the namespace and added to the values,
+    after which the provided overrides are applied.
+
+    :param dict pose:
+    :param list plugs:
+    :param str/None namespace:
+    :param dict/None overrides:
+    :return: Pose values
+    :rtype: OrderedDict
+    """
+    values = OrderedDict(
+        (plug, pose["defaults"].get(path.removeNamespace(plug)))
+        for plug in plugs
+    )
+
+    for plug, value in pose["overrides"].iteritems():
+        plug = path.addNamespace(plug, namespace) if namespace else plug
+        values[plug] = value
+
+    values.update(overrides or {})
+
+    return values
+
+
+def setPoseKeyframes(values, time):
+    """
+    Key the pose values on the provided time. Plugs that share the same
+    value are keyed in a single command, plugs without a value are keyed on
+    their current value.
+
+    :param dict values:
+    :param int/float time:
+    """
+    # group plugs by value
+    groups = OrderedDict()
+    for plug, value in values.iteritems():
+        groups.setdefault(value, []).append(plug)
+
+    # set keyframes
+    for value, plugs in groups.iteritems():
+        kwargs = {"value": value} if value is not None else {}
+        cmds.setKeyframe(
+            plugs,
+            time=time,
+            inTangentType="linear",
+            outTangentType="linear",
+            **kwargs
+        )
+
+
+# ----------------------------------------------------------------------------
+
+
+def readPose(filePath):
+    """
+    :param str filePath:
+    :return: Pose
+    :rtype: OrderedDict
+    """
+    with open(filePath, "r") as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def writePose(filePath, pose):
+    """
+    :param str filePath:
+    :param dict pose:
+    """
+    with open(filePath, "w") as f:
+        json.dump(pose, f, indent=4)
@@ -0,0 +1,350 @@
+import os
+import numpy as np
+from maya import cmds, OpenMaya
+from collections import OrderedDict
+from zUtils import api, animation, transforms, decorators
+
+
+TOLERANCE = 0.00001
+STATIC_EXTENSION = ".static.abc"
+
+
+# ----------------------------------------------------------------------------
+
+
+def getFlatAnimationCurves(animCurves, tolerance=TOLERANCE):
+    """
+    Get the animation curves that don't change value over time. An
+    animation curve is flat when all of its keys have the same value and
+    all of its tangents are flat. Animation curves without keys are flat as
+    well.
+
+    :param list animCurves:
+    :param float tolerance:
+    :return: Flat animation curves
+    :rtype: list
+    """
+    # get keyframe data
+    data = animation.getKeyframeData(animCurves)
+    counts = data["counts"]
+
+    # validate keys
+    flat = np.ones(len(animCurves), dtype=bool)
+    keyed = counts > 0
+    if keyed.any():
+        # get the index of the first key of every keyed animation curve
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])[keyed]
+
+        # get value range
+        values = data["values"].astype(float)
+        ranges = (
+            np.maximum.reduceat(values, offsets) -
+            np.minimum.reduceat(values, offsets)
+        )
+
+        # get tangent angles
+        angles = np.maximum(
+            np.abs(data["inAngles"].astype(float)),
+            np.abs(data["outAngles"].astype(float))
+        )
+        angles = np.maximum.reduceat(angles, offsets)
+
+        flat[keyed] = (ranges <= tolerance) & (angles <= tolerance)
+
+    return [animCurve for animCurve, f in zip(animCurves, flat) if f]
+
+
+def getTimeSources():
+    """
+    Get all nodes that introduce time dependency in the scene. These are the
+    animation curves that are driven by time and are not flat, and the time
+    nodes which drive expressions and caches.
+
+    :return: Time sources
+    :rtype: list
+    """
+    # get animation curves driven by time
+    names = []
+    objs = []
+    iterator = OpenMaya.MItDependencyNodes(OpenMaya.MFn.kAnimCurve)
+    while not iterator.isDone():
+        obj = iterator.thisNode()
+        iterator.next()
+
+        dependencyNode = OpenMaya.MFnDependencyNode(obj)
+        if dependencyNode.findPlug("input", False).isConnected():
+            continue
+
+        names.append(dependencyNode.name())
+        objs.append(obj)
+
+    # filter flat animation curves
+    flat = set(getFlatAnimationCurves(names))
+    sources = [obj for name, obj in zip(names, objs) if name not in flat]
+
+    # add time nodes
+    sources.extend(api.getMObject(node) for node in cmds.ls(type="time"))
+
+    return sources
+
+
+def getTimeDependentNodes(sources):
+    """
+    Walk the dependency graph downstream of the provided sources. Every node
+    is only visited once, the search is pruned at nodes that were already
+    visited from a previous source.
+
+    :param list sources:
+    :return: All time dependent nodes
+    :rtype: ObjectMap
+    """
+    visited = api.ObjectMap()
+    for source in sources:
+        # validate source
+        if source in visited:
+            continue
+
+        # walk downstream
+        iterator = OpenMaya.MItDependencyGraph(
+            source,
+            OpenMaya.MFn.kInvalid,
+            OpenMaya.MItDependencyGraph.kDownstream,
+            OpenMaya.MItDependencyGraph.kBreadthFirst,
+            OpenMaya.MItDependencyGraph.kNodeLevel
+        )
+        while not iterator.isDone():
+            obj = iterator.currentItem()
+            if obj in visited:
+                iterator.prune()
+            else:
+                visited[obj] = True
+
+            iterator.next()
+
+    return visited
+
+
+# ----------------------------------------------------------------------------
+
+
+def analyseStaticNodes(root, startFrame, endFrame):
+    """
+    Analyse all of the nodes in the hierarchy of the root to find the nodes
+    of which the exported samples don't change over the frame range. As the
+    hierarchy is exported in local space this means the node itself is not
+    downstream of any animation, the root is exported in world space so its
+    ancestors are taken into account as well.
+
+    The result of the dependency graph analysis is verified by sampling the
+    local matrices of the static transforms on the start, middle and end
+    frame.
+
+    :param str root:
+    :param int/float startFrame:
+    :param int/float endFrame:
+    :return: Static and animated nodes as full paths
+    :rtype: tuple
+    """
+    # get nodes
+    root = cmds.ls(root, long=True)[0]
+    nodes = [root] + (
+        cmds.listRelatives(root, allDescendents=True, fullPath=True) or []
+    )
+
+    # get time dependent nodes
+    dependent = getTimeDependentNodes(getTimeSources())
+    objs = [api.getMObject(node) for node in nodes]
+    animated = [obj in dependent for obj in objs]
+
+    # validate root ancestors
+    sections = root.split("|")
+    for i in range(2, len(sections)):
+        obj = api.getMObject("|".join(sections[:i]))
+        if obj in dependent:
+            animated[0] = True
+
+    # verify static transforms by sampling their local matrices
+    indices = [
+        i
+        for i, (obj, a) in enumerate(zip(objs, animated))
+        if not a and obj.hasFn(OpenMaya.MFn.kTransform)
+    ]
+
+    if indices:
+        frames = [startFrame, (startFrame + endFrame) / 2.0, endFrame]
+        candidates = [nodes[i] for i in indices]
+
+        # the parents are often candidates as well, which is why the samples
+        # are shared during the verification.
+        with transforms.WorldMatrixSampler():
+            matrices = transforms.getWorldMatricesAtTimes(candidates, frames)
+
+            # get local matrices, the root is verified in world space
+            parents = [
+                (j, node.rsplit("|", 1)[0])
+                for j, node in enumerate(candidates)
+                if node != root
+            ]
+            if parents:
+                parentIndices = [j for j, _ in parents]
+                parentMatrices = transforms.getWorldMatricesAtTimes(
+                    [parent for _, parent in parents],
+                    frames
+                )
+                matrices[parentIndices] = np.matmul(
+                    matrices[parentIndices],
+                    np.linalg.inv(parentMatrices)
+                )
+
+        # validate difference over time
+        difference = np.abs(matrices - matrices[:, :1]).max(axis=(1, 2, 3))
+        for i, d in zip(indices, difference):
+            if d > TOLERANCE:
+                animated[i] = True
+
+    # split nodes
+    static = [node for node, a in zip(nodes, animated) if not a]
+    animated = [node for node, a in zip(nodes, animated) if a]
+
+    return static, animated
+
+
+def getSelection(root, nodes):
+    """
+    Get the selection needed to export the provided nodes, the ancestors of
+    the nodes up to the root are included to preserve the hierarchy.
+
+    :param str root:
+    :param list nodes: Full paths
+    :return: Selection
+    :rtype: list
+    """
+    root = cmds.ls(root, long=True)[0]
+    selection = OrderedDict([(root, None)])
+    for node in nodes:
+        sections = node.split("|")
+        for i in range(len(root.split("|")) + 1, len(sections) + 1):
+            selection["|".join(sections[:i])] = None
+
+    return selection.keys()
+
+
+def getStaticPath(output):
+    """
+    :param str output:
+    :return: Output path of the static nodes
+    :rtype: str
+    """
+    return os.path.splitext(output)[0] + STATIC_EXTENSION
+
+
+# ----------------------------------------------------------------------------
+
+
+@decorators.loadPlugin("AbcImport.mll")
+def importStaticNodes(root, output):
+    """
+    Import the static alembic cache exported next to the output into the
+    hierarchy of the imported root. The static alembic cache contains the
+    ancestors of the static nodes as well, ancestors that already exist in
+    the hierarchy are kept and only the missing static nodes are moved into
+    the hierarchy. Nothing is imported when no static alembic cache exists.
+
+    :param str root: Root node imported from the output
+    :param str output:
+    :return: Imported static nodes
+    :rtype: list
+    """
+    # validate static output
+    staticOutput = getStaticPath(output)
+    if not os.path.exists(staticOutput):
+        return []
+
+    # import static output
+    root = cmds.ls(root, long=True)[0]
+    group = cmds.createNode("transform", name="staticImport", skipSelect=True)
+    cmds.AbcImport(staticOutput, mode="import", reparent=group)
+
+    # get static nodes, sorted so parents are processed before children
+    group = cmds.ls(group, long=True)[0]
+    staticRoot = "|".join([group, root.split("|")[-1]])
+    nodes = cmds.listRelatives(
+        staticRoot,
+        allDescendents=True,
+        fullPath=True
+    ) or []
+    nodes.sort(key=lambda node: node.count("|"))
+
+    # move the missing nodes into the hierarchy, their descendants are
+    # moved with them.
+    moved = []
+    for node in nodes:
+        if any(node.startswith(m + "|") for m in moved):
+            continue
+
+        relative = node[len(staticRoot):]
+        if cmds.objExists(root + relative):
+            continue
+
+        cmds.parent(
+            node,
+            root + relative.rsplit("|", 1)[0],
+            relative=True,
+            shape=cmds.objectType(node, isAType="shape")
+        )
+        moved.append(node)
+
+    # remove the duplicated ancestors
+    cmds.delete(group)
+
+    return [root + node[len(staticRoot):] for node in moved]
+
+
+# ----------------------------------------------------------------------------
+
+
+def getReport(static, animated, durations, output, reference=None):
+    """
+    Get the report of a pruned export. The sizes of the exported alembic
+    caches are measured on disk. When the full hierarchy was exported to a
+    reference alembic cache, the bytes and time saved are measured against
+    the reference.
+
+    :param list static:
+    :param list animated:
+    :param dict durations: Export durations per output path
+    :param str output:
+    :param str/None reference:
+    :return: Report
+    :rtype: OrderedDict
+    """
+    # get sizes and durations
+    staticOutput = getStaticPath(output)
+    staticBytes = 0
+    staticTime = durations.get(staticOutput, 0.0)
+    if staticOutput in durations:
+        staticBytes = os.path.getsize(staticOutput)
+
+    animatedBytes = os.path.getsize(output)
+    animatedTime = durations[output]
+
+    # get report
+    report = OrderedDict(
+        [
+            ("staticNodes", len(static)),
+            ("animatedNodes", len(animated)),
+            ("staticBytes", staticBytes),
+            ("animatedBytes", animatedBytes),
+            ("staticTime", staticTime),
+            ("animatedTime", animatedTime),
+        ]
+    )
+
+    # compare with reference
+    if reference:
+        referenceBytes = os.path.getsize(reference)
+        referenceTime = durations[reference]
+        report["bytesSaved"] = referenceBytes - staticBytes - animatedBytes
+        report["timeSaved"] = referenceTime - staticTime - animatedTime
+
+    return report
@@ -0,0 +1,163 @@
+import os
+import timeit
+from maya import cmds
+from collections import OrderedDict
+from zUtils import contexts, decorators
+
+from . import cache
+from .exporter import AnimationExport
+
+
+# ----------------------------------------------------------------------------
+
+
+JOB_TIMES = {}
+
+
+def jobFinished(index):
+    """
+    Called by the alembic export when a job is finished. The time the job
+    finished is stored so the duration of each job can be reported.
+
+    :param int index:
+    """
+    JOB_TIMES[index] = timeit.default_timer()
+
+
+# ----------------------------------------------------------------------------
+
+
+class AnimationSceneExport(object):
+    """
+    The scene export packs the export jobs of multiple animations into a
+    single alembic export command. This means the timeline is only evaluated
+    once, rather than once for every animation. Each job keeps its own frame
+    range and attributes.
+
+    .. highlight::
+        export = AnimationSceneExport()
+        export.export(directory)
+    """
+    def __init__(self, animations=None):
+        # get animations from scene
+        if animations is None:
+            animations = [
+                animation
+                for animations in
+                AnimationExport.getAnimationsFromScene().values()
+                for animation in animations
+            ]
+
+        self._animations = animations
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def animations(self):
+        """
+        :return: Animations
+        :rtype: list
+        """
+        return self._animations
+
+    # ------------------------------------------------------------------------
+
+    def getOutput(self, directory, animation):
+        """
+        :param str directory:
+        :param AnimationExport animation:
+        :return: Output path of the animation
+        :rtype: str
+        """
+        name = "{}_{}.abc".format(
+            animation.character,
+            animation.root.split("|")[-1].replace(":", "_")
+        )
+
+        return os.path.join(directory, name).replace("\\", "/")
+
+    # ------------------------------------------------------------------------
+
+    @decorators.loadPlugin("AbcExport.mll")
+    def export(self, directory, step=1, force=False):
+        """
+        Export an alembic cache of all of the animations in a single alembic
+        export command. The time it took for each job to finish is measured
+        from the start of the command, as all jobs are evaluated in the same
+        pass over the timeline. Animations of which the alembic cache exists
+        and was exported with the same fingerprint are skipped, unless
+        forced, their duration will be None.
+
+        :param str directory:
+        :param int/float step:
+        :param bool force:
+        :return: Duration of each job, keys are the output paths
+        :rtype: OrderedDict
+        :raise ValueError: When no animations are found
+        """
+        # validate animations
+        if not self.animations:
+            raise ValueError("No animations found to export!")
+
+        # construct jobs
+        durations = OrderedDict()
+        exports = []
+        for animation in self.animations:
+            output = self.getOutput(directory, animation)
+            job = animation.getExportJob(output, step)
+            durations[output] = None
+
+            # validate cache
+            fingerprint = cache.getFingerprint(animation, job)
+            if not force and cache.isCached(output, fingerprint):
+                s = "DEBUG: AbcExportCommand | Skipped, cached | {}"
+                print(s.format(job))
+                animation.telemetry.clear()
+                continue
+
+            exports.append((animation, output, job, fingerprint))
+
+        # validate exports
+        if not exports:
+            return durations
+
+        # add job callbacks
+        jobs = [
+            " ".join(
+                [
+                    job,
+                    "-pythonPostJobCallback "
+                    "\"import zAnimation.scene;"
+                    "zAnimation.scene.jobFinished({})\"".format(i)
+                ]
+            )
+            for i, (_, _, job, _) in enumerate(exports)
+        ]
+
+        # debug
+        for job in jobs:
+            print("DEBUG: AbcExportCommand | {}".format(job))
+
+        # execute command
+        JOB_TIMES.clear()
+        with contexts.Timer() as timer:
+            start = timeit.default_timer()
+            cmds.AbcExport(j=jobs)
+
+        # get job durations and write manifests and telemetry, as the jobs
+        # share a single command the duration of the job is used.
+        for i, (animation, output, job, fingerprint) in enumerate(exports):
+            durations[output] = JOB_TIMES.get(i, start + timer.elapsed) - start
+            animation.telemetry.update(
+                "AbcExport",
+                calls=1,
+                duration=durations[output]
+            )
+
+            cache.writeManifest(output, fingerprint, job)
+            animation.writeTelemetry(output, step)
+
+            s = "DEBUG: AbcExportJob | {:.3f}s | {}"
+            print(s.format(durations[output], output))
+
+        return durations
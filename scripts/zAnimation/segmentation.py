@@ -0,0 +1,301 @@
+import os
+import json
+import shutil
+import tempfile
+from maya import cmds
+from collections import OrderedDict
+from zBatch import pool
+from zUtils import path, decorators
+
+
+MANIFEST_EXTENSION = ".segments.json"
+
+
+# ----------------------------------------------------------------------------
+
+
+def getSegments(start, end, segments, overlap=0, step=1):
+    """
+    Split the frame range into segments. The boundaries of the segments are
+    aligned with the step so every segment samples the same frames as a
+    single export would. Each segment is extended with the overlap on both
+    sides, clamped to the frame range.
+
+    :param int/float start:
+    :param int/float end:
+    :param int segments:
+    :param int/float overlap:
+    :param int/float step:
+    :return: Segments as start, end, export start and export end frames
+    :rtype: list
+    """
+    # get samples
+    samples = int(round((end - start) / float(step)))
+    segments = max(1, min(segments, samples))
+
+    # get segments
+    data = []
+    for i in range(segments):
+        segmentStart = start + (samples * i // segments) * step
+        segmentEnd = start + (samples * (i + 1) // segments) * step
+
+        data.append(
+            (
+                segmentStart,
+                segmentEnd,
+                max(start, segmentStart - overlap),
+                min(end, segmentEnd + overlap)
+            )
+        )
+
+    return data
+
+
+def getManifestPath(output):
+    """
+    :param str output:
+    :return: Segment manifest path of the output
+    :rtype: str
+    """
+    return os.path.splitext(output)[0] + MANIFEST_EXTENSION
+
+
+def readManifest(manifestPath):
+    """
+    :param str manifestPath:
+    :return: Segment manifest
+    :rtype: dict
+    """
+    with open(manifestPath, "r") as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+# ----------------------------------------------------------------------------
+
+
+def exportSegments(exporter, output, segments=4, overlap=1, step=1,
+                   processes=None):
+    """
+    Export the animation of the exporter as overlapping alembic segments.
+    The current scene is exported to a temporary file which is opened by
+    standalone maya processes that each export a single segment. The
+    temporary file is removed afterwards, the logs of the segments are
+    written next to the segments and only kept when a segment failed. A
+    manifest listing the segments in order is written when all segments
+    are exported.
+
+    :param AnimationExport exporter:
+    :param str output:
+    :param int segments:
+    :param int/float overlap:
+    :param int/float step:
+    :param int/None processes:
+    :return: Manifest path
+    :rtype: str
+    :raise RuntimeError: When one or more segments failed to export
+    """
+    # get frame range
+    exporter.getExportJob(output, step)
+    start, end = exporter.startFrame, exporter.endFrame
+
+    # export scene to a temporary file, the open scene is never renamed
+    directory = tempfile.mkdtemp()
+    try:
+        temporary = os.path.join(directory, "segments.ma").replace("\\", "/")
+        cmds.file(
+            temporary,
+            exportAll=True,
+            preserveReferences=True,
+            type="mayaAscii",
+            force=True
+        )
+
+        # create jobs, the logs are written next to the segments as the
+        # temporary directory is removed
+        base, extension = os.path.splitext(output)
+        data = []
+        jobs = []
+        frameRanges = getSegments(start, end, segments, overlap, step)
+        for i, frameRange in enumerate(frameRanges):
+            segmentOutput = "{}.{:04d}{}".format(base, i, extension)
+            data.append(
+                OrderedDict(
+                    [
+                        ("file", segmentOutput),
+                        ("startFrame", frameRange[0]),
+                        ("endFrame", frameRange[1]),
+                        ("exportStartFrame", frameRange[2]),
+                        ("exportEndFrame", frameRange[3]),
+                    ]
+                )
+            )
+            jobs.append(
+                pool.Job(
+                    segmentOutput,
+                    [
+                        pool.getMayaPy(), "-m", "zBatch.segment", temporary,
+                        "--root", exporter.root,
+                        "--output", segmentOutput,
+                        "--start", str(frameRange[2]),
+                        "--end", str(frameRange[3]),
+                        "--step", str(step),
+                    ],
+                    log="{}.{:04d}.log".format(base, i)
+                )
+            )
+
+        # export segments
+        workers = pool.Pool(
+            processes or len(jobs),
+            retries=1,
+            env=pool.getEnvironment()
+        )
+        results = workers.run(jobs)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # validate results
+    failed = [result["name"] for result in results if not result["success"]]
+    if failed:
+        raise RuntimeError(
+            "Unable to export segments: {}! Logs can be found next to the "
+            "segments.".format(", ".join(failed))
+        )
+
+    # remove logs
+    for job in jobs:
+        if os.path.exists(job.log):
+            os.remove(job.log)
+
+    # write manifest
+    manifest = OrderedDict(
+        [
+            ("character", exporter.character),
+            ("root", path.getName(exporter.root)),
+            ("startFrame", start),
+            ("endFrame", end),
+            ("step", step),
+            ("overlap", overlap),
+            ("segments", data),
+        ]
+    )
+
+    manifestPath = getManifestPath(output)
+    with open(manifestPath, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    return manifestPath
+
+
+# ----------------------------------------------------------------------------
+
+
+def _getAlembicConnections(alembicNode):
+    """
+    :param str alembicNode:
+    :return: Source plugs, keys are the destination plugs
+    :rtype: OrderedDict
+    """
+    connections = cmds.listConnections(
+        alembicNode,
+        plugs=True,
+        connections=True,
+        skipConversionNodes=True,
+        source=False,
+        destination=True
+    ) or []
+
+    return OrderedDict(
+        (target, source)
+        for source, target in zip(connections[::2], connections[1::2])
+        if not target.startswith("time1.")
+    )
+
+
+def _importAlembic(path, **kwargs):
+    """
+    :param str path:
+    :return: Created alembic node
+    :rtype: str
+    """
+    existing = set(cmds.ls(type="AlembicNode") or [])
+    cmds.AbcImport(path, **kwargs)
+    created = set(cmds.ls(type="AlembicNode") or []) - existing
+
+    return created.pop()
+
+
+@decorators.loadPlugin("AbcImport.mll")
+def importSegments(manifestPath):
+    """
+    Import the segments of a segment manifest as one continuous animation.
+    The first segment creates the hierarchy, the other segments are
+    connected to that hierarchy. Every animated plug is driven by a choice
+    node that selects the segment that owns the current frame, the selection
+    is driven by a single stepped animation curve.
+
+    :param str manifestPath:
+    :return: Root node
+    :rtype: str
+    :raise RuntimeError: When the root cannot be found after importing
+    """
+    # read manifest
+    manifest = readManifest(manifestPath)
+    segments = manifest["segments"]
+
+    # import first segment
+    alembicNode = _importAlembic(segments[0]["file"], mode="import")
+    connections = [_getAlembicConnections(alembicNode)]
+
+    # get root
+    nodes = cmds.ls(
+        [plug.split(".", 1)[0] for plug in connections[0].keys()],
+        long=True
+    ) or []
+    roots = set(node.split("|")[1] for node in nodes)
+    roots = [r for r in roots if path.getName(r) == manifest["root"]]
+
+    if not roots:
+        raise RuntimeError(
+            "Unable to find root '{}' after importing!".format(
+                manifest["root"]
+            )
+        )
+
+    root = roots[0]
+
+    # connect other segments to the hierarchy
+    for segment in segments[1:]:
+        alembicNode = _importAlembic(segment["file"], connect=root)
+        connections.append(_getAlembicConnections(alembicNode))
+
+    # validate segments
+    if len(segments) == 1:
+        return root
+
+    # create segment selector
+    selector = cmds.createNode("animCurveTU", name="segmentSelector")
+    for i, segment in enumerate(segments):
+        cmds.setKeyframe(
+            selector,
+            time=segment["startFrame"],
+            value=i,
+            outTangentType="step"
+        )
+
+    # create choice nodes
+    for target in connections[0].keys():
+        choice = cmds.createNode("choice", skipSelect=True)
+        cmds.connectAttr(
+            "{}.output".format(selector),
+            "{}.selector".format(choice)
+        )
+
+        for i, segmentConnections in enumerate(connections):
+            source = segmentConnections.get(target)
+            if source:
+                cmds.connectAttr(source, "{}.input[{}]".format(choice, i))
+
+        cmds.connectAttr("{}.output".format(choice), target, force=True)
+
+    return root
@@ -4,4 +4,5 @@ ZIVA_ANIMATION_END = "__ziva_animation_end"
 ZIVA_ANIMATION_TRANSITION = "__ziva_animation_transition"
 ZIVA_ANIMATION_CONTAINER = "__ziva_animation_container"
 ZIVA_ANIMATION_MOVER = "__ziva_animation_mover"
-ZIVA_SOLVER_PARENT = "__ziva_solver_parent"
\ No newline at end of file
+ZIVA_SOLVER_PARENT = "__ziva_solver_parent"
+ZIVA_ANIMATION_ZERO_POSE = "__ziva_animation_zero_pose"
@@ -0,0 +1,344 @@
+import os
+import json
+import numpy as np
+from maya import cmds, OpenMaya
+from collections import OrderedDict
+from zUtils import api, path, undo, contexts, animation
+
+
+CURVES_EXTENSION = ".curves.npz"
+
+# ----------------------------------------------------------------------------
+
+
+def getCurvesPath(output):
+    """
+    :param str output:
+    :return: Curves path of the output
+    :rtype: str
+    """
+    return os.path.splitext(output)[0] + CURVES_EXTENSION
+
+
+def getUnitFactors():
+    """
+    Get the factors to convert the current ui units to the internal units
+    of maya, which are seconds, radians and centimeters.
+
+    :return: Time, angle and linear factor
+    :rtype: tuple
+    """
+    return (
+        OpenMaya.MTime(1.0, OpenMaya.MTime.uiUnit()).asUnits(
+            OpenMaya.MTime.kSeconds
+        ),
+        OpenMaya.MAngle(1.0, OpenMaya.MAngle.uiUnit()).asRadians(),
+        OpenMaya.MDistance(1.0, OpenMaya.MDistance.uiUnit()).asCentimeters()
+    )
+
+
+# ----------------------------------------------------------------------------
+
+
+def exportCurves(exporter, output):
+    """
+    Export the animation curves of the exporter as compressed numpy arrays.
+    The keys and tangents of all animation curves are stored concatenated
+    in internal units, the counts array can be used to split the keys per
+    animation curve. Each animated plug is stored without namespaces and
+    references the animation curve that drives it.
+
+    The animation curves are exported as they are in the scene, this means
+    that any pre roll added to the exporter is included.
+
+    :param AnimationExport exporter:
+    :param str output:
+    :return: Curves path
+    :rtype: str
+    """
+    # get animation curves
+    curves = exporter._animationCurves
+    lookup = {curve: i for i, curve in enumerate(curves)}
+
+    # get plugs
+    plugs = []
+    indices = []
+    for node, connections in exporter._animationData.iteritems():
+        for curve, plug in connections:
+            plugs.append(path.removeNamespace(plug))
+            indices.append(lookup[curve])
+
+    # get curve settings
+    timeFactor, angleFactor, linearFactor = getUnitFactors()
+    factors = []
+    weighted = []
+    preInfinity = []
+    postInfinity = []
+
+    for curve in curves:
+        animCurve = OpenMaya.MFnAnimCurve(api.getMObject(curve))
+        animCurveType = animCurve.animCurveType()
+
+        if animCurveType == OpenMaya.MFnAnimCurve.kAnimCurveTA:
+            factors.append(angleFactor)
+        elif animCurveType == OpenMaya.MFnAnimCurve.kAnimCurveTL:
+            factors.append(linearFactor)
+        else:
+            factors.append(1.0)
+
+        weighted.append(animCurve.isWeighted())
+        preInfinity.append(animCurve.preInfinityType())
+        postInfinity.append(animCurve.postInfinityType())
+
+    # get keyframe data in internal units
+    data = animation.getKeyframeData(curves)
+    data["times"] = data["times"].astype(float) * timeFactor
+    data["values"] = data["values"].astype(float) * np.repeat(
+        np.array(factors, dtype=float),
+        data["counts"]
+    )
+    data["inAngles"] = data["inAngles"].astype(float) * angleFactor
+    data["outAngles"] = data["outAngles"].astype(float) * angleFactor
+
+    # get metadata
+    metadata = OrderedDict(
+        [
+            ("character", exporter.character),
+            ("root", path.removeNamespace(exporter.root)),
+            ("startFrame", exporter.startFrame),
+            ("endFrame", exporter.endFrame),
+            ("transitionFrames", exporter.transitionFrames),
+        ]
+    )
+
+    # write curves
+    curvesPath = getCurvesPath(output)
+    with open(curvesPath, "wb") as f:
+        np.savez_compressed(
+            f,
+            metadata=np.array(json.dumps(metadata)),
+            plugs=np.array(plugs),
+            curves=np.array(indices, dtype=int),
+            weighted=np.array(weighted, dtype=bool),
+            preInfinity=np.array(preInfinity, dtype=int),
+            postInfinity=np.array(postInfinity, dtype=int),
+            **data
+        )
+
+    print("DEBUG: exportCurves | {} plugs | {}".format(len(plugs), curvesPath))
+
+    return curvesPath
+
+
+def readMetadata(curvesPath):
+    """
+    :param str curvesPath:
+    :return: Curves metadata
+    :rtype: dict
+    """
+    with open(curvesPath, "rb") as f:
+        return json.loads(str(np.load(f)["metadata"]))
+
+
+def getIndexRanges(indices):
+    """
+    :param list indices: Sorted indices
+    :return: Ranges of consecutive indices
+    :rtype: list
+    """
+    ranges = []
+    for index in indices:
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+
+    return ranges
+
+
+def groupIndices(keys):
+    """
+    :param list keys: Key per index
+    :return: Index ranges grouped by key
+    :rtype: OrderedDict
+    """
+    groups = OrderedDict()
+    for index, key in enumerate(keys):
+        groups.setdefault(key, []).append(index)
+
+    return OrderedDict(
+        (key, getIndexRanges(indices))
+        for key, indices in groups.items()
+    )
+
+
+def setTangents(animCurve, data, start, end, weighted):
+    """
+    Set the tangents of the keys of the animation curve. The keys are
+    grouped by their tangent types and values, which means every group is
+    set with a single command. Only fixed tangents and the tangents of
+    weighted curves have their angles and weights set, the angles of the
+    other tangent types are derived from their type.
+
+    :param str animCurve:
+    :param dict data: Keyframe data
+    :param int start: Index of the first key in the keyframe data
+    :param int end: Index after the last key in the keyframe data
+    :param bool weighted:
+    """
+    # set tangent types
+    types = zip(
+        [str(t) for t in data["inTangentTypes"][start:end]],
+        [str(t) for t in data["outTangentTypes"][start:end]]
+    )
+    for (inType, outType), ranges in groupIndices(types).items():
+        cmds.keyTangent(
+            animCurve,
+            index=ranges,
+            inTangentType=inType,
+            outTangentType=outType
+        )
+
+    # get custom tangents
+    angleFactor = getUnitFactors()[1]
+    tangents = [
+        (
+            float(data["inAngles"][key]) / angleFactor,
+            float(data["outAngles"][key]) / angleFactor,
+            float(data["inWeights"][key]),
+            float(data["outWeights"][key]),
+        )
+        if weighted or "fixed" in types[i] else None
+        for i, key in enumerate(range(start, end))
+    ]
+
+    custom = [i for i, tangent in enumerate(tangents) if tangent]
+    if not custom:
+        return
+
+    # set custom tangents, the tangents are unlocked to allow for different
+    # in and out tangents and locked again when they match.
+    cmds.keyTangent(animCurve, index=getIndexRanges(custom), lock=False)
+
+    locked = []
+    for tangent, ranges in groupIndices(tangents).items():
+        if tangent is None:
+            continue
+
+        inAngle, outAngle, inWeight, outWeight = tangent
+        kwargs = {"inWeight": inWeight, "outWeight": outWeight} \
+            if weighted else {}
+        cmds.keyTangent(
+            animCurve,
+            index=ranges,
+            inAngle=inAngle,
+            outAngle=outAngle,
+            **kwargs
+        )
+
+        if inAngle == outAngle and inWeight == outWeight:
+            locked.extend(ranges)
+
+    if locked:
+        cmds.keyTangent(animCurve, index=locked, lock=True)
+
+
+def importCurves(curvesPath, namespace=None):
+    """
+    Rebuild the exported animation curves onto the matching plugs of the
+    rig in the scene. The plugs are matched by name, when a namespace is
+    provided it is added to every node in the path of the plug. Existing
+    animation curves on the matching plugs are deleted and the new
+    animation curves are created in a single undoable DG modification,
+    after which the keys of every animation curve are added through the API
+    in a single call. The tangents are set per group of keys that share the
+    same tangents. The import is a single undo chunk, undoing it removes
+    the imported animation curves and restores the original ones.
+
+    :param str curvesPath:
+    :param str/None namespace:
+    :return: Plugs that could not be matched
+    :rtype: list
+    """
+    # read curves
+    with open(curvesPath, "rb") as f:
+        data = dict(np.load(f))
+
+    offsets = np.concatenate([[0], np.cumsum(data["counts"])])
+
+    # get target plugs
+    targets = []
+    missing = []
+    for plug, index in zip(data["plugs"], data["curves"]):
+        plug = str(plug)
+        target = path.addNamespace(plug, namespace) if namespace else plug
+
+        try:
+            targets.append((target, api.getMPlug(target), index))
+        except RuntimeError:
+            missing.append(target)
+
+    if missing:
+        cmds.warning(
+            "Unable to find {} target plugs, for example '{}'!".format(
+                len(missing),
+                missing[0]
+            )
+        )
+
+    if not targets:
+        return missing
+
+    with contexts.UndoChunk():
+        # remove existing animation
+        modifier = OpenMaya.MDGModifier()
+        existing = cmds.listConnections(
+            [target for target, _, _ in targets],
+            type="animCurve",
+            source=True,
+            destination=False,
+            skipConversionNodes=True
+        ) or []
+
+        for animCurve in set(existing):
+            modifier.deleteNode(api.getMObject(animCurve))
+
+        # create animation curves
+        animCurves = []
+        for target, plug, index in targets:
+            animCurve = OpenMaya.MFnAnimCurve()
+            animCurve.create(plug, modifier)
+            animCurves.append(animCurve)
+
+        undo.doIt(modifier)
+
+        # add keys
+        for animCurve, (target, plug, index) in zip(animCurves, targets):
+            start, end = offsets[index], offsets[index + 1]
+
+            times = OpenMaya.MTimeArray()
+            values = OpenMaya.MDoubleArray()
+            for t, v in zip(
+                data["times"][start:end],
+                data["values"][start:end]
+            ):
+                times.append(OpenMaya.MTime(float(t), OpenMaya.MTime.kSeconds))
+                values.append(float(v))
+
+            animCurve.addKeys(times, values)
+
+            # set curve settings
+            animCurve.setIsWeighted(bool(data["weighted"][index]))
+            animCurve.setPreInfinityType(int(data["preInfinity"][index]))
+            animCurve.setPostInfinityType(int(data["postInfinity"][index]))
+
+            # set tangents
+            setTangents(
+                animCurve.name(),
+                data,
+                start,
+                end,
+                bool(data["weighted"][index])
+            )
+
+    return missing
@@ -0,0 +1,290 @@
+"""
+Export the animation of many scenes in parallel standalone maya processes.
+For every scene the animation is shifted to the start frame, a pre roll is
+added and all of the animations in the scene are exported in a single
+alembic export command.
+
+.. highlight::
+    mayapy -m zBatch.export shot1.ma shot2.ma --output /caches --processes 4
+
+The output of every scene is written to a directory named after the scene
+followed by a hash of its full path, which keeps scenes with the same name
+in different directories apart.
+
+The stub mode replaces the maya process with a python process that doesn't
+import maya, this allows the scheduler to be tested without a maya license.
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+from collections import OrderedDict
+
+from . import pool
+
+
+# ----------------------------------------------------------------------------
+
+
+def getParser():
+    """
+    :return: Argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Export the animation of scenes in parallel."
+    )
+    parser.add_argument("scenes", nargs="+")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--summary")
+    parser.add_argument("--mayapy", default=pool.getMayaPy())
+    parser.add_argument("--start-frame", type=float, default=1001)
+    parser.add_argument("--transition-frames", type=float, default=10)
+    parser.add_argument("--max-iterations", type=int, default=10)
+    parser.add_argument("--step", type=float, default=1)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--stub", action="store_true")
+    parser.add_argument("--stub-duration", type=float, default=0.0)
+    parser.add_argument("--stub-failures", type=int, default=0)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--name")
+    parser.add_argument("--result")
+
+    return parser
+
+
+# ----------------------------------------------------------------------------
+
+
+def exportScene(args):
+    """
+    Open the scene in a standalone maya session and export all of its
+    animations. The duration of every stage is returned.
+
+    :param argparse.Namespace args:
+    :return: Stage durations and outputs
+    :rtype: OrderedDict
+    """
+    # initialize maya
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    from maya import cmds
+    from zUtils import contexts
+    from zAnimation import AnimationSceneExport
+
+    # variables
+    data = OrderedDict()
+
+    # open scene
+    with contexts.Timer() as timer:
+        cmds.file(args.scenes[0], open=True, force=True)
+
+    data["open"] = timer.elapsed
+
+    # get animations
+    export = AnimationSceneExport()
+
+    # add pre roll
+    with contexts.Timer() as timer:
+        for animation in export.animations:
+            animation.setStartFrame(args.start_frame)
+            animation.addPreRoll(args.transition_frames, args.max_iterations)
+
+    data["preRoll"] = timer.elapsed
+
+    # export animation
+    with contexts.Timer() as timer:
+        directory = os.path.join(args.output, args.name)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        durations = export.export(directory, args.step, args.force)
+
+    data["export"] = timer.elapsed
+    data["outputs"] = durations
+
+    return data
+
+
+def exportSceneStub(args):
+    """
+    Mimic the export of a scene without importing maya. The scene file is
+    expected to exist and the export will fail for the amount of attempts
+    provided.
+
+    :param argparse.Namespace args:
+    :return: Stage durations and outputs
+    :rtype: OrderedDict
+    :raise IOError: When the scene doesn't exist
+    :raise RuntimeError: When the attempt is configured to fail
+    """
+    # validate scene
+    scene = args.scenes[0]
+    if not os.path.exists(scene):
+        raise IOError("Scene '{}' doesn't exist!".format(scene))
+
+    # validate attempt
+    attempt = int(os.environ.get(pool.ATTEMPT_VARIABLE, 1))
+    if attempt <= args.stub_failures:
+        raise RuntimeError("Stub failure on attempt {}!".format(attempt))
+
+    # mimic export
+    time.sleep(args.stub_duration)
+
+    directory = os.path.join(args.output, args.name)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    output = os.path.join(directory, "stub.abc").replace("\\", "/")
+    open(output, "w").close()
+
+    return OrderedDict(
+        [
+            ("open", 0.0),
+            ("preRoll", 0.0),
+            ("export", args.stub_duration),
+            ("outputs", {output: args.stub_duration}),
+        ]
+    )
+
+
+def runWorker(args):
+    """
+    Export a single scene and write the result to the result path.
+
+    :param argparse.Namespace args:
+    """
+    # export scene
+    if args.stub:
+        data = exportSceneStub(args)
+    else:
+        data = exportScene(args)
+
+    # write result
+    if args.result:
+        with open(args.result, "w") as f:
+            json.dump(data, f, indent=4)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getWorkerArgs(args, scene, name, result):
+    """
+    :param argparse.Namespace args:
+    :param str scene:
+    :param str name:
+    :param str result:
+    :return: Worker command arguments
+    :rtype: list
+    """
+    executable = sys.executable if args.stub else args.mayapy
+    workerArgs = [
+        executable, "-m", "zBatch.export", scene,
+        "--worker",
+        "--name", name,
+        "--result", result,
+        "--output", args.output,
+        "--start-frame", str(args.start_frame),
+        "--transition-frames", str(args.transition_frames),
+        "--max-iterations", str(args.max_iterations),
+        "--step", str(args.step),
+    ]
+
+    if args.force:
+        workerArgs.append("--force")
+
+    if args.stub:
+        workerArgs.extend(
+            [
+                "--stub",
+                "--stub-duration", str(args.stub_duration),
+                "--stub-failures", str(args.stub_failures),
+            ]
+        )
+
+    return workerArgs
+
+
+def runScheduler(args):
+    """
+    Export all of the scenes in a pool of worker processes and write a
+    summary containing the timings of every scene.
+
+    :param argparse.Namespace args:
+    :return: Results
+    :rtype: list
+    """
+    # get directories
+    logs = os.path.join(args.output, "logs")
+    if not os.path.exists(logs):
+        os.makedirs(logs)
+
+    # get job names, the scene names are made unique with a hash of the
+    # full path of the scene.
+    names = [pool.getJobName(scene) for scene in args.scenes]
+    pool.validateJobNames(names)
+
+    # create jobs
+    jobs = []
+    for scene, name in zip(args.scenes, names):
+        result = os.path.join(logs, "{}.json".format(name))
+        log = os.path.join(logs, "{}.log".format(name))
+
+        # remove existing result
+        if os.path.exists(result):
+            os.remove(result)
+
+        jobs.append(
+            pool.Job(
+                name,
+                getWorkerArgs(args, scene, name, result),
+                result,
+                log
+            )
+        )
+
+    # run jobs
+    workers = pool.Pool(args.processes, args.retries, pool.getEnvironment())
+    start = timeit.default_timer()
+    results = workers.run(jobs)
+    duration = timeit.default_timer() - start
+
+    # write summary
+    summary = args.summary or os.path.join(args.output, "summary.json")
+    pool.writeSummary(
+        summary,
+        results,
+        duration=duration,
+        processes=args.processes,
+        retries=args.retries
+    )
+
+    return results
+
+
+def main(argv=None):
+    """
+    :param list/None argv:
+    :return: Exit code
+    :rtype: int
+    """
+    args = getParser().parse_args(argv)
+
+    # run worker
+    if args.worker:
+        runWorker(args)
+        return 0
+
+    # run scheduler
+    results = runScheduler(args)
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+import os
+import sys
+import json
+import time
+import errno
+import hashlib
+import timeit
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+
+ATTEMPT_VARIABLE = "ZBATCH_ATTEMPT"
+SLOTS_DIRECTORY = os.path.join(tempfile.gettempdir(), "zBatch", "slots")
+
+# windows process query
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_ACCESS_DENIED = 5
+STILL_ACTIVE = 259
+
+
+# ----------------------------------------------------------------------------
+
+
+class Job(object):
+    """
+    A job is a command that is executed in its own process. When a result
+    path is provided the job is expected to write a json file containing its
+    result data to that path, this data will be added to the result of the
+    job. Jobs with a higher priority are started first.
+
+    :param str name:
+    :param list args:
+    :param str/None result:
+    :param str/None log:
+    :param int priority:
+    """
+    def __init__(self, name, args, result=None, log=None, priority=0):
+        self._name = name
+        self._args = args
+        self._result = result
+        self._log = log
+        self._priority = priority
+
+        # variables
+        self.attempts = 0
+        self.durations = []
+        self.returncode = None
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def name(self):
+        """
+        :return: Name
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def args(self):
+        """
+        :return: Command arguments
+        :rtype: list
+        """
+        return self._args
+
+    @property
+    def result(self):
+        """
+        :return: Result path
+        :rtype: str/None
+        """
+        return self._result
+
+    @property
+    def log(self):
+        """
+        :return: Log path
+        :rtype: str/None
+        """
+        return self._log
+
+    @property
+    def priority(self):
+        """
+        :return: Priority
+        :rtype: int
+        """
+        return self._priority
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def success(self):
+        """
+        :return: Success state
+        :rtype: bool
+        """
+        return self.returncode == 0
+
+    def getResult(self):
+        """
+        :return: Result of the job
+        :rtype: OrderedDict
+        """
+        # get data
+        data = None
+        if self.result and os.path.exists(self.result):
+            with open(self.result, "r") as f:
+                data = json.load(f)
+
+        return OrderedDict(
+            [
+                ("name", self.name),
+                ("priority", self.priority),
+                ("success", self.success),
+                ("returncode", self.returncode),
+                ("attempts", self.attempts),
+                ("durations", self.durations),
+                ("duration", sum(self.durations)),
+                ("log", self.log),
+                ("data", data),
+            ]
+        )
+
+
+class MachineSlots(object):
+    """
+    Machine slots limit the amount of jobs that run at the same time on a
+    machine, across all pools running on that machine. A slot is claimed by
+    exclusively creating a lock file containing the process id of the pool
+    that claimed it. Slots of which the process no longer exists are
+    reclaimed.
+
+    :param int limit:
+    :param str directory:
+    """
+    def __init__(self, limit, directory=SLOTS_DIRECTORY):
+        self._limit = max(1, limit)
+        self._directory = directory
+
+        if not os.path.exists(self._directory):
+            try:
+                os.makedirs(self._directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def limit(self):
+        """
+        :return: Maximum amount of jobs on this machine
+        :rtype: int
+        """
+        return self._limit
+
+    # ------------------------------------------------------------------------
+
+    def _getPath(self, index):
+        """
+        :param int index:
+        :return: Lock file path of the slot
+        :rtype: str
+        """
+        return os.path.join(self._directory, "slot{}.lock".format(index))
+
+    def _isStale(self, path):
+        """
+        :param str path:
+        :return: Stale state of the lock file
+        :rtype: bool
+        """
+        try:
+            with open(path, "r") as f:
+                pid = int(f.read().strip() or 0)
+        except (IOError, OSError, ValueError):
+            return False
+
+        if not pid:
+            return False
+
+        return not isProcessAlive(pid)
+
+    def acquire(self):
+        """
+        :return: Claimed slot index, None if all slots are in use
+        :rtype: int/None
+        """
+        for index in range(self.limit):
+            path = self._getPath(index)
+            if os.path.exists(path) and self._isStale(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as e:
+                if e.errno == errno.EEXIST:
+                    continue
+
+                raise
+
+            os.write(fd, str(os.getpid()).encode("utf-8"))
+            os.close(fd)
+
+            return index
+
+    def release(self, index):
+        """
+        :param int index:
+        """
+        path = self._getPath(index)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class Pool(object):
+    """
+    The pool runs jobs in a configurable amount of processes. Jobs that fail
+    are retried until the maximum amount of retries is reached. The attempt
+    number is available to the job process through an environment variable.
+    Jobs are started in order of priority, when machine slots are provided
+    a job is only started when a slot on the machine is available.
+
+    .. highlight::
+        pool = Pool(processes=4, retries=1, slots=MachineSlots(8))
+        results = pool.run(jobs)
+    """
+    def __init__(self, processes=1, retries=0, env=None, interval=0.1,
+                 slots=None):
+        self._processes = max(1, processes)
+        self._retries = retries
+        self._env = env
+        self._interval = interval
+        self._slots = slots
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def processes(self):
+        """
+        :return: Maximum amount of processes
+        :rtype: int
+        """
+        return self._processes
+
+    @property
+    def retries(self):
+        """
+        :return: Maximum amount of retries
+        :rtype: int
+        """
+        return self._retries
+
+    # ------------------------------------------------------------------------
+
+    def _start(self, job):
+        """
+        :param Job job:
+        :return: Process, start time and log file
+        :rtype: tuple
+        """
+        # update attempts
+        job.attempts += 1
+
+        # get environment
+        env = dict(os.environ if self._env is None else self._env)
+        env[ATTEMPT_VARIABLE] = str(job.attempts)
+
+        # get log
+        log = open(job.log, "a") if job.log else open(os.devnull, "w")
+
+        # start process
+        process = subprocess.Popen(
+            job.args,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env=env
+        )
+
+        return process, timeit.default_timer(), log
+
+    def run(self, jobs):
+        """
+        Run the provided jobs and return their results in the order the jobs
+        were provided.
+
+        :param list jobs:
+        :return: Results
+        :rtype: list
+        """
+        # variables
+        queue = sorted(jobs, key=lambda j: -j.priority)
+        running = []
+
+        # process jobs
+        while queue or running:
+            # start jobs
+            while queue and len(running) < self.processes:
+                # claim machine slot
+                slot = None
+                if self._slots:
+                    slot = self._slots.acquire()
+                    if slot is None:
+                        break
+
+                job = queue.pop(0)
+                running.append((job,) + self._start(job) + (slot,))
+
+            # wait for jobs
+            time.sleep(self._interval)
+
+            # validate jobs
+            for item in running[:]:
+                job, process, start, log, slot = item
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+
+                # store result
+                log.close()
+                running.remove(item)
+                job.returncode = returncode
+                job.durations.append(timeit.default_timer() - start)
+
+                # release machine slot
+                if slot is not None:
+                    self._slots.release(slot)
+
+                # retry job
+                if returncode != 0 and job.attempts <= self.retries:
+                    queue.append(job)
+                    queue.sort(key=lambda j: -j.priority)
+
+        return [job.getResult() for job in jobs]
+
+
+# ----------------------------------------------------------------------------
+
+
+def isProcessAlive(pid):
+    """
+    On windows signal 0 terminates the process instead of checking its
+    existence, the process is opened with limited query rights instead and
+    its exit code is checked.
+
+    :param int pid:
+    :return: Alive state of the process
+    :rtype: bool
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(
+            PROCESS_QUERY_LIMITED_INFORMATION,
+            False,
+            pid
+        )
+        if not handle:
+            return kernel32.GetLastError() == ERROR_ACCESS_DENIED
+
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+
+    return True
+
+
+def getJobName(path):
+    """
+    Get a job name from the path of the file the job processes. The name is
+    the file name without extension followed by a short hash of the full
+    path, which keeps the names of files with the same name in different
+    directories unique.
+
+    :param str path:
+    :return: Job name
+    :rtype: str
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    full = os.path.normcase(os.path.abspath(path)).replace("\\", "/")
+    digest = hashlib.sha1(full.encode("utf-8")).hexdigest()
+    return "{}-{}".format(name, digest[:8])
+
+
+def validateJobNames(names):
+    """
+    :param list names:
+    :raise ValueError: When job names are not unique
+    """
+    seen = set()
+    duplicates = set()
+    for name in names:
+        if name in seen:
+            duplicates.add(name)
+
+        seen.add(name)
+
+    if duplicates:
+        raise ValueError(
+            "Job names are not unique: {}!".format(
+                ", ".join(sorted(duplicates))
+            )
+        )
+
+
+# ----------------------------------------------------------------------------
+
+
+def getMayaPy():
+    """
+    Get the path to the standalone maya interpreter. If the MAYA_LOCATION
+    environment variable is set the interpreter of that location is used.
+
+    :return: Maya interpreter
+    :rtype: str
+    """
+    location = os.environ.get("MAYA_LOCATION")
+    if not location:
+        return "mayapy"
+
+    name = "mayapy.exe" if sys.platform.startswith("win") else "mayapy"
+    return os.path.join(location, "bin", name)
+
+
+def getEnvironment():
+    """
+    Get the environment for the job processes, the scripts directory of this
+    module is added to the python path.
+
+    :return: Environment
+    :rtype: dict
+    """
+    env = dict(os.environ)
+    scripts = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = [scripts] + [p for p in [env.get("PYTHONPATH")] if p]
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+
+    return env
+
+
+def writeSummary(path, results, **kwargs):
+    """
+    Write the results of a pool to a json file. Additional information can
+    be added to the summary using keyword arguments.
+
+    :param str path:
+    :param list results:
+    """
+    summary = OrderedDict(sorted(kwargs.items()))
+    summary["jobs"] = results
+    summary["succeeded"] = len([r for r in results if r["success"]])
+    summary["failed"] = len([r for r in results if not r["success"]])
+
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=4)
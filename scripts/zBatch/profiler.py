@@ -0,0 +1,416 @@
+"""
+Profile a solver over a frame window and attribute its cost to the tissue
+groups of the solver. The tissue groups are the parents of the tissue
+meshes, the same grouping the manager uses to enable and disable tissues.
+
+Every frame of the window is timed with all groups enabled. The cost of a
+set of groups is the time saved when that set is disabled. The sets are
+bisected until a set is a single group or its cost drops below the
+threshold, so cheap halves of the solver are never split any further.
+Costs of disabled sets are not strictly additive, the time that isn't
+attributed to any group is reported as overhead.
+
+.. highlight::
+    mayapy -m zBatch.profiler scene.ma --solver zSolver1
+        --start 1001 --end 1010 --output profile.json
+
+The stand-in solver doesn't import maya, which allows the attribution to
+be tested without a maya license or the ziva plugin.
+
+.. highlight::
+    python -m zBatch.profiler --stub --stub-groups 0.01 0.002 0.004
+"""
+import sys
+import json
+import timeit
+import argparse
+from collections import OrderedDict
+
+from .solvers import StandInSolver
+
+
+# ----------------------------------------------------------------------------
+
+
+class StandInProfileSolver(StandInSolver):
+    """
+    The stand-in profile solver mimics a solver with tissue groups. Every
+    step takes the base duration plus the cost of all enabled groups.
+
+    :param int/float startFrame:
+    :param int/float endFrame:
+    :param dict costs: Time every group adds to a step in seconds
+    :param float duration: Time every step takes without any groups
+    """
+    def __init__(self, startFrame, endFrame, costs, duration=0.0):
+        super(StandInProfileSolver, self).__init__(
+            startFrame,
+            endFrame,
+            duration=duration
+        )
+
+        self._costs = OrderedDict(costs)
+        self._baseDuration = duration
+        self._disabled = set()
+
+    # ------------------------------------------------------------------------
+
+    def getGroups(self):
+        """
+        :return: Group names
+        :rtype: list
+        """
+        return list(self._costs.keys())
+
+    def setGroupsEnabled(self, groups, state):
+        """
+        :param list groups:
+        :param bool state:
+        """
+        if state:
+            self._disabled.difference_update(groups)
+        else:
+            self._disabled.update(groups)
+
+    def restore(self):
+        self._disabled.clear()
+
+    # ------------------------------------------------------------------------
+
+    def step(self, frame):
+        """
+        :param int/float frame:
+        :return: Simulated points per mesh
+        :rtype: OrderedDict
+        """
+        self._duration = self._baseDuration + sum(
+            cost
+            for group, cost in self._costs.items()
+            if group not in self._disabled
+        )
+
+        return super(StandInProfileSolver, self).step(frame)
+
+
+class ZivaProfileSolver(object):
+    """
+    The ziva profile solver steps a solver in the open scene. The tissue
+    groups are retrieved from the manager, only groups that are enabled are
+    profiled and the enabled state of every tissue is restored after
+    profiling. The solver shouldn't be cached, as cached frames are read
+    instead of solved.
+
+    :param str solver:
+    :param int/float startFrame:
+    :param int/float endFrame:
+    """
+    def __init__(self, solver, startFrame, endFrame):
+        from maya import cmds
+        from zManager import groups
+
+        self._solver = solver
+        self._startFrame = startFrame
+        self._endFrame = endFrame
+        self._groups = groups.getTissueGroups(solver)
+        self._states = OrderedDict(
+            (tissue, cmds.getAttr("{}.enable".format(tissue)))
+            for meshes in self._groups.values()
+            for tissue in groups.getTissues(meshes)
+        )
+
+    # ------------------------------------------------------------------------
+
+    def getGroups(self):
+        """
+        :return: Group names
+        :rtype: list
+        """
+        from zManager.groups import isTissueGroupEnabled
+
+        return [
+            group
+            for group, meshes in self._groups.items()
+            if isTissueGroupEnabled(meshes)
+        ]
+
+    def setGroupsEnabled(self, groups, state):
+        """
+        :param list groups:
+        :param bool state:
+        """
+        from zManager.groups import setTissueGroupEnabled
+
+        for group in groups:
+            setTissueGroupEnabled(self._groups[group], state)
+
+    def restore(self):
+        """
+        Restore the enabled state of all tissues to the state before
+        profiling.
+        """
+        from maya import cmds
+
+        for tissue, state in self._states.items():
+            cmds.setAttr("{}.enable".format(tissue), state)
+
+    # ------------------------------------------------------------------------
+
+    def setup(self, state=None):
+        """
+        Set the time to the start frame of the solver, which resets the
+        simulation.
+
+        :param str/None state:
+        :return: Start and end frame
+        :rtype: tuple
+        """
+        from maya import cmds
+
+        plug = "{}.startFrame".format(self._solver)
+        cmds.currentTime(cmds.getAttr(plug))
+        cmds.currentTime(self._startFrame)
+
+        return self._startFrame, self._endFrame
+
+    def step(self, frame):
+        """
+        :param int/float frame:
+        """
+        from maya import cmds
+
+        cmds.currentTime(frame)
+
+
+# ----------------------------------------------------------------------------
+
+
+class Profiler(object):
+    """
+    The profiler times every frame of the window the solver is stepped
+    over. Every measurement resets the solver and is repeated, the fastest
+    repeat is kept to reduce the influence of other processes.
+
+    :param StandInProfileSolver/ZivaProfileSolver solver:
+    :param float threshold:
+        Share of the total cost below which a set of groups isn't bisected
+    :param int repeats:
+    """
+    def __init__(self, solver, threshold=0.05, repeats=1):
+        self._solver = solver
+        self._threshold = threshold
+        self._repeats = max(1, repeats)
+        self._measurements = 0
+
+    # ------------------------------------------------------------------------
+
+    def timeFrames(self, disabled=()):
+        """
+        Time every frame of the window with the provided groups disabled.
+
+        :param list/tuple disabled:
+        :return: Time per frame
+        :rtype: OrderedDict
+        """
+        self._solver.setGroupsEnabled(disabled, False)
+
+        try:
+            best = None
+            for _ in range(self._repeats):
+                startFrame, endFrame = self._solver.setup()
+
+                times = OrderedDict()
+                frame = startFrame
+                while frame <= endFrame:
+                    t = timeit.default_timer()
+                    self._solver.step(frame)
+                    times[frame] = timeit.default_timer() - t
+                    frame += 1
+
+                if best is None or sum(times.values()) < sum(best.values()):
+                    best = times
+        finally:
+            self._solver.setGroupsEnabled(disabled, True)
+
+        self._measurements += 1
+        return best
+
+    # ------------------------------------------------------------------------
+
+    def _bisect(self, groups, total, costs):
+        """
+        Disable the groups and attribute the saved time to them. When the
+        cost is above the threshold and more than one group is disabled, the
+        groups are split in two and both halves are attributed on their own.
+
+        :param list groups:
+        :param float total: Total time with all groups enabled
+        :param list costs: Attributed costs, entries are appended in place
+        """
+        times = self.timeFrames(groups)
+        cost = max(0.0, total - sum(times.values()))
+
+        if len(groups) == 1 or cost < total * self._threshold:
+            costs.append((groups, cost))
+            return
+
+        half = len(groups) // 2
+        self._bisect(groups[:half], total, costs)
+        self._bisect(groups[half:], total, costs)
+
+    def profile(self):
+        """
+        :return: Profile report
+        :rtype: OrderedDict
+        """
+        self._measurements = 0
+
+        try:
+            # time frames
+            frames = self.timeFrames()
+            total = sum(frames.values())
+
+            # attribute costs
+            costs = []
+            groups = self._solver.getGroups()
+            if groups and total:
+                self._bisect(groups, total, costs)
+        finally:
+            self._solver.restore()
+
+        # rank costs
+        costs.sort(key=lambda entry: entry[1], reverse=True)
+        attributed = sum(cost for _, cost in costs)
+
+        return OrderedDict(
+            [
+                ("frames", [[frame, t] for frame, t in frames.items()]),
+                ("total", total),
+                ("measurements", self._measurements),
+                ("threshold", self._threshold),
+                (
+                    "ranking",
+                    [
+                        OrderedDict(
+                            [
+                                ("groups", groups),
+                                ("time", cost),
+                                ("share", cost / total if total else 0.0),
+                            ]
+                        )
+                        for groups, cost in costs
+                    ]
+                ),
+                ("overhead", max(0.0, total - attributed)),
+            ]
+        )
+
+
+# ----------------------------------------------------------------------------
+
+
+def getTable(report):
+    """
+    :param dict report: Profile report
+    :return: Ranked costs formatted as a table
+    :rtype: str
+    """
+    lines = [
+        "{:<4} {:>10} {:>7}  {}".format("rank", "time", "share", "groups")
+    ]
+
+    for i, entry in enumerate(report["ranking"]):
+        lines.append(
+            "{:<4} {:>10.4f} {:>6.1f}%  {}".format(
+                i + 1,
+                entry["time"],
+                entry["share"] * 100,
+                ", ".join(entry["groups"])
+            )
+        )
+
+    lines.append(
+        "{:<4} {:>10.4f}          overhead".format("", report["overhead"])
+    )
+    lines.append(
+        "{:<4} {:>10.4f}          total, {} frames, {} measurements".format(
+            "",
+            report["total"],
+            len(report["frames"]),
+            report["measurements"]
+        )
+    )
+
+    return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getParser():
+    """
+    :return: Argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Profile a solver and attribute its cost to tissues."
+    )
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("--solver")
+    parser.add_argument("--start", type=float, default=1)
+    parser.add_argument("--end", type=float, default=10)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output")
+
+    # stand-in solver
+    parser.add_argument("--stub", action="store_true")
+    parser.add_argument("--stub-duration", type=float, default=0.0)
+    parser.add_argument("--stub-groups", type=float, nargs="*", default=[])
+
+    return parser
+
+
+def main(argv=None):
+    """
+    :param list/None argv:
+    :return: Exit code
+    :rtype: int
+    """
+    args = getParser().parse_args(argv)
+
+    if args.stub:
+        costs = OrderedDict(
+            ("group{}".format(i), cost)
+            for i, cost in enumerate(args.stub_groups)
+        )
+        solver = StandInProfileSolver(
+            args.start,
+            args.end,
+            costs,
+            duration=args.stub_duration
+        )
+    else:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+
+        from maya import cmds
+        cmds.loadPlugin("ziva", quiet=True)
+        cmds.file(args.scene, open=True, force=True)
+
+        solver = args.solver or cmds.ls(type="zSolver")[0]
+        solver = ZivaProfileSolver(solver, args.start, args.end)
+
+    # profile
+    report = Profiler(solver, args.threshold, args.repeats).profile()
+    print(getTable(report))
+
+    # write report
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
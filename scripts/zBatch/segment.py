@@ -0,0 +1,65 @@
+"""
+Export a single alembic segment of an animation in a standalone maya
+process. This module is used by the segmented export of the AnimationExport.
+
+.. highlight::
+    mayapy -m zBatch.segment scene.ma --root root --output seg.abc
+        --start 1001 --end 1100
+"""
+import sys
+import argparse
+
+
+def getParser():
+    """
+    :return: Argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Export a segment of an animation."
+    )
+    parser.add_argument("scene")
+    parser.add_argument("--root", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--start", type=float, required=True)
+    parser.add_argument("--end", type=float, required=True)
+    parser.add_argument("--step", type=float, default=1)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    :param list/None argv:
+    :return: Exit code
+    :rtype: int
+    """
+    args = getParser().parse_args(argv)
+
+    # initialize maya
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    from maya import cmds
+    from zAnimation import AnimationExport
+
+    # open scene
+    cmds.file(args.scene, open=True, force=True)
+
+    # export segment
+    exporter = AnimationExport(args.root)
+    job = exporter.getExportJob(
+        args.output,
+        args.step,
+        (args.start, args.end)
+    )
+
+    print("DEBUG: AbcExportCommand | {}".format(job))
+    cmds.loadPlugin("AbcExport", quiet=True)
+    cmds.AbcExport(j=job)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
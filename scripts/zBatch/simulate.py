@@ -0,0 +1,485 @@
+"""
+Import, simulate and cache many takes in parallel standalone maya
+processes. Every job opens a muscle rig scene, applies an exported take to
+the muscle rig, simulates from the solver start frame to the end of the
+take and writes a point cache of the simulated meshes.
+
+.. highlight::
+    mayapy -m zBatch.simulate jobs.json --output /sims --processes 2
+
+The jobs file contains a list of jobs, higher priorities are started first.
+Job names have to be unique, without a name the take name followed by a
+hash of its full path is used. When a shot range is provided only the
+frame window of the shot and its settle frames is simulated.
+
+.. highlight::
+    [
+        {"name": "shot1", "scene": "rig.ma", "take": "shot1.abc"},
+        {"name": "shot2", "scene": "rig.ma", "take": "shot2.abc",
+         "priority": 10, "shotRange": [1020, 1080], "settleFrames": 10}
+    ]
+
+The point cache is written one file per frame and the solver state is
+checkpointed at a fixed frame interval. When an interrupted job is started
+again with the same scene and take it resumes from its last checkpoint, the
+checkpoint is removed once the job completes. The stub mode replaces the ziva
+solver with a stand-in solver in a python process that doesn't import
+maya, this allows the scheduler to be tested without a maya license.
+"""
+import os
+import sys
+import json
+import timeit
+import argparse
+from collections import OrderedDict
+
+from . import pool, solvers
+
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+# ----------------------------------------------------------------------------
+
+
+def getParser():
+    """
+    :return: Argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Import, simulate and cache takes in parallel."
+    )
+    parser.add_argument("jobs")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--machine-limit", type=int, default=0)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--checkpoint-interval", type=int, default=10)
+    parser.add_argument("--summary")
+    parser.add_argument("--mayapy", default=pool.getMayaPy())
+    parser.add_argument("--stub", action="store_true")
+    parser.add_argument("--stub-duration", type=float, default=0.0)
+    parser.add_argument("--stub-failures", type=int, default=0)
+    parser.add_argument("--stub-start", type=float, default=1001)
+    parser.add_argument("--stub-end", type=float, default=1100)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--name")
+    parser.add_argument("--scene")
+    parser.add_argument("--take")
+    parser.add_argument("--shot-range", type=float, nargs=2)
+    parser.add_argument("--settle-frames", type=float, default=0)
+    parser.add_argument("--result")
+
+    return parser
+
+
+def readJobs(path):
+    """
+    :param str path:
+    :return: Jobs
+    :rtype: list
+    """
+    with open(path, "r") as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getCheckpointKey(scene, take, shotRange=None, settleFrames=0):
+    """
+    The checkpoint key identifies the inputs of a simulation, a checkpoint
+    is only resumed when its key matches. Changing the scene or take, or the
+    frame window of the shot, invalidates the checkpoint.
+
+    :param str scene:
+    :param str take:
+    :param list/None shotRange:
+    :param int/float settleFrames:
+    :return: Checkpoint key
+    :rtype: OrderedDict
+    """
+    key = OrderedDict()
+    for name, path in [("scene", scene), ("take", take)]:
+        path = os.path.normcase(os.path.abspath(path))
+        key[name] = [path, os.path.getmtime(path)]
+
+    key["shotRange"] = list(shotRange) if shotRange else None
+    key["settleFrames"] = settleFrames if shotRange else 0
+
+    # match the key as it is read from the checkpoint
+    return json.loads(json.dumps(key), object_pairs_hook=OrderedDict)
+
+
+def readCheckpoint(directory, key=None):
+    """
+    A checkpoint of which the key doesn't match the provided key is removed
+    together with its state, as it belongs to different inputs.
+
+    :param str directory:
+    :param dict/None key:
+    :return: Checkpoint
+    :rtype: dict/None
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return
+
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("key") != key:
+        removeCheckpoint(directory)
+        return
+
+    return checkpoint
+
+
+def writeCheckpoint(directory, frame, state, key=None):
+    """
+    The checkpoint is written to a temporary file first and then moved in
+    place, which prevents a partially written checkpoint when the process
+    is interrupted.
+
+    :param str directory:
+    :param int/float frame:
+    :param str state:
+    :param dict/None key:
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump(
+            OrderedDict([("key", key), ("frame", frame), ("state", state)]),
+            f
+        )
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    os.rename(temporary, path)
+
+
+def removeCheckpoint(directory):
+    """
+    Remove the checkpoint and the solver state it refers to.
+
+    :param str directory:
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return
+
+    try:
+        with open(path, "r") as f:
+            state = json.load(f).get("state")
+    except ValueError:
+        state = None
+
+    if state and os.path.exists(state):
+        os.remove(state)
+
+    os.remove(path)
+
+
+def writeFrame(directory, frame, points):
+    """
+    :param str directory:
+    :param int/float frame:
+    :param dict points:
+    :return: Frame path
+    :rtype: str
+    """
+    import numpy as np
+
+    path = os.path.join(directory, "frame.{:04d}.npz".format(int(frame)))
+    with open(path, "wb") as f:
+        np.savez(f, **{str(i): p for i, p in enumerate(points.values())})
+
+    # store the mesh names once
+    names = os.path.join(directory, "meshes.json")
+    if not os.path.exists(names):
+        with open(names, "w") as f:
+            json.dump(list(points.keys()), f, indent=4)
+
+    return path
+
+
+def simulate(solver, directory, interval=10, attempt=1, failures=0,
+             key=None):
+    """
+    Simulate all frames of the solver and write the point cache. The state
+    of the solver is checkpointed every interval frames, when a checkpoint
+    with a matching key exists the simulation resumes from the frame after
+    the checkpoint. The checkpoint is removed once all frames are simulated,
+    which means a job that is run again simulates all frames again.
+
+    :param StandInSolver/ZivaSolver solver:
+    :param str directory:
+    :param int interval:
+    :param int attempt:
+    :param int failures: Amount of attempts that fail halfway, stub only
+    :param dict/None key: Checkpoint key
+    :return: Simulation data
+    :rtype: OrderedDict
+    :raise RuntimeError: When the attempt is configured to fail
+    """
+    # get cache directory
+    cache = os.path.join(directory, "cache")
+    if not os.path.exists(cache):
+        os.makedirs(cache)
+
+    # setup solver
+    checkpoint = readCheckpoint(directory, key)
+    state = checkpoint["state"] if checkpoint else None
+    startFrame, endFrame = solver.setup(state)
+
+    frame = checkpoint["frame"] + 1 if checkpoint else startFrame
+    resumed = frame if checkpoint else None
+    failFrame = (startFrame + endFrame) // 2 if attempt <= failures else None
+
+    # simulate
+    start = timeit.default_timer()
+    simulated = 0
+    while frame <= endFrame:
+        # validate failure
+        if failFrame is not None and frame >= failFrame:
+            raise RuntimeError(
+                "Stub failure on attempt {} at frame {}!".format(
+                    attempt,
+                    frame
+                )
+            )
+
+        writeFrame(cache, frame, solver.step(frame))
+        simulated += 1
+
+        # write checkpoint
+        if (frame - startFrame + 1) % interval == 0 and frame != endFrame:
+            previous = state
+            state = solver.saveState(
+                os.path.join(directory, "state.{:04d}".format(int(frame)))
+            )
+            writeCheckpoint(directory, frame, state, key)
+
+            # remove previous state
+            if previous and previous != state and os.path.exists(previous):
+                os.remove(previous)
+
+        frame += 1
+
+    # remove checkpoint
+    removeCheckpoint(directory)
+
+    return OrderedDict(
+        [
+            ("startFrame", startFrame),
+            ("endFrame", endFrame),
+            ("resumedFrom", resumed),
+            ("simulatedFrames", simulated),
+            ("simulate", timeit.default_timer() - start),
+            ("cache", cache),
+        ]
+    )
+
+
+# ----------------------------------------------------------------------------
+
+
+def runWorker(args):
+    """
+    Simulate a single take and write the result to the result path.
+
+    :param argparse.Namespace args:
+    :raise IOError: When the scene or take doesn't exist
+    """
+    # validate files
+    for path in [args.scene, args.take]:
+        if not os.path.exists(path):
+            raise IOError("File '{}' doesn't exist!".format(path))
+
+    # get directory
+    directory = os.path.join(args.output, args.name)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    # get solver
+    attempt = int(os.environ.get(pool.ATTEMPT_VARIABLE, 1))
+    if args.stub:
+        startFrame, endFrame = args.stub_start, args.stub_end
+        if args.shot_range:
+            startFrame = args.shot_range[0] - args.settle_frames
+            endFrame = args.shot_range[1]
+
+        solver = solvers.StandInSolver(
+            startFrame,
+            endFrame,
+            duration=args.stub_duration
+        )
+    else:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+
+        solver = solvers.ZivaSolver(
+            args.scene,
+            args.take,
+            args.shot_range,
+            args.settle_frames
+        )
+
+    # simulate
+    data = simulate(
+        solver,
+        directory,
+        args.checkpoint_interval,
+        attempt,
+        args.stub_failures if args.stub else 0,
+        getCheckpointKey(
+            args.scene,
+            args.take,
+            args.shot_range,
+            args.settle_frames
+        )
+    )
+
+    # write result
+    if args.result:
+        with open(args.result, "w") as f:
+            json.dump(data, f, indent=4)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getWorkerArgs(args, job, result):
+    """
+    :param argparse.Namespace args:
+    :param dict job:
+    :param str result:
+    :return: Worker command arguments
+    :rtype: list
+    """
+    executable = sys.executable if args.stub else args.mayapy
+    workerArgs = [
+        executable, "-m", "zBatch.simulate", args.jobs,
+        "--worker",
+        "--name", job["name"],
+        "--scene", job["scene"],
+        "--take", job["take"],
+        "--result", result,
+        "--output", args.output,
+        "--checkpoint-interval", str(args.checkpoint_interval),
+    ]
+
+    if job.get("shotRange"):
+        workerArgs.extend(
+            ["--shot-range"] + [str(frame) for frame in job["shotRange"]]
+        )
+        workerArgs.extend(
+            ["--settle-frames", str(job.get("settleFrames", 0))]
+        )
+
+    if args.stub:
+        workerArgs.extend(
+            [
+                "--stub",
+                "--stub-duration", str(args.stub_duration),
+                "--stub-failures", str(args.stub_failures),
+                "--stub-start", str(args.stub_start),
+                "--stub-end", str(args.stub_end),
+            ]
+        )
+
+    return workerArgs
+
+
+def runScheduler(args):
+    """
+    Simulate all of the jobs in a pool of worker processes and write a
+    summary containing the timings of every job.
+
+    :param argparse.Namespace args:
+    :return: Results
+    :rtype: list
+    """
+    # get directories
+    logs = os.path.join(args.output, "logs")
+    if not os.path.exists(logs):
+        os.makedirs(logs)
+
+    # get job names, the take names are made unique with a hash of the
+    # full path of the take.
+    data = readJobs(args.jobs)
+    for job in data:
+        job.setdefault("name", pool.getJobName(job["take"]))
+
+    pool.validateJobNames([job["name"] for job in data])
+
+    # create jobs
+    jobs = []
+    for job in data:
+        result = os.path.join(logs, "{}.json".format(job["name"]))
+        log = os.path.join(logs, "{}.log".format(job["name"]))
+
+        # remove existing result
+        if os.path.exists(result):
+            os.remove(result)
+
+        jobs.append(
+            pool.Job(
+                job["name"],
+                getWorkerArgs(args, job, result),
+                result,
+                log,
+                job.get("priority", 0)
+            )
+        )
+
+    # run jobs
+    slots = pool.MachineSlots(args.machine_limit) \
+        if args.machine_limit else None
+    workers = pool.Pool(
+        args.processes,
+        args.retries,
+        pool.getEnvironment(),
+        slots=slots
+    )
+    start = timeit.default_timer()
+    results = workers.run(jobs)
+    duration = timeit.default_timer() - start
+
+    # write summary
+    summary = args.summary or os.path.join(args.output, "summary.json")
+    pool.writeSummary(
+        summary,
+        results,
+        duration=duration,
+        processes=args.processes,
+        machineLimit=args.machine_limit,
+        retries=args.retries
+    )
+
+    return results
+
+
+def main(argv=None):
+    """
+    :param list/None argv:
+    :return: Exit code
+    :rtype: int
+    """
+    args = getParser().parse_args(argv)
+
+    # run worker
+    if args.worker:
+        runWorker(args)
+        return 0
+
+    # run scheduler
+    results = runScheduler(args)
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+The solvers used by the simulation workers. A solver is set up once, after
+which it is stepped frame by frame. Every step returns the points of the
+simulated meshes. The state of a solver can be saved to a checkpoint, and
+a solver that is set up from a checkpoint continues from that state.
+
+The stand-in solver doesn't import maya, which allows the scheduler to be
+tested without a maya license or the ziva plugin.
+"""
+import time
+from collections import OrderedDict
+
+
+# ----------------------------------------------------------------------------
+
+
+class StandInSolver(object):
+    """
+    The stand-in solver mimics a simulation. A set of points follows an
+    animated target with damping, so the points of every frame depend on
+    the points of the previous frame just like a real simulation.
+
+    :param int/float startFrame:
+    :param int/float endFrame:
+    :param int numPoints:
+    :param float duration: Time every step takes in seconds
+    :param float damping:
+    """
+    def __init__(self, startFrame, endFrame, numPoints=100, duration=0.0,
+                 damping=0.5):
+        self._startFrame = startFrame
+        self._endFrame = endFrame
+        self._numPoints = numPoints
+        self._duration = duration
+        self._damping = damping
+        self._points = None
+
+    # ------------------------------------------------------------------------
+
+    def _getTarget(self, frame):
+        """
+        :param int/float frame:
+        :return: Target points
+        :rtype: numpy.ndarray
+        """
+        import numpy as np
+
+        indices = np.arange(self._numPoints, dtype=float)
+        target = np.zeros((self._numPoints, 3))
+        target[:, 0] = indices
+        target[:, 1] = np.sin(frame * 0.1 + indices * 0.01)
+        return target
+
+    # ------------------------------------------------------------------------
+
+    def setup(self, state=None):
+        """
+        :param str/None state:
+        :return: Start and end frame
+        :rtype: tuple
+        """
+        import numpy as np
+
+        if state:
+            with open(state, "rb") as f:
+                self._points = np.load(f)["points"]
+        else:
+            self._points = self._getTarget(self._startFrame)
+
+        return self._startFrame, self._endFrame
+
+    def step(self, frame):
+        """
+        :param int/float frame:
+        :return: Simulated points per mesh
+        :rtype: OrderedDict
+        """
+        time.sleep(self._duration)
+
+        target = self._getTarget(frame)
+        self._points = self._points + (target - self._points) * self._damping
+
+        return OrderedDict([("standIn", self._points)])
+
+    def saveState(self, path):
+        """
+        :param str path: Path without extension
+        :return: State path
+        :rtype: str
+        """
+        import numpy as np
+
+        path = path + ".npz"
+        with open(path, "wb") as f:
+            np.savez(f, points=self._points)
+
+        return path
+
+
+class ZivaSolver(object):
+    """
+    The ziva solver opens the muscle rig scene in the standalone maya
+    session, imports the take and applies it to the muscle rig of the same
+    character. The simulated meshes are all meshes of the muscle rig that
+    are not part of its animation group.
+
+    The simulated frames are stored in a zCache, the state is saved as a
+    maya scene containing the zCache. When set up from that scene the solver
+    continues from the last cached frame.
+
+    When a shot range is provided the simulation is limited to the frame
+    window of the shot and its settle frames.
+
+    :param str scene:
+    :param str take:
+    :param tuple/None shotRange:
+    :param int/float settleFrames:
+    """
+    def __init__(self, scene, take, shotRange=None, settleFrames=0):
+        self._scene = scene
+        self._take = take
+        self._shotRange = shotRange
+        self._settleFrames = settleFrames
+        self._meshes = []
+
+    # ------------------------------------------------------------------------
+
+    def _getMeshes(self, importer):
+        """
+        :param MusclesAnimationImport importer:
+        :return: Simulated meshes
+        :rtype: list
+        """
+        from maya import cmds
+
+        animated = set(
+            cmds.listRelatives(
+                importer.animation,
+                allDescendents=True,
+                fullPath=True
+            ) or []
+        )
+        meshes = cmds.listRelatives(
+            importer.root,
+            allDescendents=True,
+            fullPath=True,
+            type="mesh"
+        ) or []
+
+        return [
+            mesh
+            for mesh in meshes
+            if mesh not in animated
+            and not cmds.getAttr("{}.intermediateObject".format(mesh))
+        ]
+
+    def _applyTake(self):
+        """
+        Import the take and apply it to the muscle rig of the same character.
+
+        :return: Muscle rig and animation
+        :rtype: tuple
+        :raise RuntimeError: When no muscle rig matches the take
+        """
+        from maya import cmds
+        from zAnimation import Animation, pruning
+        from zMuscles import MusclesAnimationImport
+
+        # import take
+        existing = set(cmds.ls(assemblies=True, long=True))
+        cmds.loadPlugin("AbcImport", quiet=True)
+        cmds.AbcImport(self._take, mode="import")
+        created = set(cmds.ls(assemblies=True, long=True)) - existing
+
+        # get animation
+        animations = [
+            animation
+            for animations in Animation.getAnimationsFromScene().values()
+            for animation in animations
+            if cmds.ls(animation.root, long=True)[0] in created
+        ]
+
+        if not animations:
+            raise RuntimeError(
+                "No animation found in take '{}'!".format(self._take)
+            )
+
+        animation = animations[0]
+
+        # import static nodes of a pruned take
+        pruning.importStaticNodes(animation.root, self._take)
+
+        # get muscle rig
+        importers = MusclesAnimationImport.getMuscleSystemsFromScene().get(
+            animation.character
+        )
+
+        if not importers:
+            raise RuntimeError(
+                "No muscle rig found for character '{}'!".format(
+                    animation.character
+                )
+            )
+
+        importer = importers[0]
+        importer.applyAnimation(animation, evaluate=False)
+
+        return importer, animation
+
+    # ------------------------------------------------------------------------
+
+    def setup(self, state=None):
+        """
+        :param str/None state:
+        :return: Start and end frame
+        :rtype: tuple
+        """
+        from maya import cmds
+        from zAnimation import Animation
+        from zMuscles import MusclesAnimationImport
+
+        cmds.loadPlugin("ziva", quiet=True)
+
+        if state:
+            # open checkpoint
+            cmds.file(state, open=True, force=True)
+
+            animation = [
+                animation
+                for animations in Animation.getAnimationsFromScene().values()
+                for animation in animations
+            ][0]
+            importer = MusclesAnimationImport.getMuscleSystemsFromScene()[
+                animation.character
+            ][0]
+        else:
+            # open scene and apply take
+            cmds.file(self._scene, open=True, force=True)
+            importer, animation = self._applyTake()
+
+            # limit frame window
+            if self._shotRange:
+                importer.setFrameWindow(
+                    animation,
+                    self._shotRange[0],
+                    self._shotRange[1],
+                    self._settleFrames
+                )
+
+            cmds.select(importer.solver, replace=True)
+            cmds.zCacheCreate()
+
+        # get simulated meshes
+        self._meshes = self._getMeshes(importer)
+
+        # get frame range
+        startFrame = cmds.getAttr("{}.startFrame".format(importer.solver))
+        endFrame = importer.simulationEndFrame
+        return startFrame, animation.endFrame if endFrame is None else endFrame
+
+    def step(self, frame):
+        """
+        :param int/float frame:
+        :return: Simulated points per mesh
+        :rtype: OrderedDict
+        """
+        import numpy as np
+        from maya import cmds
+
+        cmds.currentTime(frame)
+
+        return OrderedDict(
+            (
+                mesh,
+                np.array(
+                    cmds.xform(
+                        "{}.vtx[*]".format(mesh),
+                        query=True,
+                        worldSpace=True,
+                        translation=True
+                    ),
+                    dtype=float
+                ).reshape(-1, 3)
+            )
+            for mesh in self._meshes
+        )
+
+    def saveState(self, path):
+        """
+        :param str path: Path without extension
+        :return: State path
+        :rtype: str
+        """
+        from maya import cmds
+
+        path = path.replace("\\", "/") + ".mb"
+        cmds.file(rename=path)
+        cmds.file(save=True, type="mayaBinary", force=True)
+
+        return path
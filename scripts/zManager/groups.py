@@ -0,0 +1,61 @@
+from maya import cmds
+from collections import OrderedDict
+
+
+def getTissueGroups(solver):
+    """
+    Get the tissue meshes of the solver grouped by their parent. The groups
+    are sorted by name, the meshes without a parent are stored in the
+    "None" group.
+
+    :param str solver:
+    :return: Tissue meshes per group
+    :rtype: OrderedDict
+    """
+    # variable
+    data = {}
+
+    # get tissues
+    meshes = cmds.zQuery(solver, mesh=True, type="zTissue") or []
+    meshes.sort()
+
+    # filter tissues
+    for m in meshes:
+        p = cmds.listRelatives(m, parent=True)
+        p = p[0] if p else "None"
+
+        if p not in data.keys():
+            data[p] = []
+        data[p].append(m)
+
+    return OrderedDict(sorted(data.items()))
+
+
+def getTissues(meshes):
+    """
+    :param list meshes:
+    :return: zTissue nodes attached to the meshes
+    :rtype: list
+    """
+    return [cmds.zQuery(m, type="zTissue")[0] for m in meshes]
+
+
+def isTissueGroupEnabled(meshes):
+    """
+    :param list meshes:
+    :return: Enabled state of all tissues attached to the meshes
+    :rtype: bool
+    """
+    return all(
+        cmds.getAttr("{}.enable".format(tissue))
+        for tissue in getTissues(meshes)
+    )
+
+
+def setTissueGroupEnabled(meshes, state):
+    """
+    :param list meshes:
+    :param bool state:
+    """
+    for tissue in getTissues(meshes):
+        cmds.setAttr("{}.enable".format(tissue), state)
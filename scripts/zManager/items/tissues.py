@@ -1,5 +1,5 @@
-from maya import cmds
 from . import base, mesh
+from .. import groups
 from zUtils import contexts
 
 
@@ -8,7 +8,8 @@ class MeshTissueItem(base.CheckBoxItem):
         super(MeshTissueItem, self).__init__(parent, container)
 
         # variables
-        states = []
+        self._container = container
+        self._meshes = meshes
 
         # loop meshes
         for m in meshes:
@@ -16,16 +17,22 @@ class MeshTissueItem(base.CheckBoxItem):
             item = mesh.MeshItem(self, m)
             item.setExpanded(True)
 
-            # get tissue enabled state
-            tissue = cmds.zQuery(m, type="zTissue")[0]
-            states.append(cmds.getAttr("{}.enable".format(tissue)))
-
         # set checked default state
-        self.widget.setChecked(all(states))
+        self.widget.setChecked(groups.isTissueGroupEnabled(meshes))
         self.widget.stateChanged.connect(self.setEnabledTissues)
 
     # ------------------------------------------------------------------------
 
+    @property
+    def container(self):
+        """
+        :return: Container
+        :rtype: str
+        """
+        return self._container
+
+    # ------------------------------------------------------------------------
+
     def setEnabledTissues(self, state):
         """
         Loop all children of the container and set the zTissue node that is
@@ -36,11 +43,23 @@ class MeshTissueItem(base.CheckBoxItem):
         """
         with contexts.UndoChunk():
             state = True if state == 2 else False
-            num = self.childCount()
-            for i in range(num):
-                m = self.child(i)
-                tissue = cmds.zQuery(m.widget.node, type="zTissue")[0]
-                cmds.setAttr("{}.enable".format(tissue), state)
+            groups.setTissueGroupEnabled(self._meshes, state)
+
+    def setCost(self, entry=None):
+        """
+        Display the share of the solver cost of the tissue group as
+        attributed by the profiler. When no entry is provided the cost is
+        cleared.
+
+        :param dict/None entry: Ranked entry of the profiler report
+        """
+        if entry is None:
+            self.widget.setText(self._container)
+            return
+
+        self.widget.setText(
+            "{} ({:.1f}%)".format(self._container, entry["share"] * 100)
+        )
 
 
 class TissuesItem(base.LabelItem):
@@ -48,24 +67,29 @@ class TissuesItem(base.LabelItem):
         super(TissuesItem, self).__init__(parent, text="tissues")
         self.setExpanded(True)
 
-        # variable
-        data = {}
-
-        # get tissues
-        meshes = cmds.zQuery(solver, mesh=True, type="zTissue") or []
-        meshes.sort()
-
-        # filter tissues
-        for m in meshes:
-            p = cmds.listRelatives(m, parent=True)
-            p = p[0] if p else "None"
-
-            if p not in data.keys():
-                data[p] = []
-            data[p].append(m)
-
         # add tissues
-        for container, meshes in data.iteritems():
+        for container, meshes in groups.getTissueGroups(solver).iteritems():
             # add parent
             parent = MeshTissueItem(self, container, meshes)
             parent.setExpanded(True)
+
+    # ------------------------------------------------------------------------
+
+    def setCosts(self, report):
+        """
+        Display the share of the solver cost of every tissue group. Groups
+        that were not resolved individually by the profiler are cleared.
+
+        :param dict report: Profiler report
+        """
+        # get individually resolved groups
+        entries = {
+            entry["groups"][0]: entry
+            for entry in report["ranking"]
+            if len(entry["groups"]) == 1
+        }
+
+        # update items
+        for i in range(self.childCount()):
+            item = self.child(i)
+            item.setCost(entries.get(item.container))
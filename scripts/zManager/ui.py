@@ -10,6 +10,7 @@ class Manager(QtWidgets.QWidget):
 
         # variable
         self._id = None
+        self._tissues = None
 
         # set as window
         self.setParent(parent)
@@ -33,6 +34,11 @@ class Manager(QtWidgets.QWidget):
         self.search.searchChanged.connect(self.filter)
         layout.addWidget(self.search)
 
+        # create profile
+        profile = widgets.Button(self, "profile tissues")
+        profile.released.connect(self.profile)
+        layout.addWidget(profile)
+
         # create scroll
         self.tree = QtWidgets.QTreeWidget(self)
         self.tree.setRootIsDecorated(True)
@@ -159,6 +165,32 @@ class Manager(QtWidgets.QWidget):
 
     # ------------------------------------------------------------------------
 
+    def profile(self):
+        """
+        Profile the active solver over the playback range and display the
+        share of the solver cost of every tissue group. The full report is
+        printed to the script editor.
+        """
+        from zBatch import profiler
+
+        # validate solver
+        solver = self.solver.solver
+        if not solver or not self._tissues:
+            return
+
+        # profile solver, the toggling of the tissues is a single undo chunk
+        # which prevents it from flooding the undo queue.
+        with ui.Wait(), contexts.UndoChunk():
+            startFrame = cmds.playbackOptions(query=True, minTime=True)
+            endFrame = cmds.playbackOptions(query=True, maxTime=True)
+            target = profiler.ZivaProfileSolver(solver, startFrame, endFrame)
+            report = profiler.Profiler(target).profile()
+
+        print(profiler.getTable(report))
+        self._tissues.setCosts(report)
+
+    # ------------------------------------------------------------------------
+
     def update(self, solver):
         """
         Update the ui with the provided solver.
@@ -170,6 +202,7 @@ class Manager(QtWidgets.QWidget):
 
         # clear layout
         self.tree.clear()
+        self._tissues = None
 
         # validate solver
         if not solver:
@@ -177,7 +210,7 @@ class Manager(QtWidgets.QWidget):
 
         # add items
         items.BonesItem(self.tree, solver)
-        items.TissuesItem(self.tree, solver)
+        self._tissues = items.TissuesItem(self.tree, solver)
 
         # do search
         self.filter(self.search.text)
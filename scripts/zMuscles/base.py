@@ -1,4 +1,3 @@
-from maya import cmds
 from zUtils import attributes
 from .tags import ZIVA_MUSCLES
 
@@ -21,33 +20,21 @@ class Muscles(object):
     @classmethod
     def getMuscleSystemsFromScene(cls):
         """
-        Loop over all transforms and that contain an import animation tag.
-        Read the value of this tag and add it into a dictionary.
+        Get all transforms that contain an import animation tag from the tag
+        index. The value of this tag is used as the key of the dictionary.
 
         :return: Exported animation from current scene
         :rtype: dict
         """
-        # data variable
-        data = {}
-
-        # loop transforms
-        for node in cmds.ls(transforms=True):
-            # get plug
-            plug = attributes.getPlug(node, ZIVA_MUSCLES)
-
-            # validate plug
-            if cmds.objExists(plug):
-                # get character
-                character = cmds.getAttr(plug)
-
-                # add character to dictionary
-                if character not in data.keys():
-                    data[character] = []
-
-                # add animation to dictionary
-                data[character].append(cls(node, character))
-
-        return data
+        # the tag index is used to prevent looping over all of the
+        # transforms in the scene, as the tags already exist providing the
+        # character doesn't write any tags.
+        index = attributes.getTagIndex(ZIVA_MUSCLES)
+
+        return {
+            character: [cls(tag.node, character) for tag in tags]
+            for character, tags in index.getAll().iteritems()
+        }
 
     # ------------------------------------------------------------------------
 
@@ -0,0 +1,187 @@
+import math
+from maya import cmds
+from collections import OrderedDict
+from zUtils import attributes, benchmark
+
+from .importer import MusclesAnimationImport, ANIMATION_NODE_TYPES
+from .tags import ZIVA_SOLVER_ATTRIBUTES
+
+
+# ----------------------------------------------------------------------------
+
+
+def createRig(numConnections, attrs=ZIVA_SOLVER_ATTRIBUTES):
+    """
+    Create a synthetic muscle rig of which the animation group contains
+    nodes that are driven by choice nodes, the same way segmented animation
+    drives the muscle rig. Every node is driven on the provided attributes
+    until the amount of connections is reached. The solver is replaced with
+    a transform that contains a substeps attribute.
+
+    :param int numConnections:
+    :param list attrs:
+    :return: Importer and connections
+    :rtype: OrderedDict
+    """
+    # create nodes
+    root = cmds.createNode("transform", name="muscles", skipSelect=True)
+    group = cmds.createNode("transform", name="animation", skipSelect=True)
+    solver = cmds.createNode("transform", name="solver", skipSelect=True)
+    cmds.addAttr(
+        solver,
+        longName="substeps",
+        attributeType="long",
+        defaultValue=1,
+        keyable=True
+    )
+
+    # create connections
+    connections = []
+    numNodes = int(math.ceil(numConnections / float(len(attrs))))
+    for i in range(numNodes):
+        node = cmds.createNode(
+            "transform",
+            name="bone{}".format(i),
+            parent=group,
+            skipSelect=True
+        )
+        choice = cmds.createNode(
+            "choice",
+            name="choice{}".format(i),
+            skipSelect=True
+        )
+
+        for attr in attrs:
+            connections.append(
+                (
+                    attributes.getPlug(choice, "output"),
+                    attributes.getPlug(node, attr)
+                )
+            )
+
+    # create importer
+    data = OrderedDict()
+    data["importer"] = MusclesAnimationImport(
+        root,
+        "benchmark",
+        animation=group,
+        solver=solver
+    )
+    data["connections"] = connections[:numConnections]
+
+    return data
+
+
+def connectRig(data):
+    """
+    Connect the animation nodes and key the solver attributes of the
+    synthetic muscle rig.
+
+    :param dict data:
+    """
+    # connect animation
+    for source, target in data["connections"]:
+        cmds.connectAttr(source, target, force=True)
+
+    # key solver
+    solver = data["importer"].solver
+    cmds.setKeyframe(
+        solver,
+        attribute=ZIVA_SOLVER_ATTRIBUTES + ["substeps"],
+        time=1
+    )
+    cmds.setKeyframe(
+        solver,
+        attribute=ZIVA_SOLVER_ATTRIBUTES + ["substeps"],
+        time=2
+    )
+
+
+# ----------------------------------------------------------------------------
+
+
+def removeAnimationPerPlug(importer):
+    """
+    The per plug teardown of the animation, as it was used by the
+    MusclesAnimationImport before the teardown was batched. It is used as
+    the reference in the benchmark.
+
+    :param MusclesAnimationImport importer:
+    """
+    # get nodes
+    nodes = cmds.listRelatives(importer.animation, allDescendents=True)
+
+    # get connections
+    connections = []
+    for nodeType in ANIMATION_NODE_TYPES:
+        connections.extend(
+            cmds.listConnections(
+                nodes,
+                type=nodeType,
+                plugs=True,
+                connections=True,
+                skipConversionNodes=True,
+                source=True,
+                destination=False
+            ) or []
+        )
+
+    # remove connections
+    sourcePlugs = connections[1::2]
+    targetPlugs = connections[::2]
+
+    for source, target in zip(sourcePlugs, targetPlugs):
+        cmds.disconnectAttr(source, target)
+        attributes.setDefaultValue(target)
+
+    # remove animation curves from solver
+    for attr in ZIVA_SOLVER_ATTRIBUTES + ["substeps"]:
+        plug = attributes.getPlug(importer.solver, attr)
+        anim = cmds.listConnections(
+            plug,
+            type="animCurve",
+            source=True,
+            destination=False,
+            skipConversionNodes=True
+        )
+
+        if anim:
+            cmds.delete(anim)
+
+
+def removeAnimationBatched(importer):
+    """
+    :param MusclesAnimationImport importer:
+    """
+    importer._removeAnimation()
+    importer._removeSolverAnimation()
+
+
+def benchmarkRemoveAnimation(sizes=(1000, 2500, 5000, 10000), repeat=3):
+    """
+    Compare the per plug teardown of the animation with the batched teardown
+    on synthetic muscle rigs with an increasing amount of connections. The
+    rig is connected again before every run. Note that the scene will be
+    cleared for every size.
+
+    :param list sizes:
+    :param int repeat:
+    :return: Results
+    :rtype: list
+    """
+    # run benchmark
+    results = benchmark.benchmark(
+        [
+            ("perPlug", lambda d: removeAnimationPerPlug(d["importer"])),
+            ("batched", lambda d: removeAnimationBatched(d["importer"])),
+        ],
+        sizes,
+        createRig,
+        repeat=repeat,
+        reset=connectRig
+    )
+
+    # print results
+    print(benchmark.formatResults(results))
+
+    return results
@@ -1,10 +1,25 @@
-from maya import cmds
-from zUtils import path, contexts, transforms, attributes, decorators
-from zAnimation import Animation
+import numpy as np
+from maya import cmds, OpenMaya
+from itertools import count
+from collections import OrderedDict
+from zUtils import (
+    api,
+    path,
+    undo,
+    contexts,
+    transforms,
+    attributes,
+    decorators
+)
+from zUtils.animation import createAnimationCurve
+from zAnimation import Animation, consumers, segmentation
 
 from .base import Muscles
 from .tags import (
     ZIVA_MUSCLES_ANIMATION,
+    ZIVA_MUSCLES_TAKE,
+    ZIVA_MUSCLES_TAKES,
+    ZIVA_MUSCLES_SIMULATION_END,
     ZIVA_SOLVER,
     ZIVA_SOLVER_ATTRIBUTES
 )
@@ -13,10 +28,73 @@ from .tags import (
 # ----------------------------------------------------------------------------
 
 
+# segmented animation is driven by choice nodes that select the alembic node
+# of the segment that owns the current frame.
+ANIMATION_NODE_TYPES = ["AlembicNode", "choice"]
+
+# the amount of takes that stay loaded when switching between takes
+MAX_TAKES = 8
+
+
+# ----------------------------------------------------------------------------
+
+
+def breakConnections(modifier, plug):
+    """
+    Add the disconnection of all incoming connections of the plug to the
+    modifier.
+
+    :param MDGModifier modifier:
+    :param MPlug plug:
+    """
+    existing = OpenMaya.MPlugArray()
+    plug.connectedTo(existing, True, False)
+    for i in range(existing.length()):
+        modifier.disconnect(existing[i], plug)
+
+
+def createOffsetReaders(nodes, offset):
+    """
+    Create a copy of every alembic node that is offset in time. The copies
+    read the same alembic archive, which is shared between alembic nodes
+    that read the same file.
+
+    :param list nodes:
+    :param int/float offset:
+    :return: Offset alembic nodes mapped to their original
+    :rtype: dict
+    :raise ValueError: When one of the nodes is not an alembic node
+    """
+    readers = {}
+    for node in nodes:
+        # validate node
+        if cmds.nodeType(node) != "AlembicNode":
+            raise ValueError(
+                "Time offsets are not supported for '{}' nodes!".format(
+                    cmds.nodeType(node)
+                )
+            )
+
+        # create offset reader
+        reader = cmds.duplicate(node, inputConnections=True)[0]
+        plug = attributes.getPlug(reader, "offset")
+        cmds.setAttr(plug, cmds.getAttr(plug) + offset)
+        readers[node] = reader
+
+    return readers
+
+
+# ----------------------------------------------------------------------------
+
+
 class MusclesAnimationImport(Muscles):
     def __init__(self, root, character=None, animation=None, solver=None):
         super(MusclesAnimationImport, self).__init__(root, character)
 
+        # variables
+        self._takeOrder = []
+        self.maxTakes = MAX_TAKES
+
         # validate animation
         if not animation and not self.animation:
             raise RuntimeError("Declare the 'animation' variable!")
@@ -55,141 +133,297 @@ class MusclesAnimationImport(Muscles):
         """
         return attributes.getLink(self.root, ZIVA_SOLVER, destination=True)
 
+    @property
+    def simulationEndFrame(self):
+        """
+        :return: Last frame that has to be simulated, None if not set
+        :rtype: float/None
+        """
+        plug = attributes.getPlug(self.root, ZIVA_MUSCLES_SIMULATION_END)
+        if cmds.objExists(plug):
+            return cmds.getAttr(plug)
+
     # ------------------------------------------------------------------------
 
-    def _transferAnimation(self, animation):
+    def _getAnimationConnections(self, nodes):
         """
-        Create a driving connection between matches of the animation and
-        muscle rig. Meshes will be checked to see if they
+        Get all connections of animation nodes driving the provided nodes
+        using a single query per animation node type.
 
-        :param AnimationExport animation:
+        :param list nodes:
+        :return: Source and destination plugs
+        :rtype: list
+        """
+        # validate nodes
+        if not nodes:
+            return []
+
+        # get connections
+        connections = []
+        for nodeType in ANIMATION_NODE_TYPES:
+            connections.extend(
+                cmds.listConnections(
+                    nodes,
+                    type=nodeType,
+                    plugs=True,
+                    connections=True,
+                    skipConversionNodes=True,
+                    source=True,
+                    destination=False
+                ) or []
+            )
+
+        return zip(connections[1::2], connections[::2])
+
+    def _getTransferConnections(self, animation, animationConnections=None):
         """
-        # get meshes
-        sources = cmds.listRelatives(animation.root, allDescendents=True)
-        targets = cmds.listRelatives(self.animation, allDescendents=True)
+        Match the nodes of the animation with the nodes of the muscle rig on
+        their namespace-less name and get the connections that would drive
+        the muscle rig. The animation connections of the animation can be
+        provided when they are shared between multiple muscle rigs.
 
-        # get meshes mappers
+        :param Animation animation:
+        :param list/None animationConnections:
+        :return: Source and target plugs and unmatched nodes
+        :rtype: OrderedDict
+        """
+        # get nodes
+        sources = cmds.listRelatives(animation.root, allDescendents=True) or []
+        targets = cmds.listRelatives(self.animation, allDescendents=True) or []
+
+        # get mappers
         mapper = {path.getName(t): t for t in targets}
+        names = {source: path.getName(source) for source in sources}
+
+        # get unmatched nodes
+        result = OrderedDict()
+        result["connections"] = []
+        result["unmatched"] = [
+            source
+            for source in sources
+            if names[source] not in mapper
+        ]
 
-        # loop source meshes
-        for source in sources:
-            # get target mesh
-            name = path.getName(source)
+        # get connections
+        if animationConnections is None:
+            animationConnections = self._getAnimationConnections(sources)
+
+        for sourcePlug, destinationPlug in animationConnections:
+            # get target node
+            node, attr = destinationPlug.split(".", 1)
+            name = names.get(node) or path.getName(node)
             target = mapper.get(name)
 
             if not target:
-                s = "DEBUG: transferAnimation | Unable to find target for {}!"
-                print s.format(source)
                 continue
 
-            # get connections
-            connections = cmds.listConnections(
-                source,
-                type="AlembicNode",
-                plugs=True,
-                connections=True,
-                skipConversionNodes=True,
-                source=True,
-                destination=False
-            ) or []
+            targetPlug = attributes.getPlug(target, attr)
+            result["connections"].append((sourcePlug, targetPlug))
+
+        return result
+
+    def _transferAnimation(self, animation):
+        """
+        Create a driving connection between matches of the animation and
+        muscle rig. Nodes are matched on their namespace-less name, the
+        connections of all nodes are queried at once and made in a single
+        DG modification. The modification is executed through an undoable
+        command, this means the transfer can be undone in a single step.
+
+        :param AnimationExport animation:
+        :return: Made connections and unmatched nodes
+        :rtype: OrderedDict
+        """
+        # get connections
+        result = self._getTransferConnections(animation)
+
+        # create connections
+        modifier = OpenMaya.MDGModifier()
+        for sourcePlug, targetPlug in result["connections"]:
+            source = api.getMPlug(sourcePlug)
+            destination = api.getMPlug(targetPlug)
+
+            # disconnect existing connections
+            breakConnections(modifier, destination)
 
-            # do connections
-            targetAttributes = [t.split(".", 1)[-1] for t in connections[::2]]
-            sourcePlugs = connections[1::2]
+            # connect
+            modifier.connect(source, destination)
 
-            for sourcePlug, attr in zip(sourcePlugs, targetAttributes):
-                targetPlug = attributes.getPlug(target, attr)
-                cmds.connectAttr(sourcePlug, targetPlug, force=True)
+        undo.doIt(modifier)
 
-    def _createSolverAnimation(self, animation):
+        return result
+
+    def _createSolverAnimation(self, animation, offset=0):
         """
         Create solver animation. It handles the first frame jump and the
-        substeps on the solver.
+        substeps on the solver. The world matrices of the exported solver
+        parent are sampled using a DG context and the keys are written
+        directly to new animation curves, this means the current time is
+        never changed and the rig and solver are not evaluated. The keys
+        can be offset in time to match an offset animation.
 
         :param AnimationExport animation:
+        :param int/float offset:
         """
         # set animation start frame
         plug = attributes.getPlug(self.solver, "startFrame")
-        cmds.setAttr(plug, animation.startFrame)
+        cmds.setAttr(plug, animation.startFrame + offset)
 
-        # get solver mover plugs
-        plugs = [
-            attributes.getPlug(self.solver, attr)
-            for attr in ZIVA_SOLVER_ATTRIBUTES
-        ]
+        # sample exported solver parent
+        frames = [animation.startFrame, animation.startFrame + 1]
+        matrices = transforms.getWorldMatricesAtTimes(
+            [animation.solver],
+            frames
+        )[0]
 
-        # create first frame jump
-        for frame in [animation.startFrame, animation.startFrame + 1]:
-            # set time
-            cmds.currentTime(frame)
+        # convert to local space of the solver
+        parent = cmds.listRelatives(self.solver, parent=True, fullPath=True)
+        if parent:
+            parentMatrices = transforms.getWorldMatricesAtTimes(
+                parent,
+                frames
+            )[0]
+            matrices = np.matmul(matrices, np.linalg.inv(parentMatrices))
 
-            # position solver
-            matrix = transforms.getWorldMatrixAtTime(animation.solver)
-            cmds.xform(self.solver, ws=True, matrix=matrix)
+        # get channels
+        rotateOrder = cmds.getAttr(
+            attributes.getPlug(self.solver, "rotateOrder")
+        )
+        channels = transforms.decomposeMatrices(matrices, rotateOrder)
 
-            # set keyframes
-            cmds.setKeyframe(
-                plugs,
-                inTangentType="linear",
-                outTangentType="linear"
+        # create first frame jump
+        times = [frame + offset for frame in frames]
+        for attr, values in zip(ZIVA_SOLVER_ATTRIBUTES, channels.T):
+            createAnimationCurve(
+                attributes.getPlug(self.solver, attr),
+                times,
+                values
             )
 
         # create sub step frame jump
         plug = attributes.getPlug(self.solver, "substeps")
+        self.setSubstepAnimation(
+            [(animation.startFrame + offset + 2, cmds.getAttr(plug))]
+        )
+
+    def setSubstepAnimation(self, schedule):
+        """
+        Key the substeps of the solver. The first two frames of the solver
+        are keyed to a single substep to handle the first frame jump, after
+        which every substep count of the schedule is held until the next
+        entry. Existing substep animation is replaced.
 
-        # set keyframes
-        tangents = {"inTangentType": "linear", "outTangentType": "linear"}
-        cmds.setKeyframe(plug, time=animation.startFrame + 2, **tangents)
-        cmds.setKeyframe(plug, time=animation.startFrame + 1, value=1, **tangents)
-        cmds.setKeyframe(plug, time=animation.startFrame, value=1, **tangents)
+        :param list schedule: Frame and substep count pairs
+        :return: Animation curve
+        :rtype: str
+        """
+        # get start frame
+        plug = attributes.getPlug(self.solver, "startFrame")
+        startFrame = cmds.getAttr(plug)
+
+        # remove existing substep animation
+        plug = attributes.getPlug(self.solver, "substeps")
+        anim = cmds.listConnections(
+            plug,
+            type="animCurve",
+            source=True,
+            destination=False,
+            skipConversionNodes=True
+        )
+
+        if anim:
+            cmds.delete(anim)
+
+        # get keys, only changes in substep count are keyed
+        times = [startFrame, startFrame + 1]
+        values = [1, 1]
+        for frame, substeps in sorted(schedule):
+            if frame <= times[-1] or substeps == values[-1]:
+                continue
+
+            times.append(frame)
+            values.append(substeps)
+
+        return createAnimationCurve(
+            plug,
+            times,
+            values,
+            OpenMaya.MFnAnimCurve.kTangentStep
+        )
 
     # ------------------------------------------------------------------------
 
     def _removeAnimation(self):
         """
-        Loop al nodes in the animation container and remove any connection
-        made to an AlembicNode.
+        Remove all connections made by animation nodes to the nodes in the
+        animation container and restore their default values. All
+        connections are removed and defaults are restored in a single
+        undoable DG modification, the default values are read from the
+        cached default table.
         """
-        # get nodes
-        nodes = cmds.listRelatives(self.animation, allDescendents=True)
-
         # get connections
-        connections = cmds.listConnections(
-            nodes,
-            type="AlembicNode",
-            plugs=True,
-            connections=True,
-            skipConversionNodes=True,
-            source=True,
-            destination=False
-        ) or []
+        nodes = cmds.listRelatives(self.animation, allDescendents=True) or []
+        targets = [
+            target
+            for _, target in self._getAnimationConnections(nodes)
+        ]
+
+        # get default values
+        defaults = attributes.getDefaultValues(targets)
 
-        # remove connections
-        sourcePlugs = connections[1::2]
-        targetPlugs = connections[::2]
+        # remove connections and restore defaults
+        modifier = OpenMaya.MDGModifier()
+        for target, default in zip(targets, defaults):
+            destination = api.getMPlug(target)
+            breakConnections(modifier, destination)
 
-        for source, target in zip(sourcePlugs, targetPlugs):
-            cmds.disconnectAttr(source, target)
-            attributes.setDefaultValue(target)
+            if default is not None:
+                attributes.addPlugValue(modifier, destination, default)
+
+        undo.doIt(modifier)
 
     def _removeSolverAnimation(self):
         """
-        Loop al keyframed attributes on the solver and delete any animation
-        curves connected to it.
+        Delete all animation curves connected to the keyframed attributes on
+        the solver in a single command.
         """
+        # get plugs
+        plugs = [
+            attributes.getPlug(self.solver, attr)
+            for attr in ZIVA_SOLVER_ATTRIBUTES + ["substeps"]
+        ]
+
         # remove animation curves from solver
-        for attr in ZIVA_SOLVER_ATTRIBUTES + ["substeps"]:
-            plug = attributes.getPlug(self.solver, attr)
-            anim = cmds.listConnections(
-                plug,
-                type="animCurve",
-                source=True,
-                destination=False,
-                skipConversionNodes=True
-            )
+        anim = cmds.listConnections(
+            plugs,
+            type="animCurve",
+            source=True,
+            destination=False,
+            skipConversionNodes=True
+        )
 
-            if anim:
-                cmds.delete(anim)
+        if anim:
+            cmds.delete(list(set(anim)))
+
+    # ------------------------------------------------------------------------
+
+    def getConsumedNames(self):
+        """
+        Get the names of the nodes in the animation group that animation is
+        transferred to. These names can be set on the AnimationExport to only
+        export what will be connected.
+
+        :return: Consumed names
+        :rtype: list
+        """
+        nodes = cmds.listRelatives(self.animation, allDescendents=True) or []
+        return sorted(set(path.getName(node) for node in nodes))
+
+    def writeConsumedNames(self, filePath):
+        """
+        :param str filePath:
+        """
+        consumers.writeNames(filePath, self.getConsumedNames())
 
     # ------------------------------------------------------------------------
 
@@ -200,38 +434,164 @@ class MusclesAnimationImport(Muscles):
         """
         return Animation.getAnimationsFromScene().get(self.character, [])
 
+    def getFrameWindow(self, animation, shotStart, shotEnd, settleFrames=0):
+        """
+        Get the frames that have to be simulated to cover the shot range with
+        the required amount of settle frames before the shot. When the
+        animation contains a pre roll the simulation has to start at the
+        start of the pre roll, as the transition from the zero pose is baked
+        into the animation. The frames between the end of the pre roll and
+        the settle start are simulated but not used, these can only be
+        removed by exporting the animation with its pre roll closer to the
+        shot. Without a pre roll the simulation starts at the settle start.
+
+        :param Animation animation:
+        :param int/float shotStart:
+        :param int/float shotEnd:
+        :param int/float settleFrames:
+        :return: Frame window
+        :rtype: OrderedDict
+        :raise ValueError: When the shot range is outside of the animation
+        :raise ValueError: When not enough frames are available to settle
+        """
+        # get pre roll
+        preRollStart = animation.startFrame
+        preRollEnd = preRollStart
+        if animation.transitionFrames:
+            preRollEnd = preRollStart + animation.transitionFrames + 1
+
+        # validate shot range
+        if shotStart > shotEnd \
+                or shotStart < preRollEnd \
+                or shotEnd > animation.endFrame:
+            raise ValueError(
+                "Shot range {}-{} is outside of the animation range "
+                "{}-{}!".format(
+                    shotStart,
+                    shotEnd,
+                    preRollEnd,
+                    animation.endFrame
+                )
+            )
+
+        # validate settle frames
+        settleStart = shotStart - settleFrames
+        if settleStart < preRollEnd:
+            raise ValueError(
+                "{} settle frames required, only {} available before the "
+                "shot!".format(settleFrames, shotStart - preRollEnd)
+            )
+
+        # get start frame
+        if animation.transitionFrames:
+            startFrame = preRollStart
+            unusedFrames = settleStart - preRollEnd
+        else:
+            startFrame = settleStart
+            unusedFrames = 0
+
+        # get frame counts
+        frames = shotEnd - startFrame + 1
+        trimmedFrames = animation.endFrame - preRollStart + 1 - frames
+
+        return OrderedDict(
+            [
+                ("startFrame", startFrame),
+                ("preRollStart", preRollStart),
+                ("preRollEnd", preRollEnd),
+                ("settleStart", settleStart),
+                ("shotStart", shotStart),
+                ("shotEnd", shotEnd),
+                ("endFrame", shotEnd),
+                ("frames", frames),
+                ("unusedFrames", unusedFrames),
+                ("trimmedFrames", trimmedFrames),
+            ]
+        )
+
+    def setFrameWindow(self, animation, shotStart, shotEnd, settleFrames=0):
+        """
+        Limit the simulation to the frame window of the shot. The start frame
+        of the solver is set and the end frame of the simulation is stored on
+        the root node. This should be called after the animation is applied.
+
+        :param Animation animation:
+        :param int/float shotStart:
+        :param int/float shotEnd:
+        :param int/float settleFrames:
+        :return: Frame window
+        :rtype: OrderedDict
+        """
+        # get frame window
+        window = self.getFrameWindow(
+            animation,
+            shotStart,
+            shotEnd,
+            settleFrames
+        )
+
+        # set solver start frame
+        plug = attributes.getPlug(self.solver, "startFrame")
+        cmds.setAttr(plug, window["startFrame"])
+
+        # set simulation end frame
+        attributes.createTag(self.root, ZIVA_MUSCLES_SIMULATION_END, 0.0)
+        plug = attributes.getPlug(self.root, ZIVA_MUSCLES_SIMULATION_END)
+        cmds.setAttr(plug, window["endFrame"])
+
+        return window
+
     # ------------------------------------------------------------------------
 
-    def removeAnimation(self):
+    def removeAnimation(self, evaluate=True):
         """
         Loop all meshes in the importer node and see if a blendshape node is
-        connected. If this is the case remove the blendshape node.
+        connected. If this is the case remove the blendshape node. When not
+        evaluating, the current time is not changed and the scene is not
+        refreshed.
+
+        :param bool evaluate:
         """
         # disable ziva solvers
         with contexts.DisableZivaSolvers():
             # set start frame of existing solver frame
-            plug = attributes.getPlug(self.solver, "startFrame")
-            frame = cmds.getAttr(plug)
-            cmds.currentTime(frame)
+            if evaluate:
+                plug = attributes.getPlug(self.solver, "startFrame")
+                frame = cmds.getAttr(plug)
+                cmds.currentTime(frame)
 
             # remove animation
             self._removeAnimation()
             self._removeSolverAnimation()
+            self._removeSwitches()
 
-        cmds.refresh()
-        cmds.currentTime(frame)
+            # remove simulation end frame
+            plug = attributes.getPlug(self.root, ZIVA_MUSCLES_SIMULATION_END)
+            if cmds.objExists(plug):
+                cmds.deleteAttr(plug)
 
-    def applyAnimation(self, animation):
+        if evaluate:
+            cmds.refresh()
+            cmds.currentTime(frame)
+
+    def applyAnimation(self, animation, evaluate=True):
         """
+        Apply the animation to the muscle rig. When not evaluating, the
+        current time is not changed and the scene is not refreshed, which
+        means neither the rig nor the solvers are evaluated.
+
         :param AnimationExport animation:
+        :param bool evaluate:
+        :return: Made connections and unmatched nodes
+        :rtype: OrderedDict
         """
         # remove existing animation
-        self.removeAnimation()
+        self.removeAnimation(evaluate)
 
         # disable ziva solvers
         with contexts.DisableZivaSolvers():
             # create animation
-            self._transferAnimation(animation)
+            result = self._transferAnimation(animation)
 
             # create solver animation
             if animation.transitionFrames:
@@ -239,7 +599,487 @@ class MusclesAnimationImport(Muscles):
 
             # set start frame - 1
             # doing this will prevent a crash
-            cmds.currentTime(animation.startFrame-1)
+            if evaluate:
+                cmds.currentTime(animation.startFrame-1)
+
+        if evaluate:
+            cmds.refresh()
+            cmds.currentTime(animation.startFrame)
+
+        return result
+
+    @classmethod
+    def applyCrowdAnimation(cls, importers, animation, offsets=None,
+                            evaluate=True):
+        """
+        Apply the animation to many muscle rigs of the same character at once.
+        The animation connections of the take are queried once and the
+        connections of all muscle rigs are made in a single undoable DG
+        modification, all muscle rigs share the alembic node of the take.
+        Muscle rigs with a time offset share an offset copy of the alembic
+        node that reads the same archive. The solver animation of all muscle
+        rigs is created without evaluating the scene, the solver matrices
+        are only sampled once. The entire application is a single undo
+        chunk.
+
+        :param list importers:
+        :param Animation animation:
+        :param list/None offsets: Time offset per muscle rig
+        :param bool evaluate:
+        :return: Made connections and unmatched nodes per muscle rig
+        :rtype: OrderedDict
+        :raise ValueError: When the amount of offsets doesn't match
+        """
+        # validate importers
+        if not importers:
+            return OrderedDict()
+
+        # validate offsets
+        offsets = offsets or [0] * len(importers)
+        if len(offsets) != len(importers):
+            raise ValueError("Provide an offset for every muscle rig!")
+
+        # get animation connections
+        nodes = cmds.listRelatives(animation.root, allDescendents=True) or []
+        connections = importers[0]._getAnimationConnections(nodes)
+        sources = list(
+            set(source.split(".", 1)[0] for source, _ in connections)
+        )
+
+        # disable ziva solvers, the nested contexts of the removal of the
+        # existing animation will not toggle the solvers again.
+        results = OrderedDict()
+        with contexts.UndoChunk(), contexts.DisableZivaSolvers():
+            # remove existing animation
+            for importer in importers:
+                importer.removeAnimation(evaluate=False)
+
+            # create animation
+            readers = {0: {}}
+            modifier = OpenMaya.MDGModifier()
+            for importer, offset in zip(importers, offsets):
+                # get offset readers
+                if offset not in readers:
+                    readers[offset] = createOffsetReaders(sources, offset)
+
+                # get connections
+                result = importer._getTransferConnections(
+                    animation,
+                    connections
+                )
+                results[importer.root] = result
+
+                for sourcePlug, targetPlug in result["connections"]:
+                    node, attr = sourcePlug.split(".", 1)
+                    node = readers[offset].get(node, node)
+
+                    source = api.getMPlug(attributes.getPlug(node, attr))
+                    destination = api.getMPlug(targetPlug)
+
+                    breakConnections(modifier, destination)
+                    modifier.connect(source, destination)
+
+            undo.doIt(modifier)
+
+            # create solver animation, the exported solver parent is sampled
+            # once for all muscle rigs.
+            if animation.transitionFrames:
+                with transforms.WorldMatrixSampler():
+                    for importer, offset in zip(importers, offsets):
+                        importer._createSolverAnimation(animation, offset)
+
+            # set start frame - 1
+            # doing this will prevent a crash
+            if evaluate:
+                cmds.currentTime(animation.startFrame - 1)
+
+        if evaluate:
+            cmds.refresh()
+            cmds.currentTime(animation.startFrame)
+
+        return results
+
+    def applySegmentedAnimation(self, manifestPath):
+        """
+        Import the segments of a segmented export as one continuous
+        animation and apply it to the muscle rig.
+
+        :param str manifestPath:
+        :return: Imported animation
+        :rtype: Animation
+        """
+        root = segmentation.importSegments(manifestPath)
+        animation = Animation(root)
+        self.applyAnimation(animation)
+
+        return animation
+
+    # ------------------------------------------------------------------------
+
+    def _createTakeAttributes(self):
+        """
+        Create the take index and take links on the root node. The take
+        index drives the selector of all switch nodes, the take links are a
+        multi message attribute of which the index matches the index of the
+        take in the switch nodes.
+        """
+        attributes.createTag(self.root, ZIVA_MUSCLES_TAKE, 0)
+
+        plug = attributes.getPlug(self.root, ZIVA_MUSCLES_TAKES)
+        if not cmds.objExists(plug):
+            cmds.addAttr(
+                self.root,
+                longName=ZIVA_MUSCLES_TAKES,
+                attributeType="message",
+                multi=True
+            )
+
+    def _getSwitches(self):
+        """
+        Get the switch nodes that drive the muscle rig. A switch node is a
+        choice node of which the selector is driven by the take index.
+
+        :return: Switch nodes mapped to the plug they drive
+        :rtype: dict
+        """
+        # get switch nodes
+        plug = attributes.getPlug(self.root, ZIVA_MUSCLES_TAKE)
+        if not cmds.objExists(plug):
+            return {}
+
+        switches = cmds.listConnections(
+            plug,
+            type="choice",
+            source=False,
+            destination=True
+        )
+
+        if not switches:
+            return {}
+
+        # get driven plugs
+        connections = cmds.listConnections(
+            list(set(switches)),
+            plugs=True,
+            connections=True,
+            skipConversionNodes=True,
+            source=False,
+            destination=True
+        ) or []
+
+        return {
+            target: api.getMObject(source.split(".", 1)[0])
+            for source, target in zip(connections[::2], connections[1::2])
+            if source.split(".", 1)[-1] == "output"
+        }
+
+    def _removeSwitches(self):
+        """
+        Delete all switch nodes and unlink all takes. The takes themselves
+        remain in the scene.
+        """
+        # delete switch nodes
+        plug = attributes.getPlug(self.root, ZIVA_MUSCLES_TAKE)
+        if cmds.objExists(plug):
+            switches = cmds.listConnections(
+                plug,
+                type="choice",
+                source=False,
+                destination=True
+            )
+
+            if switches:
+                cmds.delete(list(set(switches)))
+
+        # unlink takes
+        for index in self.getTakes().keys():
+            cmds.removeMultiInstance(
+                "{}[{}]".format(
+                    attributes.getPlug(self.root, ZIVA_MUSCLES_TAKES),
+                    index
+                ),
+                b=True
+            )
+
+        self._takeOrder = []
+
+    def _getLeastRecentTake(self, takes):
+        """
+        :param dict takes:
+        :return: Index of the least recently used take that is not active
+        :rtype: int/None
+        """
+        current = cmds.getAttr(
+            attributes.getPlug(self.root, ZIVA_MUSCLES_TAKE)
+        )
+        order = [index for index in self._takeOrder if index in takes]
+        order.extend(index for index in takes.keys() if index not in order)
+
+        for index in order:
+            if index != current:
+                return index
+
+    def _useTake(self, index):
+        """
+        :param int index:
+        """
+        if index in self._takeOrder:
+            self._takeOrder.remove(index)
+
+        self._takeOrder.append(index)
+
+    # ------------------------------------------------------------------------
+
+    def getTakes(self):
+        """
+        :return: Loaded takes mapped to their index
+        :rtype: OrderedDict
+        """
+        # validate attribute
+        plug = attributes.getPlug(self.root, ZIVA_MUSCLES_TAKES)
+        if not cmds.objExists(plug):
+            return OrderedDict()
+
+        # get takes
+        takes = OrderedDict()
+        for index in cmds.getAttr(plug, multiIndices=True) or []:
+            roots = cmds.listConnections(
+                "{}[{}]".format(plug, index),
+                source=True,
+                destination=False
+            )
+
+            if roots:
+                takes[index] = Animation(roots[0])
+
+        return takes
+
+    def loadTake(self, animation):
+        """
+        Load the take so it can be switched to without rewiring the muscle
+        rig. Every driven plug of the muscle rig is driven by a switch node,
+        the take is connected to the switch nodes on its own index. When the
+        maximum amount of takes is loaded, the least recently used take is
+        evicted first.
+
+        :param Animation animation:
+        :return: Take index
+        :rtype: int
+        """
+        # validate loaded
+        takes = self.getTakes()
+        root = cmds.ls(animation.root, long=True)[0]
+        for index, take in takes.iteritems():
+            if cmds.ls(take.root, long=True)[0] == root:
+                return index
+
+        # load take in a single undo chunk, the eviction of takes, the take
+        # link and the switch modification are undone at once.
+        with contexts.UndoChunk():
+            # evict takes
+            while takes and len(takes) >= self.maxTakes:
+                index = self._getLeastRecentTake(takes)
+                if index is None:
+                    break
+
+                self.evictTake(index)
+                takes = self.getTakes()
+
+            # link take
+            self._createTakeAttributes()
+            index = next(i for i in count() if i not in takes)
+            cmds.connectAttr(
+                attributes.getPlug(animation.root, "message"),
+                "{}[{}]".format(
+                    attributes.getPlug(self.root, ZIVA_MUSCLES_TAKES),
+                    index
+                )
+            )
+
+            # connect take
+            self._connectTake(animation, index, list(takes.keys()))
+
+        self._useTake(index)
+
+        return index
+
+    def _connectTake(self, animation, index, indices):
+        """
+        Connect the take to the switch nodes on its index. Switch nodes are
+        created for plugs that are not yet driven by a switch node. Inputs of
+        switch nodes that are not driven by a take are set to the default
+        value of the driven plug, this means switching to a take that
+        doesn't drive a plug resets that plug. All switches are made in a
+        single undoable DG modification.
+
+        :param Animation animation:
+        :param int index: Take index
+        :param list indices: Indices of the other loaded takes
+        """
+        # get connections
+        switches = self._getSwitches()
+        sources = OrderedDict(
+            (targetPlug, sourcePlug)
+            for sourcePlug, targetPlug
+            in self._getTransferConnections(animation)["connections"]
+        )
+
+        # get default values
+        targets = list(sources.keys())
+        targets.extend(target for target in switches if target not in sources)
+        defaults = dict(zip(targets, attributes.getDefaultValues(targets)))
+
+        # modify switches
+        selector = api.getMPlug(
+            attributes.getPlug(self.root, ZIVA_MUSCLES_TAKE)
+        )
+
+        modifier = OpenMaya.MDGModifier()
+        for targetPlug in targets:
+            destination = api.getMPlug(targetPlug)
+            default = defaults[targetPlug]
+
+            # create switch
+            switch = switches.get(targetPlug)
+            if not switch:
+                switch = modifier.createNode("choice")
+                breakConnections(modifier, destination)
+
+                dependencyNode = OpenMaya.MFnDependencyNode(switch)
+                modifier.connect(
+                    selector,
+                    dependencyNode.findPlug("selector", False)
+                )
+                modifier.connect(
+                    dependencyNode.findPlug("output", False),
+                    destination
+                )
+
+                # reset plug for the takes that were loaded before
+                if default is not None:
+                    for i in indices:
+                        attributes.addPlugValue(
+                            modifier,
+                            dependencyNode.findPlug(
+                                "input",
+                                False
+                            ).elementByLogicalIndex(i),
+                            default,
+                            destination.attribute()
+                        )
+
+            # connect take
+            plug = OpenMaya.MFnDependencyNode(switch).findPlug(
+                "input",
+                False
+            ).elementByLogicalIndex(index)
+            breakConnections(modifier, plug)
+
+            if targetPlug in sources:
+                modifier.connect(api.getMPlug(sources[targetPlug]), plug)
+            elif default is not None:
+                attributes.addPlugValue(
+                    modifier,
+                    plug,
+                    default,
+                    destination.attribute()
+                )
+
+        undo.doIt(modifier)
+
+    def evictTake(self, index):
+        """
+        Disconnect the take from the switch nodes and delete the take and the
+        animation nodes that drive it from the scene.
+
+        :param int index:
+        """
+        # validate take
+        take = self.getTakes().get(index)
+        if not take:
+            return
+
+        # evict take in a single undo chunk
+        with contexts.UndoChunk():
+            # disconnect take, switches drive many plugs and are deduplicated
+            switches = api.ObjectMap()
+            for switch in self._getSwitches().values():
+                switches[switch] = switch
+
+            modifier = OpenMaya.MDGModifier()
+            for switch in switches.values():
+                plug = OpenMaya.MFnDependencyNode(switch).findPlug(
+                    "input",
+                    False
+                ).elementByLogicalIndex(index)
+                breakConnections(modifier, plug)
+
+            undo.doIt(modifier)
+
+            # get animation nodes
+            nodes = cmds.listRelatives(take.root, allDescendents=True) or []
+            sources = set(
+                source.split(".", 1)[0]
+                for source, _ in self._getAnimationConnections(nodes)
+            )
+            if sources:
+                sources.update(
+                    cmds.listConnections(
+                        list(sources),
+                        type="AlembicNode",
+                        source=True,
+                        destination=False
+                    ) or []
+                )
+
+            # delete take
+            cmds.removeMultiInstance(
+                "{}[{}]".format(
+                    attributes.getPlug(self.root, ZIVA_MUSCLES_TAKES),
+                    index
+                ),
+                b=True
+            )
+            cmds.delete(list(sources) + [take.root])
+
+        if index in self._takeOrder:
+            self._takeOrder.remove(index)
+
+    def switchTake(self, animation, evaluate=True):
+        """
+        Switch the muscle rig to the take by setting the take index, the take
+        is loaded first if needed. The connections to the muscle rig are not
+        changed, only the solver animation is recreated to match the timing
+        of the take. When not evaluating, the current time is not changed and
+        the scene is not refreshed.
+
+        :param Animation animation:
+        :param bool evaluate:
+        :return: Take index
+        :rtype: int
+        """
+        # load take
+        index = self.loadTake(animation)
+
+        # disable ziva solvers
+        with contexts.DisableZivaSolvers():
+            # set take
+            plug = attributes.getPlug(self.root, ZIVA_MUSCLES_TAKE)
+            cmds.setAttr(plug, index)
+
+            # retime solver animation
+            self._removeSolverAnimation()
+            if animation.transitionFrames:
+                self._createSolverAnimation(animation)
+
+            # set start frame - 1
+            # doing this will prevent a crash
+            if evaluate:
+                cmds.currentTime(animation.startFrame - 1)
+
+        if evaluate:
+            cmds.refresh()
+            cmds.currentTime(animation.startFrame)
+        self._useTake(index)
 
-        cmds.refresh()
-        cmds.currentTime(animation.startFrame)
+        return index
@@ -0,0 +1,337 @@
+import numpy as np
+from maya import cmds
+from collections import OrderedDict
+from zUtils import attributes
+
+
+# ----------------------------------------------------------------------------
+
+
+def getTissueMeshes(importer):
+    """
+    :param MusclesAnimationImport importer:
+    :return: Tissue meshes of the solver
+    :rtype: list
+    """
+    meshes = cmds.zQuery(importer.solver, mesh=True, type="zTissue") or []
+    meshes.sort()
+
+    return meshes
+
+
+def getMeshPoints(meshes):
+    """
+    :param list meshes:
+    :return: World space points of all meshes
+    :rtype: numpy.ndarray
+    """
+    points = [
+        np.array(
+            cmds.xform(
+                "{}.vtx[*]".format(mesh),
+                query=True,
+                worldSpace=True,
+                translation=True
+            ),
+            dtype=float
+        ).reshape(-1, 3)
+        for mesh in meshes
+    ]
+
+    return np.concatenate(points) if points else np.zeros((0, 3))
+
+
+def getRanges(startFrame, endFrame, rangeSize):
+    """
+    :param int/float startFrame:
+    :param int/float endFrame:
+    :param int rangeSize:
+    :return: Start and end frame of every range
+    :rtype: list
+    """
+    ranges = []
+    frame = startFrame
+    while frame <= endFrame:
+        ranges.append((frame, min(frame + rangeSize - 1, endFrame)))
+        frame += rangeSize
+
+    return ranges
+
+
+# ----------------------------------------------------------------------------
+
+
+def getSubstepCurve(importer):
+    """
+    :param MusclesAnimationImport importer:
+    :return: Animation curve driving the substeps of the solver
+    :rtype: str/None
+    """
+    plug = attributes.getPlug(importer.solver, "substeps")
+    anim = cmds.listConnections(
+        plug,
+        type="animCurve",
+        source=True,
+        destination=False,
+        skipConversionNodes=True
+    )
+
+    if anim:
+        return anim[0]
+
+
+def backupSubsteps(importer):
+    """
+    Backup the substeps of the solver. When the substeps are animated the
+    animation curve is duplicated, which preserves its keys, tangents and
+    infinity exactly. Otherwise the static value is stored.
+
+    :param MusclesAnimationImport importer:
+    :return: Backup
+    :rtype: dict
+    """
+    anim = getSubstepCurve(importer)
+    if anim:
+        return {"curve": cmds.duplicate(anim)[0], "value": None}
+
+    plug = attributes.getPlug(importer.solver, "substeps")
+    return {"curve": None, "value": cmds.getAttr(plug)}
+
+
+def restoreSubsteps(importer, backup):
+    """
+    Replace the substep animation of the solver with the backup, the backup
+    is consumed.
+
+    :param MusclesAnimationImport importer:
+    :param dict backup:
+    """
+    # remove substep animation
+    anim = getSubstepCurve(importer)
+    if anim:
+        cmds.delete(anim)
+
+    # restore substeps
+    plug = attributes.getPlug(importer.solver, "substeps")
+    if backup["curve"]:
+        cmds.connectAttr(
+            attributes.getPlug(backup["curve"], "output"),
+            plug,
+            force=True
+        )
+    else:
+        cmds.setAttr(plug, backup["value"])
+
+
+def removeBackup(backup):
+    """
+    :param dict backup:
+    """
+    if backup["curve"] and cmds.objExists(backup["curve"]):
+        cmds.delete(backup["curve"])
+
+
+# ----------------------------------------------------------------------------
+
+
+def simulate(importer, meshes, startFrame, endFrame, schedule):
+    """
+    Key the schedule on the solver and simulate the solver from its start
+    frame until the end frame. The current time is restored afterwards.
+
+    :param MusclesAnimationImport importer:
+    :param list meshes:
+    :param int/float startFrame: First frame that is sampled
+    :param int/float endFrame:
+    :param list schedule: Frame and substep count pairs
+    :return: Points per frame
+    :rtype: OrderedDict
+    """
+    # key schedule
+    importer.setSubstepAnimation(schedule)
+
+    # reset solver
+    current = cmds.currentTime(query=True)
+    frame = cmds.getAttr(attributes.getPlug(importer.solver, "startFrame"))
+
+    # simulate
+    points = OrderedDict()
+    try:
+        while frame <= endFrame:
+            cmds.currentTime(frame)
+            if frame >= startFrame:
+                points[frame] = getMeshPoints(meshes)
+
+            frame += 1
+    finally:
+        cmds.currentTime(current)
+
+    return points
+
+
+def getErrors(points, reference):
+    """
+    :param OrderedDict points: Points per frame
+    :param OrderedDict reference: Reference points per frame
+    :return: Largest distance to the reference per frame
+    :rtype: OrderedDict
+    """
+    return OrderedDict(
+        (
+            frame,
+            float(
+                np.linalg.norm(values - reference[frame], axis=1).max()
+            ) if len(values) else 0.0
+        )
+        for frame, values in points.items()
+    )
+
+
+def getRangeErrors(errors, ranges):
+    """
+    :param OrderedDict errors: Error per frame
+    :param list ranges:
+    :return: Largest error per range
+    :rtype: list
+    """
+    return [
+        max(
+            error
+            for frame, error in errors.items()
+            if start <= frame <= end
+        )
+        for start, end in ranges
+    ]
+
+
+# ----------------------------------------------------------------------------
+
+
+def tuneSubsteps(importer, animation, candidates=(1, 2, 4, 8), reference=16,
+                 tolerance=0.1, rangeSize=10, iterations=3):
+    """
+    Key the lowest substep count per frame range that keeps the tissues of
+    the solver within the tolerance of a high substep reference simulation.
+    The animation should already be applied to the importer.
+
+    Every candidate is simulated once over the full frame window, for every
+    range the lowest candidate that stays within the tolerance is picked.
+    As the error of lower substeps in earlier ranges carries over into
+    later ranges, the combined schedule is simulated again and the ranges
+    that exceed the tolerance are raised to the next candidate, until the
+    schedule is within tolerance or the iterations are exhausted. When the
+    tuning fails the original substeps of the solver are restored.
+
+    :param MusclesAnimationImport importer:
+    :param Animation animation:
+    :param list/tuple candidates: Substep counts to try
+    :param int reference: Substep count of the reference simulation
+    :param float tolerance: Largest allowed distance in centimeters
+    :param int rangeSize: Amount of frames per range
+    :param int iterations: Amount of times the schedule is refined
+    :return: Tuning report
+    :rtype: OrderedDict
+    """
+    # get frame window, the first two frames are the frame jump
+    startFrame = cmds.getAttr(
+        attributes.getPlug(importer.solver, "startFrame")
+    ) + 2
+    endFrame = importer.simulationEndFrame
+    endFrame = animation.endFrame if endFrame is None else endFrame
+
+    # validate frame window
+    if endFrame < startFrame:
+        raise ValueError(
+            "No frames to tune between {} and {}!".format(
+                startFrame,
+                endFrame
+            )
+        )
+
+    # get original substeps, the original substeps are restored when the
+    # tuning fails.
+    plug = attributes.getPlug(importer.solver, "substeps")
+    original = cmds.getAttr(plug, time=startFrame)
+    backup = backupSubsteps(importer)
+
+    # variables
+    meshes = getTissueMeshes(importer)
+    ranges = getRanges(startFrame, endFrame, rangeSize)
+    candidates = sorted(set(candidates))
+
+    def run(substeps):
+        return simulate(
+            importer,
+            meshes,
+            startFrame,
+            endFrame,
+            [(start, value) for (start, _), value in zip(ranges, substeps)]
+        )
+
+    try:
+        # simulate reference
+        referencePoints = run([reference] * len(ranges))
+
+        # simulate candidates
+        choices = [None] * len(ranges)
+        for candidate in candidates:
+            errors = getErrors(run([candidate] * len(ranges)), referencePoints)
+            rangeErrors = getRangeErrors(errors, ranges)
+            for i, error in enumerate(rangeErrors):
+                if choices[i] is None and error <= tolerance:
+                    choices[i] = candidate
+
+        # fall back to reference
+        choices = [reference if c is None else c for c in choices]
+
+        # refine schedule
+        for _ in range(iterations):
+            errors = getErrors(run(choices), referencePoints)
+            rangeErrors = getRangeErrors(errors, ranges)
+            exceeded = [
+                i
+                for i, error in enumerate(rangeErrors)
+                if error > tolerance and choices[i] != reference
+            ]
+
+            if not exceeded:
+                break
+
+            for i in exceeded:
+                higher = [c for c in candidates if c > choices[i]]
+                choices[i] = higher[0] if higher else reference
+        else:
+            errors = getErrors(run(choices), referencePoints)
+            rangeErrors = getRangeErrors(errors, ranges)
+    except Exception:
+        restoreSubsteps(importer, backup)
+        raise
+
+    # key schedule
+    schedule = [(start, value) for (start, _), value in zip(ranges, choices)]
+    importer.setSubstepAnimation(schedule)
+    removeBackup(backup)
+
+    return OrderedDict(
+        [
+            ("reference", reference),
+            ("tolerance", tolerance),
+            ("original", original),
+            ("schedule", schedule),
+            (
+                "ranges",
+                [
+                    OrderedDict(
+                        [
+                            ("startFrame", start),
+                            ("endFrame", end),
+                            ("substeps", value),
+                            ("error", error),
+                        ]
+                    )
+                    for (start, end), value, error
+                    in zip(ranges, choices, rangeErrors)
+                ]
+            ),
+        ]
+    )
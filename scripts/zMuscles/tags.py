@@ -1,5 +1,8 @@
 ZIVA_MUSCLES = "__ziva_muscles"
 ZIVA_MUSCLES_ANIMATION = "__ziva_muscles_animation"
+ZIVA_MUSCLES_TAKE = "__ziva_muscles_take"
+ZIVA_MUSCLES_TAKES = "__ziva_muscles_takes"
+ZIVA_MUSCLES_SIMULATION_END = "__ziva_muscles_simulation_end"
 ZIVA_SOLVER = "__ziva_solver"
 ZIVA_SOLVER_ATTRIBUTES = [
     "tx", "ty", "tz",
@@ -1,4 +1,37 @@
-from maya import cmds
+import numpy as np
+from maya import cmds, OpenMaya
+from collections import OrderedDict
+from . import api
+
+
+def createAnimationCurve(plug, times, values,
+                         tangentType=OpenMaya.MFnAnimCurve.kTangentLinear):
+    """
+    Create an animation curve on the plug with all keys added at once. This
+    doesn't require the current time to change. The times are in ui units,
+    the values in internal units, which are radians for angles and
+    centimeters for distances.
+
+    :param str plug:
+    :param list times:
+    :param list values:
+    :param int tangentType:
+    :return: Animation curve
+    :rtype: str
+    """
+    # get keys
+    timeArray = OpenMaya.MTimeArray()
+    valueArray = OpenMaya.MDoubleArray()
+    for time, value in zip(times, values):
+        timeArray.append(OpenMaya.MTime(float(time), OpenMaya.MTime.uiUnit()))
+        valueArray.append(float(value))
+
+    # create animation curve
+    animCurve = OpenMaya.MFnAnimCurve()
+    animCurve.create(api.getMPlug(plug))
+    animCurve.addKeys(timeArray, valueArray, tangentType, tangentType)
+
+    return animCurve.name()
 
 
 def getIncomingAnimationCurves(transforms):
@@ -55,11 +88,288 @@ def getPlugFromAnimationCurves(animCurves):
     return plugs
 
 
+def getAnimationData(nodes):
+    """
+    Get the animation curves and the plugs they drive for all of the provided
+    nodes in a single walk of the dependency graph. Rather than querying the
+    connections of every node, all of the animation curves in the scene are
+    iterated once and their outputs are matched against the provided nodes.
+    Set driven keys and referenced animation curves are ignored, the same way
+    they are in the getIncomingAnimationCurves function.
+
+    The returned dictionary preserves the order of the provided nodes and
+    only contains the nodes that are animated. The values are lists of
+    animation curve and plug pairs.
+
+    :param list nodes:
+    :return: Animation data
+    :rtype: OrderedDict
+    """
+    # variables
+    data = OrderedDict()
+    mapper = {}
+
+    # map the full path of the nodes to the provided names, this allows
+    # for the provided names to be returned even if they are not unique.
+    for node in nodes:
+        mapper[api.getMDagPath(node).fullPathName()] = node
+        data[node] = []
+
+    # loop animation curves
+    iterator = OpenMaya.MItDependencyNodes(OpenMaya.MFn.kAnimCurve)
+    while not iterator.isDone():
+        obj = iterator.thisNode()
+        iterator.next()
+
+        # filter referenced animation curves
+        dependencyNode = OpenMaya.MFnDependencyNode(obj)
+        if dependencyNode.isFromReferencedFile():
+            continue
+
+        # filter set driven keys
+        if dependencyNode.findPlug("input", False).isConnected():
+            continue
+
+        # get connections
+        connections = OpenMaya.MPlugArray()
+        output = dependencyNode.findPlug("output", False)
+        output.connectedTo(connections, False, True)
+
+        # loop connections
+        for i in range(connections.length()):
+            plug = connections[i]
+
+            # validate dag node
+            node = plug.node()
+            if not node.hasFn(OpenMaya.MFn.kDagNode):
+                continue
+
+            # validate node
+            dag = OpenMaya.MDagPath()
+            OpenMaya.MDagPath.getAPathTo(node, dag)
+            node = mapper.get(dag.fullPathName())
+            if node is None:
+                continue
+
+            # add data
+            data[node].append((dependencyNode.name(), plug.name()))
+
+    # filter nodes without animation
+    return OrderedDict(
+        (node, connections)
+        for node, connections in data.iteritems()
+        if connections
+    )
+
+
+KEYFRAME_ATTRIBUTES = OrderedDict(
+    [
+        ("times", ("keyframe", "timeChange")),
+        ("values", ("keyframe", "valueChange")),
+        ("inAngles", ("keyTangent", "inAngle")),
+        ("outAngles", ("keyTangent", "outAngle")),
+        ("inWeights", ("keyTangent", "inWeight")),
+        ("outWeights", ("keyTangent", "outWeight")),
+        ("inTangentTypes", ("keyTangent", "inTangentType")),
+        ("outTangentTypes", ("keyTangent", "outTangentType")),
+    ]
+)
+
+
+def getKeyframeCounts(animCurves):
+    """
+    :param list animCurves:
+    :return: Amount of keys of each animation curve
+    :rtype: list
+    """
+    return [
+        OpenMaya.MFnAnimCurve(api.getMObject(animCurve)).numKeys()
+        for animCurve in animCurves
+    ]
+
+
+def getKeyframeData(animCurves):
+    """
+    Get the keys and tangents of all of the provided animation curves. Every
+    keyframe attribute is read for all of the animation curves in a single
+    query, which means the values of all animation curves are concatenated.
+    The amount of keys of each animation curve is stored in the counts array
+    and can be used to split the values per animation curve.
+
+    :param list animCurves:
+    :return: Keyframe data
+    :rtype: OrderedDict
+    """
+    # variables
+    data = OrderedDict()
+    data["counts"] = np.array(getKeyframeCounts(animCurves), dtype=int)
+
+    # validate animation curves
+    if not animCurves:
+        for key in KEYFRAME_ATTRIBUTES.keys():
+            data[key] = np.array([])
+
+        return data
+
+    # get keyframe attributes
+    for key, (command, flag) in KEYFRAME_ATTRIBUTES.iteritems():
+        values = getattr(cmds, command)(
+            animCurves,
+            query=True,
+            **{flag: True}
+        ) or []
+        data[key] = np.array(values)
+
+    return data
+
+
+# ----------------------------------------------------------------------------
+
+
+class KeyframeCache(object):
+    """
+    The keyframe cache stores the key times of animation curves as arrays.
+    The key times of all animation curves that are not cached yet are read
+    in a single keyframe query. The animation curves are stored by their
+    object, which means renaming an animation curve doesn't invalidate the
+    cache. A cached animation curve is removed from the cache as soon as it
+    is edited or deleted and the cache is cleared when a new scene is
+    created or opened, this is handled by callbacks that are registered the
+    first time the cache is used.
+    """
+    def __init__(self):
+        self._times = api.ObjectMap()
+        self._ids = []
+
+    # ------------------------------------------------------------------------
+
+    def registerCallbacks(self):
+        """
+        Register the callbacks that remove animation curves from the cache
+        when they are edited or deleted and that clear the cache when the
+        scene changes.
+        """
+        # validate callbacks
+        if self._ids:
+            return
+
+        self._ids.append(
+            OpenMaya.MAnimMessage.addAnimCurveEditedCallback(
+                self._animCurvesEdited
+            )
+        )
+        self._ids.append(
+            OpenMaya.MDGMessage.addNodeRemovedCallback(
+                self._animCurveRemoved,
+                "animCurve"
+            )
+        )
+        for message in [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen
+        ]:
+            self._ids.append(
+                OpenMaya.MSceneMessage.addCallback(message, self._sceneChanged)
+            )
+
+    def removeCallbacks(self):
+        """
+        Remove the callbacks and clear the cache, as without callbacks the
+        cached values cannot be trusted.
+        """
+        for id_ in self._ids:
+            OpenMaya.MMessage.removeCallback(id_)
+
+        self._ids = []
+        self.clear()
+
+    # ------------------------------------------------------------------------
+
+    def _animCurvesEdited(self, animCurves, *args):
+        """
+        :param MObjectArray animCurves:
+        """
+        for i in range(animCurves.length()):
+            self._times.pop(animCurves[i])
+
+    def _animCurveRemoved(self, animCurve, *args):
+        """
+        :param MObject animCurve:
+        """
+        self._times.pop(animCurve)
+
+    def _sceneChanged(self, *args):
+        self.clear()
+
+    # ------------------------------------------------------------------------
+
+    def clear(self):
+        self._times.clear()
+
+    def getKeyframeTimes(self, animCurves):
+        """
+        Get the key times of the provided animation curves. The key times of
+        the animation curves that are not cached are read in a single query.
+        The amount of keys of each animation curve is used to split the key
+        times of that query.
+
+        :param list animCurves:
+        :return: Key times of each animation curve
+        :rtype: list
+        """
+        # register callbacks
+        self.registerCallbacks()
+
+        # get animation curve objects
+        objs = [api.getMObject(animCurve) for animCurve in animCurves]
+
+        # get animation curves that are not cached
+        uncached = OrderedDict()
+        for animCurve, obj in zip(animCurves, objs):
+            if obj not in self._times and animCurve not in uncached:
+                uncached[animCurve] = obj
+
+        if uncached:
+            # get key counts
+            counts = getKeyframeCounts(uncached.keys())
+
+            # get key times
+            times = cmds.keyframe(
+                uncached.keys(),
+                query=True,
+                timeChange=True
+            ) or []
+            times = np.array(times, dtype=float)
+
+            # split times per animation curve
+            indices = np.cumsum(counts)[:-1]
+            for obj, t in zip(uncached.values(), np.split(times, indices)):
+                self._times[obj] = t
+
+        return [self._times[obj] for obj in objs]
+
+
+KEYFRAME_CACHE = KeyframeCache()
+
+
+# ----------------------------------------------------------------------------
+
+
+def getKeyframeTimes(animCurves):
+    """
+    :param list animCurves:
+    :return: Key times of each animation curve
+    :rtype: list
+    """
+    return KEYFRAME_CACHE.getKeyframeTimes(animCurves)
+
+
 def getAnimationRange(animCurves):
     """
     Get the maximum animation range from all of the animation curves provided.
     The start frame will be the earliest keyframe of all animation curves and
     the end frame will be the latest keyframe of all animation curves.
+    Animation curves that only contain a single key are ignored.
 
     :param animCurves:
     :return: Animation Range
@@ -69,32 +379,18 @@ def getAnimationRange(animCurves):
     """
     # validate
     if not animCurves:
-        ValueError("No animation curves found!")
-
-    # variables
-    frames = []
-
-    # loop animation curves
-    for animCurve in animCurves:
-        # get key indices
-        indices = cmds.keyframe(animCurve, query=True, indexValue=True)
+        raise ValueError("No animation curves found!")
 
-        # skip if the animation curve only has one key
-        if len(indices) <= 1:
-            continue
+    # get key times
+    times = getKeyframeTimes(animCurves)
+    counts = np.array([len(t) for t in times], dtype=int)
 
-        # add frames
-        frames.extend(
-            cmds.keyframe(
-                animCurve,
-                query=True,
-                index=(indices[0], indices[-1])
-            ) or []
-        )
+    # filter animation curves that only have one key
+    frames = np.concatenate(times)[np.repeat(counts > 1, counts)]
 
     # validate frames
-    if not frames:
-        ValueError("No animation keyframes found!")
+    if not frames.size:
+        raise ValueError("No animation keyframes found!")
 
     # get start and end frame
-    return [min(frames), max(frames)]
+    return [float(frames.min()), float(frames.max())]
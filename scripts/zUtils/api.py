@@ -1,6 +1,170 @@
 from maya import OpenMaya
 
 
+def getMObject(node):
+    """
+    :param str node:
+    :return: Maya object
+    :rtype: MObject
+    """
+    selection = OpenMaya.MSelectionList()
+    selection.add(node)
+
+    obj = OpenMaya.MObject()
+    selection.getDependNode(0, obj)
+
+    return obj
+
+
+def getMDagPath(node):
+    """
+    :param str node:
+    :return: Dag path
+    :rtype: MDagPath
+    """
+    selection = OpenMaya.MSelectionList()
+    selection.add(node)
+
+    dag = OpenMaya.MDagPath()
+    selection.getDagPath(0, dag)
+
+    return dag
+
+
+def getMPlug(plug):
+    """
+    :param str plug:
+    :return: Maya plug
+    :rtype: MPlug
+    """
+    selection = OpenMaya.MSelectionList()
+    selection.add(plug)
+
+    mplug = OpenMaya.MPlug()
+    selection.getPlug(0, mplug)
+
+    return mplug
+
+
+# ----------------------------------------------------------------------------
+
+
+class ObjectMap(object):
+    """
+    The object map stores values per maya object. The hash code of a
+    MObjectHandle is not unique, which is why the objects are stored in
+    buckets per hash code and matched using the equality of their handles.
+    """
+    def __init__(self):
+        self._buckets = {}
+
+    # ------------------------------------------------------------------------
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def __contains__(self, obj):
+        return self._find(obj)[1] is not None
+
+    def __getitem__(self, obj):
+        bucket, index = self._find(obj)
+        if index is None:
+            raise KeyError(obj)
+
+        return bucket[index][1]
+
+    def __setitem__(self, obj, value):
+        handle = self._getHandle(obj)
+        bucket, index = self._find(handle)
+        if index is None:
+            self._buckets.setdefault(handle.hashCode(), []).append(
+                (handle, value)
+            )
+        else:
+            bucket[index] = (handle, value)
+
+    # ------------------------------------------------------------------------
+
+    def _getHandle(self, obj):
+        """
+        :param MObject/MObjectHandle obj:
+        :return: Object handle
+        :rtype: MObjectHandle
+        """
+        if isinstance(obj, OpenMaya.MObjectHandle):
+            return obj
+
+        return OpenMaya.MObjectHandle(obj)
+
+    def _find(self, obj):
+        """
+        :param MObject/MObjectHandle obj:
+        :return: Bucket and index of the object in the bucket
+        :rtype: tuple
+        """
+        handle = self._getHandle(obj)
+        bucket = self._buckets.get(handle.hashCode(), [])
+        for i, (h, _) in enumerate(bucket):
+            if h == handle:
+                return bucket, i
+
+        return bucket, None
+
+    # ------------------------------------------------------------------------
+
+    def get(self, obj, default=None):
+        """
+        :param MObject/MObjectHandle obj:
+        :param default:
+        :return: Value
+        """
+        bucket, index = self._find(obj)
+        return default if index is None else bucket[index][1]
+
+    def pop(self, obj, default=None):
+        """
+        :param MObject/MObjectHandle obj:
+        :param default:
+        :return: Value
+        """
+        bucket, index = self._find(obj)
+        if index is None:
+            return default
+
+        return bucket.pop(index)[1]
+
+    def keys(self):
+        """
+        :return: Object handles
+        :rtype: list
+        """
+        return [handle for handle, _ in self.items()]
+
+    def values(self):
+        """
+        :return: Values
+        :rtype: list
+        """
+        return [value for _, value in self.items()]
+
+    def items(self):
+        """
+        :return: Object handles and values
+        :rtype: list
+        """
+        return [
+            item
+            for bucket in self._buckets.values()
+            for item in bucket
+        ]
+
+    def clear(self):
+        self._buckets.clear()
+
+
+# ----------------------------------------------------------------------------
+
+
 def vectorToList(vector):
     """
     :param MVector vector:
@@ -1,4 +1,6 @@
-from maya import cmds
+from maya import cmds, OpenMaya
+from collections import OrderedDict, namedtuple
+from . import api
 from .nodes import ZIVA_NODES
 
 
@@ -13,6 +15,17 @@ TYPE_MAPPER = {
     type(None): {"dataType": "string"}
 }
 
+INTEGER_TYPES = [
+    OpenMaya.MFnNumericData.kShort,
+    OpenMaya.MFnNumericData.kInt,
+    OpenMaya.MFnNumericData.kLong,
+    OpenMaya.MFnNumericData.kByte,
+    OpenMaya.MFnNumericData.kChar,
+]
+
+# default values of static attributes are cached per node type and attribute
+DEFAULT_VALUES = {}
+
 
 # ----------------------------------------------------------------------------
 
@@ -37,6 +50,88 @@ def setDefaultValue(plug):
     cmds.setAttr(plug, default[0])
 
 
+def getDefaultValues(plugs):
+    """
+    Get the default values of the provided plugs. The default values are
+    read from a table that is populated on demand, this means the default
+    value of an attribute is only queried once per node type. The default
+    values of dynamic attributes can differ per node and are always queried.
+
+    :param list plugs:
+    :return: Default values, None if the default cannot be queried
+    :rtype: list
+    """
+    values = []
+    for plug in plugs:
+        # get attribute
+        node = plug.split(".", 1)[0]
+        mplug = api.getMPlug(plug)
+        attribute = OpenMaya.MFnAttribute(mplug.attribute())
+        key = (
+            OpenMaya.MFnDependencyNode(mplug.node()).typeName(),
+            attribute.name()
+        )
+
+        # query default
+        if attribute.isDynamic() or key not in DEFAULT_VALUES:
+            default = cmds.attributeQuery(
+                attribute.name(),
+                node=node,
+                listDefault=True
+            )
+            default = default[0] if default else None
+
+            if attribute.isDynamic():
+                values.append(default)
+                continue
+
+            DEFAULT_VALUES[key] = default
+
+        values.append(DEFAULT_VALUES[key])
+
+    return values
+
+
+def addPlugValue(modifier, plug, value, attribute=None):
+    """
+    Add a new plug value to the modifier. The value is expected to be in ui
+    units, as returned by the attributeQuery command, and is converted to the
+    internal units for angle and distance attributes. The attribute that
+    determines the type of the value can be provided for plugs of generic
+    attributes, like the inputs of a choice node.
+
+    :param MDGModifier modifier:
+    :param MPlug plug:
+    :param int/float/bool value:
+    :param MObject/None attribute:
+    """
+    attribute = plug.attribute() if attribute is None else attribute
+    if attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unitType = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unitType == OpenMaya.MFnUnitAttribute.kAngle:
+            value = OpenMaya.MAngle(
+                value,
+                OpenMaya.MAngle.uiUnit()
+            ).asRadians()
+        elif unitType == OpenMaya.MFnUnitAttribute.kDistance:
+            value = OpenMaya.MDistance(
+                value,
+                OpenMaya.MDistance.uiUnit()
+            ).asCentimeters()
+
+        modifier.newPlugValueDouble(plug, value)
+    elif attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+        numericType = OpenMaya.MFnNumericAttribute(attribute).unitType()
+        if numericType == OpenMaya.MFnNumericData.kBoolean:
+            modifier.newPlugValueBool(plug, bool(value))
+        elif numericType in INTEGER_TYPES:
+            modifier.newPlugValueInt(plug, int(value))
+        else:
+            modifier.newPlugValueDouble(plug, float(value))
+    elif attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+        modifier.newPlugValueInt(plug, int(value))
+
+
 def getPlug(node, attr):
     """
     :param str node:
@@ -78,14 +173,16 @@ def createTag(node, attr, value=None):
         **kwargsCreate
     )
 
-    # validate value
-    if not value:
-        return
-
     # set value
-    dataType = kwargsCreate.get("dataType")
-    kwargsSet = {"type": "string"} if dataType == "string" else {}
-    cmds.setAttr(getPlug(node, attr), value, **kwargsSet)
+    if value:
+        dataType = kwargsCreate.get("dataType")
+        kwargsSet = {"type": "string"} if dataType == "string" else {}
+        cmds.setAttr(getPlug(node, attr), value, **kwargsSet)
+
+    # update tag index
+    index = TAG_INDEXES.get(attr)
+    if index:
+        index.update(node)
 
 
 def getTag(node, attr):
@@ -103,6 +200,374 @@ def getTag(node, attr):
 # ----------------------------------------------------------------------------
 
 
+Tag = namedtuple("Tag", ["node", "value"])
+
+
+class TagIndex(object):
+    """
+    The tag index keeps track of all of the nodes in the scene that contain
+    the provided tag attribute. The index is built using a single attribute
+    pattern query, after which it is kept up to date using callbacks. Nodes
+    that are added to the scene or of which the tag is changed are marked as
+    dirty and only processed when the index is queried. Only nodes that are
+    compatible with the function set type are indexed, by default these are
+    transforms. The index returns read-only Tag descriptors.
+
+    .. highlight::
+        index = getTagIndex(attr)
+        for tag in index.get(value):
+            # code
+    """
+    def __init__(self, attr, fnType=OpenMaya.MFn.kTransform):
+        self._attr = attr
+        self._fnType = fnType
+
+        # variables
+        self._built = False
+        self._lookup = None
+        self._values = api.ObjectMap()
+        self._dirty = api.ObjectMap()
+
+        # callback variables
+        self._sceneIds = []
+        self._nodeIds = []
+        self._tagIds = api.ObjectMap()
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def attr(self):
+        """
+        :return: Tag attribute
+        :rtype: str
+        """
+        return self._attr
+
+    # ------------------------------------------------------------------------
+
+    def registerCallbacks(self):
+        """
+        Register the callbacks that keep the index up to date. The scene
+        callbacks will clear the index when a new scene is created or opened.
+        Which means the callbacks on the nodes are removed and won't be
+        triggered for every node in the opened file.
+        """
+        if not self._sceneIds:
+            for message in [
+                OpenMaya.MSceneMessage.kBeforeNew,
+                OpenMaya.MSceneMessage.kBeforeOpen
+            ]:
+                self._sceneIds.append(
+                    OpenMaya.MSceneMessage.addCallback(
+                        message,
+                        self._sceneChanged
+                    )
+                )
+
+        if not self._nodeIds:
+            self._nodeIds.append(
+                OpenMaya.MDGMessage.addNodeAddedCallback(
+                    self._nodeAdded,
+                    "dependNode"
+                )
+            )
+            self._nodeIds.append(
+                OpenMaya.MDGMessage.addNodeRemovedCallback(
+                    self._nodeRemoved,
+                    "dependNode"
+                )
+            )
+            self._nodeIds.append(
+                OpenMaya.MDagMessage.addAllDagChangesCallback(
+                    self._dagChanged
+                )
+            )
+
+    def removeCallbacks(self):
+        """
+        Remove all callbacks and clear the index.
+        """
+        self.clear()
+
+        for id_ in self._sceneIds:
+            OpenMaya.MMessage.removeCallback(id_)
+
+        self._sceneIds = []
+
+    # ------------------------------------------------------------------------
+
+    def _registerTagCallbacks(self, obj):
+        """
+        :param MObject obj:
+        """
+        self._tagIds[obj] = [
+            OpenMaya.MNodeMessage.addAttributeChangedCallback(
+                obj,
+                self._attributeChanged
+            ),
+            OpenMaya.MNodeMessage.addNameChangedCallback(
+                obj,
+                self._nameChanged
+            )
+        ]
+
+    def _removeTagCallbacks(self, obj):
+        """
+        :param MObject/MObjectHandle obj:
+        """
+        for id_ in self._tagIds.pop(obj, []):
+            OpenMaya.MMessage.removeCallback(id_)
+
+    # ------------------------------------------------------------------------
+
+    def _sceneChanged(self, *args):
+        self.clear()
+
+    def _nodeAdded(self, node, *args):
+        """
+        :param MObject node:
+        """
+        handle = OpenMaya.MObjectHandle(node)
+        self._dirty[handle] = handle
+
+    def _nodeRemoved(self, node, *args):
+        """
+        :param MObject node:
+        """
+        self._dirty.pop(node)
+        self._remove(node)
+
+    def _dagChanged(self, message, child, *args):
+        """
+        :param int message:
+        :param MDagPath child:
+        """
+        if child.node() in self._values:
+            self._lookup = None
+
+    def _nameChanged(self, *args):
+        self._lookup = None
+
+    def _attributeChanged(self, message, plug, *args):
+        """
+        :param int message:
+        :param MPlug plug:
+        """
+        # validate message
+        if not message & (
+            OpenMaya.MNodeMessage.kAttributeSet |
+            OpenMaya.MNodeMessage.kAttributeAdded |
+            OpenMaya.MNodeMessage.kAttributeRemoved
+        ):
+            return
+
+        # validate attribute
+        if plug.partialName(False, False, False, False, False, True) \
+                != self.attr:
+            return
+
+        # mark node as dirty
+        self._nodeAdded(plug.node())
+
+    # ------------------------------------------------------------------------
+
+    def _getName(self, obj):
+        """
+        :param MObject obj:
+        :return: Node name
+        :rtype: str
+        """
+        if obj.hasFn(OpenMaya.MFn.kDagNode):
+            dag = OpenMaya.MDagPath()
+            OpenMaya.MDagPath.getAPathTo(obj, dag)
+            return dag.partialPathName()
+
+        return OpenMaya.MFnDependencyNode(obj).name()
+
+    def _remove(self, obj):
+        """
+        :param MObject/MObjectHandle obj:
+        """
+        if obj not in self._values:
+            return
+
+        self._removeTagCallbacks(obj)
+        self._values.pop(obj)
+        self._lookup = None
+
+    def _processDirty(self):
+        """
+        Process all of the nodes that are marked as dirty. If the node still
+        exists and contains the tag attribute the value of the tag is read
+        and stored, if not the node is removed from the index.
+        """
+        # get dirty nodes
+        dirty, self._dirty = self._dirty, api.ObjectMap()
+
+        # loop dirty nodes
+        for handle in dirty.values():
+            # validate node
+            if not handle.isAlive() or not handle.isValid():
+                self._remove(handle)
+                continue
+
+            # validate node type
+            obj = handle.object()
+            if not obj.hasFn(self._fnType):
+                self._remove(handle)
+                continue
+
+            # validate tag
+            if not OpenMaya.MFnDependencyNode(obj).hasAttribute(self.attr):
+                self._remove(handle)
+                continue
+
+            # register callbacks
+            if obj not in self._tagIds:
+                self._registerTagCallbacks(obj)
+
+            # store value
+            plug = getPlug(self._getName(obj), self.attr)
+            self._values[handle] = cmds.getAttr(plug)
+            self._lookup = None
+
+    # ------------------------------------------------------------------------
+
+    def clear(self):
+        """
+        Clear the index and remove all node callbacks. The index will be
+        rebuilt the next time it is queried.
+        """
+        for handle in self._tagIds.keys():
+            self._removeTagCallbacks(handle)
+
+        for id_ in self._nodeIds:
+            OpenMaya.MMessage.removeCallback(id_)
+
+        self._nodeIds = []
+        self._built = False
+        self._lookup = None
+        self._values = api.ObjectMap()
+        self._dirty = api.ObjectMap()
+
+    def build(self):
+        """
+        Build the index by finding all nodes that contain the tag attribute
+        using a single attribute pattern query. Namespaces are searched as
+        well.
+        """
+        # clear index
+        self.clear()
+        self.registerCallbacks()
+
+        # get tagged nodes
+        nodes = cmds.ls(
+            "*.{}".format(self.attr),
+            recursive=True,
+            objectsOnly=True
+        ) or []
+
+        # mark nodes as dirty
+        for node in nodes:
+            self._nodeAdded(api.getMObject(node))
+
+        # process nodes
+        self._processDirty()
+        self._built = True
+
+    def update(self, node=None):
+        """
+        Update the index, if a node is provided it will be marked as dirty
+        first. This can be used when a tag attribute is added to a node that
+        already existed, as the callbacks will not pick up on that.
+
+        :param str/None node:
+        """
+        # validate index
+        if not self._built:
+            self.build()
+            return
+
+        # mark node as dirty
+        if node:
+            self._nodeAdded(api.getMObject(node))
+
+        # process nodes
+        if self._dirty:
+            self._processDirty()
+
+    # ------------------------------------------------------------------------
+
+    def _getLookup(self):
+        """
+        :return: Tags grouped by tag value
+        :rtype: OrderedDict
+        """
+        # update index
+        self.update()
+
+        # validate lookup
+        if self._lookup is not None:
+            return self._lookup
+
+        # get tags sorted by node
+        tags = sorted(
+            [
+                Tag(self._getName(handle.object()), value)
+                for handle, value in self._values.items()
+            ],
+            key=lambda tag: tag.node
+        )
+
+        # group tags by value
+        lookup = OrderedDict()
+        for tag in tags:
+            lookup.setdefault(tag.value, []).append(tag)
+
+        self._lookup = OrderedDict(
+            (value, tuple(tags))
+            for value, tags in lookup.iteritems()
+        )
+
+        return self._lookup
+
+    def getAll(self):
+        """
+        :return: Tags grouped by tag value
+        :rtype: OrderedDict
+        """
+        return self._getLookup().copy()
+
+    def get(self, value):
+        """
+        :param str/int/float value:
+        :return: Tags with the provided value
+        :rtype: tuple
+        """
+        return self._getLookup().get(value, ())
+
+
+TAG_INDEXES = {}
+
+
+def getTagIndex(attr):
+    """
+    Get the tag index of the provided tag attribute. Only one index per tag
+    attribute is created, which means the callbacks are shared.
+
+    :param str attr:
+    :return: Tag index
+    :rtype: TagIndex
+    """
+    if attr not in TAG_INDEXES:
+        TAG_INDEXES[attr] = TagIndex(attr)
+
+    return TAG_INDEXES[attr]
+
+
+# ----------------------------------------------------------------------------
+
+
 def createLink(source, target, attr):
     """
     :param str source:
@@ -168,6 +633,228 @@ def getLink(node, attr, destination=False, source=False):
 # ----------------------------------------------------------------------------
 
 
+class AttributeCache(object):
+    """
+    The attribute cache stores values per node. The keys are attribute names
+    and a cached value is removed as soon as the attribute with that name is
+    changed on the node. All values of a node are removed when a child is
+    added to or removed from the node, or when the node is deleted. Values
+    of attributes that are the destination of a connection are never cached
+    as their value can change without the attribute being set.
+
+    .. highlight::
+        value = ATTRIBUTE_CACHE.get(node, attr, lambda: getTag(node, attr))
+    """
+    def __init__(self):
+        self._nodes = api.ObjectMap()
+        self._ids = []
+
+    # ------------------------------------------------------------------------
+
+    def registerCallbacks(self):
+        """
+        Register the callbacks that clear the cache when a new scene is
+        created or opened.
+        """
+        # validate callbacks
+        if self._ids:
+            return
+
+        for message in [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen
+        ]:
+            self._ids.append(
+                OpenMaya.MSceneMessage.addCallback(message, self._sceneChanged)
+            )
+
+    def removeCallbacks(self):
+        """
+        Remove all callbacks and clear the cache.
+        """
+        self.clear()
+
+        for id_ in self._ids:
+            OpenMaya.MMessage.removeCallback(id_)
+
+        self._ids = []
+
+    # ------------------------------------------------------------------------
+
+    def _sceneChanged(self, *args):
+        self.clear()
+
+    def _nodeRemoved(self, node, *args):
+        """
+        :param MObject node:
+        """
+        self._remove(node)
+
+    def _childrenChanged(self, child, parent, *args):
+        """
+        :param MDagPath child:
+        :param MDagPath parent:
+        """
+        data = self._nodes.get(parent.node())
+        if data:
+            data["values"].clear()
+
+    def _attributeChanged(self, message, plug, *args):
+        """
+        :param int message:
+        :param MPlug plug:
+        """
+        # get node data
+        data = self._nodes.get(plug.node())
+        if not data:
+            return
+
+        # clear value
+        attr = plug.partialName(False, False, False, False, False, True)
+        data["values"].pop(attr, None)
+
+    # ------------------------------------------------------------------------
+
+    def _remove(self, obj):
+        """
+        :param MObject/MObjectHandle obj:
+        """
+        data = self._nodes.pop(obj)
+        if not data:
+            return
+
+        for id_ in data["ids"]:
+            OpenMaya.MMessage.removeCallback(id_)
+
+    def _getNodeData(self, node):
+        """
+        Get the cache data of a node, if the node is not cached yet the
+        callbacks on the node are registered.
+
+        :param str node:
+        :return: Node data
+        :rtype: dict
+        """
+        # get node
+        obj = api.getMObject(node)
+        handle = OpenMaya.MObjectHandle(obj)
+
+        # validate node
+        data = self._nodes.get(handle)
+        if data:
+            return data
+
+        # register callbacks
+        self.registerCallbacks()
+        ids = [
+            OpenMaya.MNodeMessage.addAttributeChangedCallback(
+                obj,
+                self._attributeChanged
+            ),
+            OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+                obj,
+                self._nodeRemoved
+            )
+        ]
+
+        if obj.hasFn(OpenMaya.MFn.kDagNode):
+            dag = api.getMDagPath(node)
+            ids.append(
+                OpenMaya.MDagMessage.addChildAddedDagPathCallback(
+                    dag,
+                    self._childrenChanged
+                )
+            )
+            ids.append(
+                OpenMaya.MDagMessage.addChildRemovedDagPathCallback(
+                    dag,
+                    self._childrenChanged
+                )
+            )
+
+        # store data
+        data = {
+            "handle": handle,
+            "ids": ids,
+            "values": {}
+        }
+        self._nodes[handle] = data
+
+        return data
+
+    # ------------------------------------------------------------------------
+
+    def clear(self, node=None, key=None):
+        """
+        Clear the cache. If a node is provided only the values of that node
+        are removed, if a key is provided as well only that value is removed.
+
+        :param str/None node:
+        :param str/None key:
+        """
+        # clear all
+        if node is None:
+            for handle in self._nodes.keys():
+                self._remove(handle)
+
+            return
+
+        # clear node
+        data = self._nodes.get(api.getMObject(node))
+        if not data:
+            return
+
+        if key is None:
+            data["values"].clear()
+        else:
+            data["values"].pop(key, None)
+
+    def get(self, node, key, func):
+        """
+        Get the cached value of the key on the provided node. If the value is
+        not cached the function is called to retrieve the value.
+
+        :param str node:
+        :param str key:
+        :param func func:
+        :return: Value
+        """
+        # get node data
+        data = self._getNodeData(node)
+        values = data["values"]
+
+        # validate value
+        if key in values:
+            return values[key]
+
+        # get value
+        value = func()
+
+        # validate connection
+        fn = OpenMaya.MFnDependencyNode(data["handle"].object())
+        if fn.hasAttribute(key) and fn.findPlug(key, False).isDestination():
+            return value
+
+        values[key] = value
+        return value
+
+    def set(self, node, key, value):
+        """
+        Store a value that was just written to the node.
+
+        :param str node:
+        :param str key:
+        :param value:
+        """
+        self._getNodeData(node)["values"][key] = value
+
+
+ATTRIBUTE_CACHE = AttributeCache()
+
+
+# ----------------------------------------------------------------------------
+
+
 def getZivaPaintableAttributes(node):
     """
     Get all of the ziva paintable attributes from a node. The ziva nodes
@@ -0,0 +1,82 @@
+from maya import cmds
+from collections import OrderedDict
+from . import contexts
+
+
+def benchmark(functions, sizes, setup, repeat=3, reset=None):
+    """
+    Time the provided functions on scenes of increasing size. For every size
+    a new scene is created and populated using the setup function. The value
+    returned by the setup function is passed to every function that is timed.
+    Only the fastest time of all repeats is stored, as it is the least
+    affected by other processes running on the machine. Functions that
+    modify the scene can provide a reset function which is called with the
+    same value before every run, the reset is not timed.
+
+    :param list functions: List of name and function pairs
+    :param list sizes:
+    :param func setup:
+    :param int repeat:
+    :param func/None reset:
+    :return: Results, one dictionary per size
+    :rtype: list
+    """
+    # variables
+    results = []
+
+    # loop sizes
+    for size in sizes:
+        # create scene
+        cmds.file(new=True, force=True)
+        data = setup(size)
+
+        # time functions
+        result = OrderedDict([("size", size)])
+        for name, func in functions:
+            times = []
+            for _ in range(repeat):
+                if reset:
+                    reset(data)
+
+                with contexts.Timer() as timer:
+                    func(data)
+
+                times.append(timer.elapsed)
+
+            result[name] = min(times)
+
+        results.append(result)
+
+    return results
+
+
+def formatResults(results):
+    """
+    Format the results of the benchmark function into a table that can be
+    printed in the script editor.
+
+    :param list results:
+    :return: Table
+    :rtype: str
+    """
+    # validate results
+    if not results:
+        return ""
+
+    # get columns
+    columns = results[0].keys()
+    width = max([len(column) for column in columns] + [12])
+
+    # construct table
+    lines = [" | ".join(column.rjust(width) for column in columns)]
+    for result in results:
+        lines.append(
+            " | ".join(
+                "{:.4f}".format(value).rjust(width)
+                if isinstance(value, float)
+                else str(value).rjust(width)
+                for value in result.values()
+            )
+        )
+
+    return "\n".join(lines)
@@ -1,35 +1,165 @@
-from maya import cmds
+import timeit
+from maya import cmds, OpenMaya
 from . import attributes
 
 
 class DisableZivaSolvers(object):
     """
     This context temporarily disables the ziva solvers so it won't trigger any
-    calculation when the function is executed.
+    calculation when the function is executed. The context can be limited to
+    specific solvers, when no solvers are provided all solvers in the scene
+    are disabled.
+
+    The context is re-entrant, the amount of active contexts is counted per
+    solver. The enable state of a solver is only stored and disabled when the
+    first context is entered and restored when the last context is exited,
+    which prevents nested contexts from toggling the solvers multiple times.
+    The counts are cleared when a new scene is created or opened. The amount
+    of toggles and the time spent toggling are recorded.
 
     .. highlight::
         with DisableZivaSolvers():
             # code
+
+        print DisableZivaSolvers.getStatistics()
     """
-    def __init__(self):
-        # store solver data
-        self._solvers = {}
+    _counts = {}
+    _states = {}
+    _statistics = {"toggles": 0, "duration": 0.0}
+    _ids = []
 
-        # loop solvers
-        for solver in cmds.ls(type="zSolver"):
-            transform = cmds.listRelatives(solver, parent=True)[0]
-            plug = attributes.getPlug(transform, "enable")
-            self._solvers[plug] = cmds.getAttr(plug)
+    def __init__(self, solvers=None):
+        self._solvers = solvers
+        self._plugs = []
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def _addCallbacks(cls):
+        """
+        The counts are keyed by plug, clearing them when a new scene is
+        created or opened prevents counts of the previous scene from leaking
+        into the next scene.
+        """
+        if cls._ids:
+            return
+
+        for message in [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen
+        ]:
+            cls._ids.append(
+                OpenMaya.MSceneMessage.addCallback(message, cls._sceneChanged)
+            )
+
+    @classmethod
+    def _sceneChanged(cls, *args):
+        cls.clear()
+
+    @classmethod
+    def clear(cls):
+        cls._counts.clear()
+        cls._states.clear()
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def getStatistics(cls):
+        """
+        :return: Amount of solver toggles and time spent toggling in seconds
+        :rtype: dict
+        """
+        return dict(cls._statistics)
+
+    @classmethod
+    def resetStatistics(cls):
+        cls._statistics["toggles"] = 0
+        cls._statistics["duration"] = 0.0
+
+    # ------------------------------------------------------------------------
+
+    def _getPlugs(self):
+        """
+        :return: Enable plugs of the solvers
+        :rtype: list
+        """
+        # get solvers
+        solvers = self._solvers
+        if solvers is None:
+            solvers = cmds.ls(type="zSolver")
+
+        # get solver transforms
+        transforms = []
+        for solver in solvers:
+            if cmds.nodeType(solver) == "zSolver":
+                solver = cmds.listRelatives(solver, parent=True)[0]
+
+            transforms.extend(cmds.ls(solver, long=True))
+
+        return [
+            attributes.getPlug(transform, "enable")
+            for transform in sorted(set(transforms))
+        ]
+
+    def _setEnable(self, plug, value):
+        """
+        :param str plug:
+        :param bool/int value:
+        """
+        with Timer() as timer:
+            cmds.setAttr(plug, value)
+
+        self._statistics["toggles"] += 1
+        self._statistics["duration"] += timer.elapsed
+
+    # ------------------------------------------------------------------------
+
+    def _release(self, plugs):
+        """
+        Decrement the counts of the plugs and restore the enable state of the
+        plugs of which the count drops to zero.
+
+        :param list plugs:
+        """
+        for plug in plugs:
+            count = self._counts.get(plug, 0) - 1
+            if count > 0:
+                self._counts[plug] = count
+                continue
+
+            self._counts.pop(plug, None)
+            state = self._states.pop(plug, None)
+
+            if state and cmds.objExists(plug):
+                self._setEnable(plug, state)
 
     # ------------------------------------------------------------------------
 
     def __enter__(self):
-        for plug in self._solvers.keys():
-            cmds.setAttr(plug, 0)
+        self._addCallbacks()
+        self._plugs = []
+
+        # the plugs are only stored once counted, when entering fails the
+        # counted plugs are released as the exit will never be called.
+        try:
+            for plug in self._getPlugs():
+                count = self._counts.get(plug, 0)
+                if not count:
+                    state = cmds.getAttr(plug)
+                    self._states[plug] = state
+
+                    if state:
+                        self._setEnable(plug, 0)
+
+                self._counts[plug] = count + 1
+                self._plugs.append(plug)
+        except Exception:
+            self._release(self._plugs)
+            self._plugs = []
+            raise
 
     def __exit__(self, *exc_info):
-        for plug, value in self._solvers.iteritems():
-            cmds.setAttr(plug, value)
+        self._release(self._plugs)
 
 
 class DisableAutoKeyframe(object):
@@ -72,3 +202,127 @@ class UndoChunk(object):
 
     def __exit__(self, *exc_info):
         cmds.undoInfo(closeChunk=True)
+
+
+class Timer(object):
+    """
+    This context measures the wall time of the commands that are ran within
+    the context. The elapsed time is available after the context is exited.
+
+    .. highlight::
+        with Timer() as timer:
+            # code
+
+        print timer.elapsed
+    """
+    def __init__(self):
+        self._start = None
+        self._elapsed = 0.0
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def elapsed(self):
+        """
+        :return: Elapsed time in seconds
+        :rtype: float
+        """
+        return self._elapsed
+
+    # ------------------------------------------------------------------------
+
+    def __enter__(self):
+        self._start = timeit.default_timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._elapsed = timeit.default_timer() - self._start
+
+
+class CommandCounter(object):
+    """
+    This context counts the maya commands that are called within the
+    context. The commands are temporarily replaced with wrappers that keep
+    track of the amount of times they are called. The commands are only
+    replaced by the outermost context, nested contexts share the wrappers
+    and all active contexts count the calls. The counts are available after
+    the context is exited.
+
+    .. highlight::
+        with CommandCounter() as counter:
+            # code
+
+        print counter.total
+    """
+    _active = []
+    _commands = {}
+
+    def __init__(self):
+        self._counts = {}
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def counts(self):
+        """
+        :return: Amount of calls per command
+        :rtype: dict
+        """
+        return self._counts
+
+    @property
+    def total(self):
+        """
+        :return: Total amount of calls
+        :rtype: int
+        """
+        return sum(self._counts.values())
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def _wrap(cls, name, command):
+        """
+        :param str name:
+        :param func command:
+        :return: Wrapped command
+        :rtype: func
+        """
+        def wrapper(*args, **kwargs):
+            for counter in cls._active:
+                counter._counts[name] = counter._counts.get(name, 0) + 1
+
+            return command(*args, **kwargs)
+
+        return wrapper
+
+    @classmethod
+    def _patch(cls):
+        for name, command in vars(cmds).items():
+            if name.startswith("_") or not callable(command):
+                continue
+
+            cls._commands[name] = command
+            setattr(cmds, name, cls._wrap(name, command))
+
+    @classmethod
+    def _restore(cls):
+        for name, command in cls._commands.iteritems():
+            setattr(cmds, name, command)
+
+        cls._commands.clear()
+
+    # ------------------------------------------------------------------------
+
+    def __enter__(self):
+        if not CommandCounter._active:
+            CommandCounter._patch()
+
+        CommandCounter._active.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        CommandCounter._active.remove(self)
+
+        if not CommandCounter._active:
+            CommandCounter._restore()
@@ -40,4 +40,17 @@ def preserveSelection(func):
             cmds.select(clear=True)
 
         return ret
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def recordStage(func):
+    """
+    The record stage decorator records the function as a stage in the
+    telemetry of the instance the method is bound to. The name of the stage
+    is the name of the function.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.telemetry.stage(func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
@@ -60,15 +60,20 @@ def getNiceName(path, replace=REPLACE):
 # ----------------------------------------------------------------------------
 
 
-def getNamespace(path):
+def getNamespace(path, nested=False):
     """
+    Get the namespace of the node, by default only the root namespace is
+    returned. When nested, the full namespace including the nested
+    namespaces is returned.
+
     :param str path:
+    :param bool nested:
     :return: Namespace
-    :rtype: str
+    :rtype: str/None
     """
     base = getBase(path)
     if base.find(":") != -1:
-        return base.split(":")[0]
+        return base.rsplit(":", 1)[0] if nested else base.split(":")[0]
 
 
 def removeNamespace(node):
@@ -84,3 +89,17 @@ def removeNamespace(node):
 
     return "|".join(sections)
 
+
+def addNamespace(node, namespace):
+    """
+    :param str node:
+    :param str namespace:
+    :return: Namespaced path
+    :rtype: str
+    """
+    sections = [
+        "{}:{}".format(namespace, s) if s else s
+        for s in node.split("|")
+    ]
+
+    return "|".join(sections)
@@ -0,0 +1,164 @@
+import os
+import json
+from collections import OrderedDict
+from . import contexts
+
+
+# counting maya commands temporarily replaces every command of the cmds
+# module, which is why it is only done when requested.
+COUNT_COMMANDS_VARIABLE = "ZUTILS_TELEMETRY_COMMANDS"
+
+
+# ----------------------------------------------------------------------------
+
+
+class Stage(object):
+    """
+    This context records the wall time within the context into the provided
+    stage data. When counting commands, the amount of maya commands that are
+    called within the context is recorded as well. When a stage is entered
+    multiple times the values are accumulated.
+
+    :param OrderedDict data:
+    :param bool countCommands:
+    """
+    def __init__(self, data, countCommands=False):
+        self._data = data
+        self._timer = contexts.Timer()
+        self._counter = contexts.CommandCounter() if countCommands else None
+
+    # ------------------------------------------------------------------------
+
+    def __enter__(self):
+        if self._counter:
+            self._counter.__enter__()
+
+        self._timer.__enter__()
+
+    def __exit__(self, *exc_info):
+        self._timer.__exit__(*exc_info)
+
+        # store data
+        self._data["calls"] += 1
+        self._data["duration"] += self._timer.elapsed
+
+        if not self._counter:
+            return
+
+        self._counter.__exit__(*exc_info)
+        self._data["commands"] += self._counter.total
+
+        for name, count in self._counter.counts.iteritems():
+            counts = self._data["commandCounts"]
+            counts[name] = counts.get(name, 0) + count
+
+
+class Telemetry(object):
+    """
+    The telemetry records the wall time of stages, together with any
+    additional data. The data can be written to a json sidecar file. The
+    maya command counts of the stages are only recorded when counting
+    commands, which is enabled by default when the environment variable
+    ZUTILS_TELEMETRY_COMMANDS is set to 1.
+
+    .. highlight::
+        telemetry = Telemetry(countCommands=True)
+        with telemetry.stage("name"):
+            # code
+
+    :param bool/None countCommands:
+    """
+    def __init__(self, countCommands=None):
+        self._stages = OrderedDict()
+        self._data = OrderedDict()
+        self.countCommands = countCommands
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def countCommands(self):
+        """
+        :param bool/None countCommands:
+        :return: Count commands state
+        :rtype: bool
+        """
+        return self._countCommands
+
+    @countCommands.setter
+    def countCommands(self, countCommands):
+        if countCommands is None:
+            countCommands = os.environ.get(COUNT_COMMANDS_VARIABLE) == "1"
+
+        self._countCommands = bool(countCommands)
+
+    # ------------------------------------------------------------------------
+
+    def _getStage(self, name):
+        """
+        :param str name:
+        :return: Stage data
+        :rtype: OrderedDict
+        """
+        if name not in self._stages:
+            self._stages[name] = OrderedDict(
+                [
+                    ("calls", 0),
+                    ("duration", 0.0),
+                    ("commands", 0),
+                    ("commandCounts", {}),
+                ]
+            )
+
+        return self._stages[name]
+
+    # ------------------------------------------------------------------------
+
+    def stage(self, name):
+        """
+        :param str name:
+        :return: Stage context
+        :rtype: Stage
+        """
+        return Stage(self._getStage(name), self.countCommands)
+
+    def update(self, name, **kwargs):
+        """
+        Update the data of a stage with the provided keyword arguments.
+
+        :param str name:
+        """
+        self._getStage(name).update(kwargs)
+
+    def set(self, key, value):
+        """
+        :param str key:
+        :param value:
+        """
+        self._data[key] = value
+
+    def clear(self):
+        self._stages.clear()
+        self._data.clear()
+
+    # ------------------------------------------------------------------------
+
+    def getData(self):
+        """
+        :return: Telemetry data
+        :rtype: OrderedDict
+        """
+        data = OrderedDict(self._data)
+        data["stages"] = self._stages
+        data["duration"] = sum(
+            stage["duration"]
+            for stage in self._stages.values()
+        )
+
+        return data
+
+    def write(self, path):
+        """
+        :param str path:
+        """
+        with open(path, "w") as f:
+            json.dump(self.getData(), f, indent=4)
@@ -1,5 +1,6 @@
-from maya import cmds
-from . import attributes
+import numpy as np
+from maya import cmds, OpenMaya
+from . import api, attributes
 
 
 def getWorldMatrixAtTime(node, time=None):
@@ -12,3 +13,246 @@ def getWorldMatrixAtTime(node, time=None):
     plug = attributes.getPlug(node, "worldMatrix[0]")
     arguments = {"time": time} if time else {}
     return cmds.getAttr(plug, **arguments)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getMatrices(nodes, attr="worldMatrix[0]", time=None):
+    """
+    Get the matrix attribute of all of the provided nodes as a single array
+    of 4x4 matrices. The matrices are read through the API in a single
+    pass, when a time is provided the matrices are evaluated using a DG
+    context, which means the current time is never changed.
+
+    :param list nodes:
+    :param str attr:
+    :param int/float/None time:
+    :return: Matrices
+    :rtype: numpy.ndarray
+    """
+    # get context
+    if time is None:
+        context = OpenMaya.MDGContext.fsNormal
+    else:
+        time = OpenMaya.MTime(float(time), OpenMaya.MTime.uiUnit())
+        context = OpenMaya.MDGContext(time)
+
+    # read matrices
+    matrices = np.empty((len(nodes), 4, 4), dtype=float)
+    for i, node in enumerate(nodes):
+        plug = api.getMPlug(attributes.getPlug(node, attr))
+        matrix = OpenMaya.MFnMatrixData(plug.asMObject(context)).matrix()
+        matrices[i] = np.array(api.matrixToList(matrix)).reshape(4, 4)
+
+    return matrices
+
+
+def setLocalMatrices(nodes, matrices):
+    """
+    Set the local matrices of all of the provided nodes in a single pass
+    through the API. The rotation is set relative to the rotate axis and
+    the joint orient of joints, the translation is corrected for the pivots
+    of the node. The nodes should be sorted based on hierarchy. Shear and
+    negative scale are not supported.
+
+    :param list nodes:
+    :param numpy.ndarray matrices:
+    """
+    # get scales and normalized rotation matrices
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    scales = np.linalg.norm(matrices[:, :3, :3], axis=2)
+    rotations = matrices.copy()
+    rotations[:, :3, :3] /= scales[:, :, None]
+    rotations[:, 3, :3] = 0
+
+    # loop nodes
+    util = OpenMaya.MScriptUtil()
+    for node, matrix, rotation, scale in zip(
+        nodes,
+        matrices,
+        rotations,
+        scales
+    ):
+        dag = api.getMDagPath(node)
+        transform = OpenMaya.MFnTransform(dag)
+
+        # get rotation relative to rotate axis and joint orient
+        quaternion = OpenMaya.MTransformationMatrix(
+            api.listToMatrix(rotation.flatten().tolist())
+        ).rotation()
+        quaternion = transform.rotateOrientation(
+            OpenMaya.MSpace.kTransform
+        ).inverse() * quaternion
+
+        if dag.hasFn(OpenMaya.MFn.kJoint):
+            orient = OpenMaya.MQuaternion()
+            OpenMaya.MFnIkJoint(dag).getOrientation(orient)
+            quaternion = quaternion * orient.inverse()
+
+        # set rotation and scale
+        util.createFromList(scale.tolist(), 3)
+        transform.setRotation(quaternion, OpenMaya.MSpace.kTransform)
+        transform.setScale(util.asDoublePtr())
+
+        # set translation corrected for the pivots
+        translation = transform.getTranslation(OpenMaya.MSpace.kTransform)
+        plug = transform.findPlug("matrix", False)
+        local = OpenMaya.MFnMatrixData(plug.asMObject()).matrix()
+        offset = OpenMaya.MVector(*matrix[3, :3].tolist()) - OpenMaya.MVector(
+            local(3, 0),
+            local(3, 1),
+            local(3, 2)
+        )
+        transform.setTranslation(
+            translation + offset,
+            OpenMaya.MSpace.kTransform
+        )
+
+
+def decomposeMatrices(matrices, rotateOrder=0):
+    """
+    Decompose the matrices into translate, rotate and scale channels. The
+    rotations are in radians and use the provided rotate order. Shear and
+    negative scale are not supported.
+
+    :param numpy.ndarray matrices:
+    :param int rotateOrder:
+    :return: Translate, rotate and scale channels of every matrix
+    :rtype: numpy.ndarray
+    """
+    # get translation and scale
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    translations = matrices[:, 3, :3]
+    scales = np.linalg.norm(matrices[:, :3, :3], axis=2)
+
+    # get rotations
+    rotations = []
+    for matrix, scale in zip(matrices, scales):
+        matrix = matrix.copy()
+        matrix[:3, :3] /= scale[:, None]
+
+        euler = OpenMaya.MTransformationMatrix(
+            api.listToMatrix(matrix.flatten().tolist())
+        ).eulerRotation()
+        euler.reorderIt(rotateOrder)
+        rotations.append([euler.x, euler.y, euler.z])
+
+    return np.hstack(
+        [translations, np.array(rotations, dtype=float).reshape(-1, 3), scales]
+    )
+
+
+# ----------------------------------------------------------------------------
+
+
+class WorldMatrixSampler(object):
+    """
+    The world matrix sampler reads the world matrices of many nodes across
+    many frames. The matrices are evaluated using a DG context, which means
+    the current time is never changed. Sampled matrices are cached per node
+    and frame for the lifetime of the sampler. The cache is not invalidated
+    when the scene changes, which is why a sampler should be scoped to a
+    single operation that doesn't change what drives the sampled nodes.
+
+    When used as a context the sampler is the active sampler, which is used
+    by getWorldMatricesAtTimes. Without an active sampler every call samples
+    the matrices without caching.
+
+    .. highlight::
+        with WorldMatrixSampler():
+            matrices = getWorldMatricesAtTimes(nodes, frames)
+    """
+    _active = []
+
+    def __init__(self):
+        self._matrices = {}
+
+    # ------------------------------------------------------------------------
+
+    def __enter__(self):
+        WorldMatrixSampler._active.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        WorldMatrixSampler._active.remove(self)
+        self.clear()
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def getActive(cls):
+        """
+        :return: Active sampler
+        :rtype: WorldMatrixSampler/None
+        """
+        return cls._active[-1] if cls._active else None
+
+    # ------------------------------------------------------------------------
+
+    def clear(self):
+        self._matrices.clear()
+
+    def sample(self, nodes, frames):
+        """
+        Sample the world matrices of the provided nodes on the provided
+        frames. Only the node and frame combinations that are not cached are
+        evaluated.
+
+        :param list nodes:
+        :param list frames:
+        :return: World matrices of shape (nodes, frames, 4, 4)
+        :rtype: numpy.ndarray
+        """
+        # variables
+        unit = OpenMaya.MTime.uiUnit()
+        contexts = {}
+        matrices = np.empty((len(nodes), len(frames), 4, 4), dtype=float)
+
+        # loop nodes
+        for i, node in enumerate(nodes):
+            dag = api.getMDagPath(node)
+            path = dag.fullPathName()
+            plug = None
+
+            # loop frames
+            for j, frame in enumerate(frames):
+                key = (path, float(frame))
+
+                # evaluate matrix
+                if key not in self._matrices:
+                    if plug is None:
+                        plug = OpenMaya.MFnDependencyNode(dag.node())
+                        plug = plug.findPlug("worldMatrix", False)
+                        plug = plug.elementByLogicalIndex(
+                            dag.instanceNumber()
+                        )
+
+                    if frame not in contexts:
+                        time = OpenMaya.MTime(frame, unit)
+                        contexts[frame] = OpenMaya.MDGContext(time)
+
+                    data = plug.asMObject(contexts[frame])
+                    matrix = OpenMaya.MFnMatrixData(data).matrix()
+                    self._matrices[key] = np.array(
+                        api.matrixToList(matrix),
+                        dtype=float
+                    ).reshape(4, 4)
+
+                matrices[i, j] = self._matrices[key]
+
+        return matrices
+
+
+def getWorldMatricesAtTimes(nodes, frames):
+    """
+    Sample the world matrices using the active sampler, when no sampler is
+    active the matrices are sampled without caching.
+
+    :param list nodes:
+    :param list frames:
+    :return: World matrices of shape (nodes, frames, 4, 4)
+    :rtype: numpy.ndarray
+    """
+    sampler = WorldMatrixSampler.getActive() or WorldMatrixSampler()
+    return sampler.sample(nodes, frames)
@@ -0,0 +1,31 @@
+from maya import cmds
+from . import decorators
+
+
+# the undo plugin registers a command that executes the pending modifier
+# and keeps it, which adds the modification to the undo queue.
+PLUGIN = "zUtilsUndo.py"
+COMMAND = "zUtilsModifier"
+
+# modifiers waiting to be executed by the command
+PENDING = []
+
+
+# ----------------------------------------------------------------------------
+
+
+@decorators.loadPlugin(PLUGIN)
+def doIt(modifier):
+    """
+    Execute the modifier through an undoable command, this means the entire
+    modification can be undone and redone as a single step of the undo
+    queue. Changes made to the nodes of the modifier after it is executed
+    are not part of the undo step.
+
+    :param MDGModifier/MDagModifier modifier:
+    """
+    PENDING.append(modifier)
+    try:
+        getattr(cmds, COMMAND)()
+    finally:
+        del PENDING[:]
@@ -0,0 +1,116 @@
+"""
+Run the export scheduler in stub mode. The tests don't require maya, the
+workers are run by the current python interpreter.
+
+.. highlight::
+    python -m pytest tests
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
+)
+
+from zBatch import export, pool  # noqa: E402
+
+
+# ----------------------------------------------------------------------------
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "output")
+        self.summary = os.path.join(self.directory, "summary.json")
+
+        # create scenes with the same name in different directories
+        self.scenes = []
+        for folder in ["a", "b"]:
+            os.makedirs(os.path.join(self.directory, folder))
+            scene = os.path.join(self.directory, folder, "shot.ma")
+            open(scene, "w").close()
+            self.scenes.append(scene)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+
+    def schedule(self, *args):
+        """
+        :return: Exit code and summary
+        :rtype: tuple
+        """
+        code = export.main(
+            self.scenes + [
+                "--output", self.output,
+                "--summary", self.summary,
+                "--processes", "2",
+                "--stub",
+            ] + list(args)
+        )
+
+        with open(self.summary, "r") as f:
+            return code, json.load(f)
+
+    # ------------------------------------------------------------------------
+
+    def testRetry(self):
+        code, summary = self.schedule("--stub-failures", "1", "--retries", "1")
+
+        self.assertEqual(code, 0)
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(summary["failed"], 0)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["processes"], 2)
+
+        for job in summary["jobs"]:
+            self.assertTrue(job["success"])
+            self.assertEqual(job["attempts"], 2)
+            self.assertEqual(len(job["durations"]), 2)
+            self.assertEqual(len(job["data"]["outputs"]), 1)
+
+    def testFailure(self):
+        code, summary = self.schedule("--stub-failures", "1", "--retries", "0")
+
+        self.assertEqual(code, 1)
+        self.assertEqual(summary["succeeded"], 0)
+        self.assertEqual(summary["failed"], 2)
+
+        for job in summary["jobs"]:
+            self.assertFalse(job["success"])
+            self.assertEqual(job["attempts"], 1)
+            self.assertTrue(os.path.exists(job["log"]))
+
+    def testJobNames(self):
+        code, summary = self.schedule()
+        names = sorted(job["name"] for job in summary["jobs"])
+
+        # scenes with the same name are exported to their own directory
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            names,
+            sorted(pool.getJobName(scene) for scene in self.scenes)
+        )
+        self.assertNotEqual(names[0], names[1])
+
+        for name in names:
+            self.assertTrue(name.startswith("shot-"))
+            self.assertTrue(
+                os.path.exists(os.path.join(self.output, name, "stub.abc"))
+            )
+
+    def testDuplicateScenes(self):
+        self.scenes.append(self.scenes[0])
+        with self.assertRaises(ValueError):
+            self.schedule()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Run the solver animation of the MusclesAnimationImport on a synthetic muscle
+rig. The tests require a maya interpreter and are skipped otherwise.
+
+.. highlight::
+    mayapy -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
+)
+
+try:
+    import maya.standalone
+except ImportError:
+    maya = None
+
+
+# ----------------------------------------------------------------------------
+
+
+def setUpModule():
+    if maya is not None:
+        maya.standalone.initialize(name="python")
+
+
+class AnimationStandIn(object):
+    """
+    The animation stand-in holds the attributes of an exported animation
+    that are read when creating the solver animation.
+
+    :param str solver:
+    :param int/float startFrame:
+    :param int transitionFrames:
+    """
+    def __init__(self, solver, startFrame, transitionFrames=1):
+        self.solver = solver
+        self.startFrame = startFrame
+        self.transitionFrames = transitionFrames
+
+
+# ----------------------------------------------------------------------------
+
+
+@unittest.skipIf(maya is None, "Requires a maya interpreter.")
+class SolverAnimationTest(unittest.TestCase):
+    def setUp(self):
+        from maya import cmds
+        from zMuscles import benchmark
+
+        cmds.file(new=True, force=True)
+
+        # create rig
+        self.importer = benchmark.createRig(9)["importer"]
+        cmds.addAttr(
+            self.importer.solver,
+            longName="startFrame",
+            attributeType="double"
+        )
+        cmds.setAttr("{}.substeps".format(self.importer.solver), 4)
+
+        # create exported solver parent
+        solver = cmds.createNode("transform", name="exportedSolver")
+        cmds.setKeyframe(solver, attribute="tx", time=1001, value=0)
+        cmds.setKeyframe(solver, attribute="tx", time=1002, value=5)
+        self.animation = AnimationStandIn(solver, 1001)
+
+    # ------------------------------------------------------------------------
+
+    def getKeys(self, attr):
+        from maya import cmds
+
+        plug = "{}.{}".format(self.importer.solver, attr)
+        return (
+            cmds.keyframe(plug, query=True, timeChange=True) or [],
+            cmds.keyframe(plug, query=True, valueChange=True) or []
+        )
+
+    # ------------------------------------------------------------------------
+
+    def testCreateSolverAnimation(self):
+        from maya import cmds
+
+        # parent solver, the keys are converted to the local space
+        parent = cmds.createNode("transform", name="solverParent")
+        cmds.setAttr("{}.tx".format(parent), 2)
+        cmds.parent(self.importer.solver, parent)
+
+        self.importer._createSolverAnimation(self.animation, offset=10)
+
+        plug = "{}.startFrame".format(self.importer.solver)
+        self.assertEqual(cmds.getAttr(plug), 1011)
+
+        times, values = self.getKeys("tx")
+        self.assertEqual(times, [1011, 1012])
+        self.assertAlmostEqual(values[0], -2)
+        self.assertAlmostEqual(values[1], 3)
+
+        times, values = self.getKeys("substeps")
+        self.assertEqual(times, [1011, 1012, 1013])
+        self.assertEqual(values, [1, 1, 4])
+
+    def testSetSubstepAnimation(self):
+        self.importer._createSolverAnimation(self.animation)
+        self.importer.setSubstepAnimation(
+            [(1003, 2), (1010, 2), (1020, 8), (1000, 16)]
+        )
+
+        times, values = self.getKeys("substeps")
+        self.assertEqual(times, [1001, 1002, 1003, 1020])
+        self.assertEqual(values, [1, 1, 2, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Attribute the cost of a stand-in solver with known group costs. The tests
+don't require maya.
+
+.. highlight::
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
+)
+
+from zBatch import profiler  # noqa: E402
+
+
+# ----------------------------------------------------------------------------
+
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.solver = profiler.StandInProfileSolver(
+            1,
+            3,
+            [("group0", 0.02), ("group1", 0.002), ("group2", 0.01)]
+        )
+
+    # ------------------------------------------------------------------------
+
+    def testRanking(self):
+        report = profiler.Profiler(self.solver, threshold=0.05).profile()
+
+        self.assertEqual(
+            [entry["groups"] for entry in report["ranking"]],
+            [["group0"], ["group2"], ["group1"]]
+        )
+        self.assertEqual(len(report["frames"]), 3)
+
+    def testMeasurements(self):
+        # the groups are bisected into group0 and group1, group2 of which
+        # the latter is bisected again, every set of groups is measured
+        # once together with the measurement of all groups enabled.
+        report = profiler.Profiler(self.solver, threshold=0.05).profile()
+        self.assertEqual(report["measurements"], 6)
+
+    def testThreshold(self):
+        # none of the sets is bisected when the threshold exceeds the share
+        # of all groups, only all groups enabled and disabled are measured.
+        report = profiler.Profiler(self.solver, threshold=1.1).profile()
+
+        self.assertEqual(report["measurements"], 2)
+        self.assertEqual(
+            [entry["groups"] for entry in report["ranking"]],
+            [["group0", "group1", "group2"]]
+        )
+
+    def testRestore(self):
+        profiler.Profiler(self.solver).profile()
+        self.assertEqual(self.solver._disabled, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
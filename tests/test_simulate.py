@@ -0,0 +1,142 @@
+"""
+Run the simulation scheduler with the stand-in solver. The tests don't
+require maya, the workers are run by the current python interpreter.
+
+.. highlight::
+    python -m pytest tests
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
+)
+
+from zBatch import simulate  # noqa: E402
+
+
+# ----------------------------------------------------------------------------
+
+
+class SimulateTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "output")
+        self.summary = os.path.join(self.directory, "summary.json")
+
+        # create files
+        self.scene = os.path.join(self.directory, "rig.ma")
+        self.takes = [
+            os.path.join(self.directory, "shot{}.abc".format(i))
+            for i in range(2)
+        ]
+        for path in [self.scene] + self.takes:
+            open(path, "w").close()
+
+        # write jobs
+        self.jobs = os.path.join(self.directory, "jobs.json")
+        with open(self.jobs, "w") as f:
+            json.dump(
+                [
+                    {
+                        "name": "shot{}".format(i),
+                        "scene": self.scene,
+                        "take": take,
+                        "priority": i,
+                    }
+                    for i, take in enumerate(self.takes)
+                ],
+                f
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+
+    def schedule(self, *args):
+        """
+        :return: Exit code and jobs of the summary per name
+        :rtype: tuple
+        """
+        code = simulate.main(
+            [
+                self.jobs,
+                "--output", self.output,
+                "--summary", self.summary,
+                "--processes", "2",
+                "--machine-limit", "1",
+                "--stub",
+            ] + list(args)
+        )
+
+        with open(self.summary, "r") as f:
+            jobs = {job["name"]: job for job in json.load(f)["jobs"]}
+
+        return code, jobs
+
+    def getCheckpoint(self, name):
+        """
+        :param str name:
+        :return: Checkpoint path
+        :rtype: str
+        """
+        return os.path.join(self.output, name, simulate.CHECKPOINT_FILE)
+
+    # ------------------------------------------------------------------------
+
+    def testRetry(self):
+        # the first attempt fails halfway at frame 1050, the retry resumes
+        # after the checkpoint at frame 1040.
+        code, jobs = self.schedule("--stub-failures", "1", "--retries", "1")
+
+        self.assertEqual(code, 0)
+        for name, job in jobs.items():
+            self.assertTrue(job["success"])
+            self.assertEqual(job["attempts"], 2)
+            self.assertEqual(job["data"]["resumedFrom"], 1041)
+            self.assertEqual(job["data"]["simulatedFrames"], 60)
+            self.assertFalse(os.path.exists(self.getCheckpoint(name)))
+
+    def testRerun(self):
+        # a completed job leaves no checkpoint, running it again simulates
+        # all frames.
+        self.schedule()
+        code, jobs = self.schedule()
+
+        self.assertEqual(code, 0)
+        for job in jobs.values():
+            self.assertIsNone(job["data"]["resumedFrom"])
+            self.assertEqual(job["data"]["simulatedFrames"], 100)
+
+    def testResume(self):
+        code, jobs = self.schedule("--stub-failures", "1", "--retries", "0")
+        self.assertEqual(code, 1)
+        self.assertTrue(os.path.exists(self.getCheckpoint("shot0")))
+
+        code, jobs = self.schedule()
+        self.assertEqual(code, 0)
+        self.assertEqual(jobs["shot0"]["data"]["resumedFrom"], 1041)
+
+    def testInvalidate(self):
+        # changing the take invalidates the checkpoint of its job only
+        self.schedule("--stub-failures", "1", "--retries", "0")
+
+        mtime = os.path.getmtime(self.takes[0]) + 10
+        os.utime(self.takes[0], (time.time(), mtime))
+
+        code, jobs = self.schedule()
+        self.assertEqual(code, 0)
+        self.assertIsNone(jobs["shot0"]["data"]["resumedFrom"])
+        self.assertEqual(jobs["shot0"]["data"]["simulatedFrames"], 100)
+        self.assertEqual(jobs["shot1"]["data"]["resumedFrom"], 1041)
+
+
+if __name__ == "__main__":
+    unittest.main()